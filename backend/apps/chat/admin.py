@@ -1,12 +1,28 @@
 ﻿from django.contrib import admin
-from apps.chat.models import Conversation, Message
+from apps.chat.models import Conversation, ConversationArchive, ConversationArchiveChunk, ConversationReadState, Message
 
 
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
-    list_display = ('id', 'request', 'created_at')
+    list_display = ('id', 'request', 'last_message_at', 'created_at')
 
 
 @admin.register(Message)
 class MessageAdmin(admin.ModelAdmin):
     list_display = ('id', 'conversation', 'sender_user', 'created_at')
+
+
+@admin.register(ConversationReadState)
+class ConversationReadStateAdmin(admin.ModelAdmin):
+    list_display = ('id', 'conversation', 'user', 'last_read_message_id', 'updated_at')
+
+
+@admin.register(ConversationArchive)
+class ConversationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('id', 'conversation', 'message_count', 'last_archived_message_id', 'updated_at')
+
+
+@admin.register(ConversationArchiveChunk)
+class ConversationArchiveChunkAdmin(admin.ModelAdmin):
+    list_display = ('id', 'archive', 'message_count', 'last_message_id', 'created_at')
+    exclude = ('payload',)
@@ -4,3 +4,8 @@
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.chat'
+
+    def ready(self):
+        from apps.chat.signals import connect_signals
+
+        connect_signals()
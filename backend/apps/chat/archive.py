@@ -0,0 +1,114 @@
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router, transaction
+from django.utils.dateparse import parse_datetime
+
+from apps.chat.models import ConversationArchive, ConversationArchiveChunk, Message
+
+
+def decode_archive(payload):
+    if not payload:
+        return []
+    return json.loads(zlib.decompress(bytes(payload)).decode('utf-8'))
+
+
+def encode_archive(rows):
+    return zlib.compress(json.dumps(rows, cls=DjangoJSONEncoder).encode('utf-8'), 9)
+
+
+def archive_conversation(conversation, batch_size=500):
+    with transaction.atomic(using=router.db_for_write(ConversationArchive, instance=conversation)):
+        archive, _ = ConversationArchive.objects.select_for_update().get_or_create(conversation=conversation)
+        # Lo que queda en chat_message está sin archivar: un id menor que el último archivado puede confirmarse tarde.
+        messages = (
+            Message.objects.filter(conversation=conversation)
+            .order_by('id')
+            .values('id', 'sender_user_id', 'body', 'created_at')
+        )
+        new_rows = list(messages.iterator(chunk_size=batch_size))
+        if not new_rows:
+            return 0
+
+        # Cada pasada añade un bloque nuevo: el coste es el de los mensajes nuevos, no el del historial entero.
+        ConversationArchiveChunk.objects.create(
+            archive=archive,
+            payload=encode_archive(new_rows),
+            message_count=len(new_rows),
+            last_message_id=new_rows[-1]['id'],
+        )
+        archive.message_count += len(new_rows)
+        archive.last_archived_message_id = max(archive.last_archived_message_id, new_rows[-1]['id'])
+        archive.save(update_fields=['message_count', 'last_archived_message_id', 'updated_at'])
+
+        Message.objects.filter(id__in=[row['id'] for row in new_rows]).delete()
+        return len(new_rows)
+
+
+def archive_chunks(conversation):
+    return ConversationArchiveChunk.objects.filter(archive__conversation=conversation).order_by('-last_message_id')
+
+
+def chunk_messages(conversation, chunk):
+    return [
+        Message(
+            id=row['id'],
+            conversation_id=conversation.id,
+            sender_user_id=row['sender_user_id'],
+            body=row['body'],
+            created_at=parse_datetime(row['created_at']),
+        )
+        for row in reversed(decode_archive(chunk.payload))
+    ]
+
+
+# Secuencia paginable: primero los mensajes recientes de chat_message y después el archivo comprimido.
+class MessageHistory:
+    def __init__(self, conversation, queryset):
+        self.conversation = conversation
+        self.queryset = queryset
+        self._hot_count = None
+        self._chunks = None
+
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.queryset.count()
+        return self._hot_count
+
+    def chunks(self):
+        if self._chunks is None:
+            self._chunks = list(archive_chunks(self.conversation).defer('payload'))
+        return self._chunks
+
+    def archived(self, start, stop):
+        # Solo se descomprimen los bloques que caen dentro de la página.
+        items = []
+        offset = 0
+        for chunk in self.chunks():
+            end = offset + chunk.message_count
+            if start < end and offset < stop:
+                items.extend(chunk_messages(self.conversation, chunk)[max(start - offset, 0):stop - offset])
+            offset = end
+            if offset >= stop:
+                break
+        return items
+
+    def count(self):
+        return self.hot_count() + sum(chunk.message_count for chunk in self.chunks())
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+
+        start = key.start or 0
+        stop = self.count() if key.stop is None else key.stop
+        hot_count = self.hot_count()
+
+        items = list(self.queryset[start:min(stop, hot_count)]) if start < hot_count else []
+        if stop > hot_count:
+            items.extend(self.archived(max(start - hot_count, 0), stop - hot_count))
+        return items
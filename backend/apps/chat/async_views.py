@@ -0,0 +1,37 @@
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+
+from apps.chat.models import Conversation
+from apps.chat.serializers import MessageSerializer
+from apps.chat.views import (
+    MessageListCreateView,
+    conversation_access_error,
+    conversation_messages,
+    conversations_with_access,
+)
+from apps.core.async_api import api_response, async_api_view, error_response
+from apps.core.pagination import AsyncResultsPagination
+from apps.profiles.summaries import aprime_user_summaries
+
+
+async def message_list_get(request, conversation_id):
+    try:
+        conversation = await conversations_with_access(request.user).aget(id=conversation_id)
+    except Conversation.DoesNotExist:
+        raise NotFound()
+    error = conversation_access_error(request.user, conversation)
+    if error:
+        return error_response(error, status.HTTP_403_FORBIDDEN)
+    if conversation.has_archive:
+        return await message_list.sync_fallback(request._request, conversation_id=conversation_id)
+
+    paginator = AsyncResultsPagination()
+    page = await paginator.apaginate_queryset(conversation_messages(conversation), request)
+    context = {}
+    await aprime_user_summaries(MessageSerializer, page, context)
+    data = paginator.get_paginated_data(MessageSerializer(page, many=True, context=context).data)
+    data['last_read_message_id'] = conversation.last_read_message_id
+    return api_response(data)
+
+
+message_list = async_api_view(message_list_get, MessageListCreateView.as_view())
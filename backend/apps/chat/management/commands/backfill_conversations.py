@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.chat.models import Conversation
+from apps.core.db import stream
+from apps.requests.models import Request
+
+
+class Command(BaseCommand):
+    help = 'Crea la conversación de las peticiones con voluntario aceptado que aún no la tienen.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        request_ids = (
+            Request.objects.filter(accepted_offer__isnull=False, conversation__isnull=True)
+            .order_by('id')
+            .values_list('id', flat=True)
+        )
+
+        created = 0
+        batch = []
+        for request_id in stream(request_ids, chunk_size=batch_size):
+            batch.append(Conversation(request_id=request_id))
+            if len(batch) >= batch_size:
+                created += self.insert(batch)
+                batch = []
+        if batch:
+            created += self.insert(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Conversaciones creadas: {created}'))
+
+    def insert(self, batch):
+        # Con ignore_conflicts bulk_create devuelve todo el lote: se cuentan las filas que existen de verdad.
+        existing = Conversation.objects.filter(request_id__in=[conversation.request_id for conversation in batch])
+        before = existing.count()
+        Conversation.objects.bulk_create(batch, ignore_conflicts=True)
+        return existing.count() - before
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.chat.archive import archive_conversation
+from apps.chat.models import Conversation
+from apps.core.db import stream
+from apps.requests.models import Request
+
+
+class Command(BaseCommand):
+    help = 'Archiva en un blob comprimido los mensajes de conversaciones cerradas hace más de N días.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        conversations = (
+            Conversation.objects.filter(
+                request__status__in=[Request.Status.RESOLVED, Request.Status.CANCELLED],
+                request__closed_at__lt=cutoff,
+                messages__isnull=False,
+            )
+            .distinct()
+            .order_by('id')
+        )
+
+        archived_conversations = 0
+        archived_messages = 0
+        for conversation in stream(conversations, chunk_size=options['batch_size']):
+            moved = archive_conversation(conversation, batch_size=options['batch_size'])
+            if moved:
+                archived_conversations += 1
+                archived_messages += moved
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Conversaciones archivadas: {archived_conversations} | Mensajes movidos: {archived_messages}'
+            )
+        )
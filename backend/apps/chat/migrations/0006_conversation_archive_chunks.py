@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_payloads_to_chunks(apps, schema_editor):
+    ConversationArchive = apps.get_model('chat', 'ConversationArchive')
+    ConversationArchiveChunk = apps.get_model('chat', 'ConversationArchiveChunk')
+    alias = schema_editor.connection.alias
+    for archive in ConversationArchive.objects.using(alias).exclude(message_count=0).iterator():
+        ConversationArchiveChunk.objects.using(alias).create(
+            archive=archive,
+            payload=archive.payload,
+            message_count=archive.message_count,
+            last_message_id=archive.last_archived_message_id,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_shard_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationArchiveChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.BinaryField()),
+                ('message_count', models.PositiveIntegerField()),
+                ('last_message_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('archive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='chat.conversationarchive')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['archive', '-last_message_id'], name='chat_conver_archive_9cb63b_idx')],
+            },
+        ),
+        migrations.RunPython(move_payloads_to_chunks, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='conversationarchive',
+            name='payload',
+        ),
+    ]
@@ -6,6 +6,9 @@ from apps.requests.models import Request
 class Conversation(models.Model):
     request = models.OneToOneField(Request, on_delete=models.CASCADE, related_name='conversation')
     created_at = models.DateTimeField(auto_now_add=True)
+    last_message_id = models.BigIntegerField(null=True, blank=True)
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_preview = models.CharField(max_length=140, blank=True)
 
     def __str__(self):
         return f'Conversation {self.id} for Request {self.request_id}'
@@ -13,14 +16,53 @@ class Conversation(models.Model):
 
 class Message(models.Model):
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
-    sender_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
+    sender_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, db_constraint=False)
     body = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=['conversation', 'created_at']),
+            models.Index(fields=['conversation', 'id']),
         ]
 
     def __str__(self):
         return f'Message {self.id}'
+
+
+class ConversationReadState(models.Model):
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='read_states')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_constraint=False)
+    last_read_message_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('conversation', 'user')
+
+    def __str__(self):
+        return f'{self.user_id} -> Conversation {self.conversation_id} ({self.last_read_message_id})'
+
+
+class ConversationArchive(models.Model):
+    conversation = models.OneToOneField(Conversation, on_delete=models.CASCADE, related_name='archive')
+    message_count = models.PositiveIntegerField(default=0)
+    last_archived_message_id = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Archive for Conversation {self.conversation_id} ({self.message_count})'
+
+
+class ConversationArchiveChunk(models.Model):
+    archive = models.ForeignKey(ConversationArchive, on_delete=models.CASCADE, related_name='chunks')
+    payload = models.BinaryField()
+    message_count = models.PositiveIntegerField()
+    last_message_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['archive', '-last_message_id'])]
+
+    def __str__(self):
+        return f'Chunk {self.id} of Archive {self.archive_id} ({self.message_count})'
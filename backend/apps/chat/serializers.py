@@ -1,30 +1,46 @@
 from rest_framework import serializers
-from django.core.exceptions import ObjectDoesNotExist
 
-from apps.chat.models import Message
+from apps.chat.models import Conversation, Message
+from apps.profiles.summaries import UserSummaryListSerializer, UserSummaryMixin
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(UserSummaryMixin, serializers.ModelSerializer):
+    user_summary_fields = ('sender_user_id',)
+
     conversation_id = serializers.IntegerField(read_only=True)
     sender_user_id = serializers.IntegerField(read_only=True)
     sender_display_name = serializers.SerializerMethodField()
 
     def get_sender_display_name(self, obj):
-        sender = getattr(obj, 'sender_user', None)
-        if not sender:
-            return ''
-
-        try:
-            profile = sender.profile
-        except ObjectDoesNotExist:
-            profile = None
-        if profile and profile.display_name:
-            return profile.display_name
-        if sender.email:
-            return sender.email
-        return f'Usuario #{sender.id}'
+        return self.user_display_name(obj.sender_user_id)
 
     class Meta:
         model = Message
         fields = ('id', 'conversation_id', 'sender_user_id', 'sender_display_name', 'body', 'created_at')
         read_only_fields = ('created_at',)
+        list_serializer_class = UserSummaryListSerializer
+
+
+class ConversationSummarySerializer(serializers.ModelSerializer):
+    conversation_id = serializers.IntegerField(source='id', read_only=True)
+    request_id = serializers.IntegerField(read_only=True)
+    request_title = serializers.CharField(source='request.title', read_only=True)
+    request_status = serializers.CharField(source='request.status', read_only=True)
+    unread_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Conversation
+        fields = (
+            'conversation_id',
+            'request_id',
+            'request_title',
+            'request_status',
+            'last_message_id',
+            'last_message_at',
+            'last_message_preview',
+            'unread_count',
+        )
+
+
+class ConversationReadSerializer(serializers.Serializer):
+    message_id = serializers.IntegerField(required=False, min_value=1)
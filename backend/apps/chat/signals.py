@@ -0,0 +1,22 @@
+from django.db.models import Q
+from django.db.models.signals import post_save
+
+from apps.chat.models import Conversation, Message
+
+
+def register_message(sender, instance, created, using, **kwargs):
+    # Solo avanza: con envíos concurrentes el último en escribir puede traer un id menor.
+    if not created:
+        return
+    Conversation.objects.using(using).filter(
+        Q(last_message_id__isnull=True) | Q(last_message_id__lt=instance.id),
+        id=instance.conversation_id,
+    ).update(
+        last_message_id=instance.id,
+        last_message_at=instance.created_at,
+        last_message_preview=instance.body[:140],
+    )
+
+
+def connect_signals():
+    post_save.connect(register_message, sender=Message, dispatch_uid='chat_register_message')
@@ -1,9 +1,18 @@
-﻿from django.contrib.auth import get_user_model
-from django.test import TestCase
+﻿from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.chat.models import Conversation, ConversationArchive, ConversationReadState, Message
+from apps.chat.signals import register_message
 from apps.communities.models import Community, Membership
 from apps.requests.models import Request, VolunteerOffer
-from apps.chat.models import Conversation
 
 User = get_user_model()
 
@@ -39,3 +48,243 @@ class ChatPermissionsTests(TestCase):
         self.client.force_authenticate(self.other)
         response = self.client.get(f'/api/conversations/{self.conversation.id}/messages')
         self.assertEqual(response.status_code, 403)
+
+    @override_settings(API_CACHES_ENABLED=True)
+    def test_participant_check_resolves_in_a_single_query(self):
+        Message.objects.create(conversation=self.conversation, sender_user=self.creator, body='Hola')
+        self.client.force_authenticate(self.volunteer)
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/requests/{self.request.id}/conversation')
+        self.assertEqual(response.data['conversation_id'], self.conversation.id)
+
+        cache.clear()
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/conversations/{self.conversation.id}/messages')
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/conversations/{self.conversation.id}/messages')
+        self.assertEqual(response.data['results'][0]['sender_display_name'], 'creator3@example.com')
+
+    @override_settings(ROOT_URLCONF='config.urls_async')
+    async def test_async_message_list_checks_participants(self):
+        await Message.objects.acreate(conversation=self.conversation, sender_user=self.creator, body='Hola')
+        client = AsyncClient()
+        url = f'/api/conversations/{self.conversation.id}/messages'
+
+        response = await client.get(url, headers={'Authorization': f'Bearer {AccessToken.for_user(self.other)}'})
+        self.assertEqual(response.status_code, 403)
+
+        response = await client.get(url, headers={'Authorization': f'Bearer {AccessToken.for_user(self.volunteer)}'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['results'][0]['body'], 'Hola')
+        self.assertEqual(data['results'][0]['sender_display_name'], 'creator3@example.com')
+        self.assertEqual(data['last_read_message_id'], 0)
+
+    def test_get_conversation_does_not_create_missing_conversation(self):
+        self.conversation.delete()
+        self.client.force_authenticate(self.creator)
+        response = self.client.get(f'/api/requests/{self.request.id}/conversation')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Conversation.objects.filter(request=self.request).exists())
+
+        output = StringIO()
+        call_command('backfill_conversations', batch_size=1, stdout=output)
+        self.assertIn('Conversaciones creadas: 1', output.getvalue())
+        response = self.client.get(f'/api/requests/{self.request.id}/conversation')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['conversation_id'], Conversation.objects.get(request=self.request).id)
+
+
+class ConversationInboxTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.community = Community.objects.create(name='Obanos')
+        self.creator = User.objects.create_user(username='creator4@example.com', email='creator4@example.com', password='Pass1234!')
+        self.volunteer = User.objects.create_user(username='vol4@example.com', email='vol4@example.com', password='Pass1234!')
+        self.other = User.objects.create_user(username='other4@example.com', email='other4@example.com', password='Pass1234!')
+        for user in (self.creator, self.volunteer, self.other):
+            Membership.objects.create(user=user, community=self.community, status=Membership.Status.APPROVED)
+        self.request = Request.objects.create(
+            community=self.community,
+            created_by_user=self.creator,
+            title='Bandeja',
+            description='Bandeja',
+            category='general',
+            status=Request.Status.IN_PROGRESS,
+        )
+        offer = VolunteerOffer.objects.create(
+            request=self.request,
+            volunteer_user=self.volunteer,
+            status=VolunteerOffer.Status.ACCEPTED,
+        )
+        self.request.accepted_offer = offer
+        self.request.save(update_fields=['accepted_offer'])
+        self.conversation = Conversation.objects.create(request=self.request)
+
+    def send(self, user, body):
+        self.client.force_authenticate(user)
+        response = self.client.post(f'/api/conversations/{self.conversation.id}/messages', {'body': body}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def test_inbox_lists_last_message_and_unread_count(self):
+        self.send(self.volunteer, 'Hola')
+        last = self.send(self.volunteer, 'Llego a las cinco')
+
+        self.client.force_authenticate(self.creator)
+        response = self.client.get('/api/conversations')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        row = response.data['results'][0]
+        self.assertEqual(row['conversation_id'], self.conversation.id)
+        self.assertEqual(row['request_title'], 'Bandeja')
+        self.assertEqual(row['last_message_id'], last['id'])
+        self.assertEqual(row['last_message_preview'], 'Llego a las cinco')
+        self.assertEqual(row['unread_count'], 2)
+
+    def test_messages_created_outside_the_api_update_the_inbox_and_never_go_back(self):
+        first = Message.objects.create(conversation=self.conversation, sender_user=self.creator, body='Desde el admin')
+        second = Message.objects.create(conversation=self.conversation, sender_user=self.volunteer, body='Respuesta')
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.last_message_id, second.id)
+
+        # Un post_save tardío del mensaje anterior (otro envío concurrente) no hace retroceder el último mensaje.
+        register_message(Message, first, created=True, using='default')
+        self.conversation.refresh_from_db()
+        self.assertEqual((self.conversation.last_message_id, self.conversation.last_message_preview), (second.id, 'Respuesta'))
+
+    def test_unread_count_respects_read_pointer(self):
+        first = self.send(self.volunteer, 'Hola')
+        self.send(self.volunteer, 'Sigues ahí?')
+        ConversationReadState.objects.create(
+            conversation=self.conversation,
+            user=self.creator,
+            last_read_message_id=first['id'],
+        )
+
+        self.client.force_authenticate(self.creator)
+        response = self.client.get('/api/conversations')
+        self.assertEqual(response.data['results'][0]['unread_count'], 1)
+
+        self.client.force_authenticate(self.volunteer)
+        response = self.client.get('/api/conversations')
+        self.assertEqual(response.data['results'][0]['unread_count'], 0)
+
+    def test_read_pointer_advances_when_last_message_was_never_filled(self):
+        message = Message.objects.create(conversation=self.conversation, sender_user=self.volunteer, body='Antiguo')
+        Conversation.objects.filter(id=self.conversation.id).update(last_message_id=None, last_message_at=None)
+
+        self.client.force_authenticate(self.creator)
+        response = self.client.post(f'/api/conversations/{self.conversation.id}/read', {}, format='json')
+        self.assertEqual(response.data['last_read_message_id'], message.id)
+        self.assertEqual(self.client.get('/api/conversations/unread').data['unread_count'], 0)
+
+    def test_non_participant_inbox_is_empty(self):
+        self.send(self.volunteer, 'Hola')
+        self.client.force_authenticate(self.other)
+        response = self.client.get('/api/conversations')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 0)
+
+    def test_mark_read_is_idempotent_and_updates_unread_total(self):
+        first = self.send(self.volunteer, 'Hola')
+        last = self.send(self.volunteer, 'Llego a las cinco')
+
+        self.client.force_authenticate(self.creator)
+        response = self.client.get('/api/conversations/unread')
+        self.assertEqual(response.data['unread_count'], 2)
+
+        response = self.client.post(f'/api/conversations/{self.conversation.id}/read', {'message_id': first['id']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['last_read_message_id'], first['id'])
+
+        for _ in range(2):
+            response = self.client.post(f'/api/conversations/{self.conversation.id}/read', {}, format='json')
+            self.assertEqual(response.data['last_read_message_id'], last['id'])
+        self.assertEqual(ConversationReadState.objects.filter(conversation=self.conversation, user=self.creator).count(), 1)
+
+        response = self.client.post(f'/api/conversations/{self.conversation.id}/read', {'message_id': first['id']}, format='json')
+        self.assertEqual(response.data['last_read_message_id'], last['id'])
+
+        response = self.client.get('/api/conversations/unread')
+        self.assertEqual(response.data['unread_count'], 0)
+
+        response = self.client.get(f'/api/conversations/{self.conversation.id}/messages')
+        self.assertEqual(response.data['last_read_message_id'], last['id'])
+
+    def test_non_participant_cannot_mark_read(self):
+        self.send(self.volunteer, 'Hola')
+        self.client.force_authenticate(self.other)
+        response = self.client.post(f'/api/conversations/{self.conversation.id}/read', {}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class ConversationArchiveTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.community = Community.objects.create(name='Obanos')
+        self.creator = User.objects.create_user(username='creator5@example.com', email='creator5@example.com', password='Pass1234!')
+        self.volunteer = User.objects.create_user(username='vol5@example.com', email='vol5@example.com', password='Pass1234!')
+        for user in (self.creator, self.volunteer):
+            Membership.objects.create(user=user, community=self.community, status=Membership.Status.APPROVED)
+        self.request = Request.objects.create(
+            community=self.community,
+            created_by_user=self.creator,
+            title='Archivo',
+            description='Archivo',
+            category='general',
+            status=Request.Status.RESOLVED,
+            closed_at=timezone.now() - timedelta(days=120),
+        )
+        offer = VolunteerOffer.objects.create(
+            request=self.request,
+            volunteer_user=self.volunteer,
+            status=VolunteerOffer.Status.ACCEPTED,
+        )
+        self.request.accepted_offer = offer
+        self.request.save(update_fields=['accepted_offer'])
+        self.conversation = Conversation.objects.create(request=self.request)
+        for index in range(12):
+            sender = self.creator if index % 2 else self.volunteer
+            Message.objects.create(conversation=self.conversation, sender_user=sender, body=f'Mensaje {index}')
+
+    def test_compaction_moves_messages_and_history_is_served_transparently(self):
+        call_command('compact_conversations', '--days', '90', stdout=StringIO())
+
+        self.assertFalse(Message.objects.filter(conversation=self.conversation).exists())
+        archive = ConversationArchive.objects.get(conversation=self.conversation)
+        self.assertEqual(archive.message_count, 12)
+
+        self.client.force_authenticate(self.creator)
+        self.client.post(f'/api/conversations/{self.conversation.id}/messages', {'body': 'Gracias otra vez'}, format='json')
+
+        response = self.client.get(f'/api/conversations/{self.conversation.id}/messages', {'page_size': 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 13)
+        bodies = [row['body'] for row in response.data['results']]
+        self.assertEqual(bodies[0], 'Gracias otra vez')
+        self.assertEqual(bodies[1:], [f'Mensaje {index}' for index in range(11, 2, -1)])
+
+        response = self.client.get(f'/api/conversations/{self.conversation.id}/messages', {'page_size': 10, 'page': 2})
+        self.assertEqual([row['body'] for row in response.data['results']], ['Mensaje 2', 'Mensaje 1', 'Mensaje 0'])
+        self.assertEqual(response.data['results'][0]['sender_user_id'], self.volunteer.id)
+
+        call_command('compact_conversations', '--days', '90', stdout=StringIO())
+        archive.refresh_from_db()
+        self.assertEqual(archive.message_count, 13)
+        self.assertEqual(list(archive.chunks.order_by('id').values_list('message_count', flat=True)), [12, 1])
+
+        response = self.client.get(f'/api/conversations/{self.conversation.id}/messages', {'page_size': 10})
+        self.assertEqual(response.data['count'], 13)
+        self.assertEqual(
+            [row['body'] for row in response.data['results']],
+            ['Gracias otra vez'] + [f'Mensaje {index}' for index in range(11, 2, -1)],
+        )
+
+    def test_recent_conversations_are_not_compacted(self):
+        call_command('compact_conversations', '--days', '180', stdout=StringIO())
+        self.assertEqual(Message.objects.filter(conversation=self.conversation).count(), 12)
+        self.assertFalse(ConversationArchive.objects.exists())
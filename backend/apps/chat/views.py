@@ -1,11 +1,16 @@
-﻿from django.shortcuts import get_object_or_404
+﻿from django.db.models import Count, Exists, F, IntegerField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from drf_spectacular.utils import extend_schema
-from apps.chat.models import Conversation, Message
-from apps.chat.serializers import MessageSerializer
-from apps.core.permissions import has_approved_membership, is_superadmin
+from apps.chat.archive import MessageHistory
+from apps.chat.models import Conversation, ConversationArchive, ConversationReadState, Message
+from apps.chat.serializers import ConversationReadSerializer, ConversationSummarySerializer, MessageSerializer
+from apps.core.openapi import extend_schema
+from apps.core.permissions import approved_membership_exists, is_superadmin
+from apps.core.shards import count_across_shards, sharded_results
 from apps.requests.models import Request
 from apps.core.pagination import StandardResultsPagination
 
@@ -19,22 +24,153 @@ def is_participant(user, request_obj):
     return accepted_offer is not None and accepted_offer.volunteer_user_id == user.id
 
 
+def last_read_subquery(user):
+    last_read = ConversationReadState.objects.filter(
+        conversation=OuterRef('pk'),
+        user=user,
+    ).values('last_read_message_id')[:1]
+    return Coalesce(Subquery(last_read), 0)
+
+
+def conversations_with_access(user):
+    return Conversation.objects.select_related('request', 'request__accepted_offer').annotate(
+        is_community_member=approved_membership_exists(user, 'request__community_id'),
+        last_read_message_id=last_read_subquery(user),
+        has_archive=Exists(ConversationArchive.objects.filter(conversation=OuterRef('pk'))),
+    )
+
+
+def get_conversation_with_access(user, conversation_id):
+    return get_object_or_404(conversations_with_access(user), id=conversation_id)
+
+
+def conversation_access_error(user, conversation):
+    if not (is_superadmin(user) or conversation.is_community_member):
+        return 'No perteneces a la comunidad.'
+    if not is_participant(user, conversation.request):
+        return 'Acceso denegado.'
+    return None
+
+
+def conversation_messages(conversation):
+    return Message.objects.filter(conversation=conversation).order_by('-created_at')
+
+
+def participant_conversations(user):
+    return Conversation.objects.filter(
+        Q(request__created_by_user=user) | Q(request__accepted_offer__volunteer_user=user)
+    )
+
+
+def annotate_unread_count(queryset, user):
+    unread = (
+        Message.objects.filter(conversation=OuterRef('pk'), id__gt=OuterRef('last_read_message_id'))
+        .exclude(sender_user=user)
+        .order_by()
+        .values('conversation')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return queryset.annotate(
+        last_read_message_id=last_read_subquery(user),
+    ).annotate(
+        unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0),
+    )
+
+
+def unread_messages_total(user):
+    last_read = ConversationReadState.objects.filter(
+        conversation=OuterRef('conversation'),
+        user=user,
+    ).values('last_read_message_id')[:1]
+    return count_across_shards(
+        Message.objects.filter(conversation__in=participant_conversations(user).values('id'))
+        .exclude(sender_user=user)
+        .filter(id__gt=Coalesce(Subquery(last_read), 0))
+    )
+
+
+def inbox_sort_key(conversation):
+    return (conversation.last_message_at is not None, conversation.last_message_at or 0, conversation.id)
+
+
+def get_last_read_message_id(conversation, user):
+    last_read = (
+        ConversationReadState.objects.filter(conversation=conversation, user=user)
+        .values_list('last_read_message_id', flat=True)
+        .first()
+    )
+    return last_read or 0
+
+
+def advance_read_pointer(conversation, user, message_id):
+    updated = ConversationReadState.objects.filter(conversation=conversation, user=user).update(
+        last_read_message_id=Greatest(F('last_read_message_id'), Value(message_id)),
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        ConversationReadState.objects.get_or_create(
+            conversation=conversation,
+            user=user,
+            defaults={'last_read_message_id': message_id},
+        )
+    return get_last_read_message_id(conversation, user)
+
+
+class ConversationListView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary='Bandeja de conversaciones',
+        description='Lista las conversaciones del usuario (creador o voluntario aceptado) con el último mensaje y los no leídos.',
+        responses={200: ConversationSummarySerializer(many=True)},
+    )
+    def get(self, request):
+        conversations = annotate_unread_count(
+            participant_conversations(request.user).select_related('request'),
+            request.user,
+        ).order_by(F('last_message_at').desc(nulls_last=True), '-id')
+        paginator = StandardResultsPagination()
+        page = paginator.paginate_queryset(sharded_results(conversations, key=inbox_sort_key, reverse=True), request)
+        serializer = ConversationSummarySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ConversationUnreadView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary='Total de mensajes no leídos',
+        description='Devuelve el número de mensajes no leídos en todas las conversaciones del usuario.',
+    )
+    def get(self, request):
+        return Response({'unread_count': unread_messages_total(request.user)})
+
+
 class RequestConversationView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     @extend_schema(
         summary='Obtener conversación de una petición',
-        description='Devuelve conversation_id si el usuario es creador o voluntario aceptado.',
+        description='Devuelve conversation_id si el usuario es creador o voluntario aceptado. Es de solo lectura: la conversación se crea al aceptar la oferta.',
     )
     def get(self, request, request_id):
-        req = get_object_or_404(Request, id=request_id)
-        if not has_approved_membership(request.user, req.community_id):
+        req = get_object_or_404(
+            Request.objects.select_related('accepted_offer', 'conversation').annotate(
+                is_community_member=approved_membership_exists(request.user, 'community_id'),
+            ),
+            id=request_id,
+        )
+        if not (is_superadmin(request.user) or req.is_community_member):
             return Response({'detail': 'No perteneces a la comunidad.'}, status=status.HTTP_403_FORBIDDEN)
         if req.accepted_offer is None:
             return Response({'detail': 'No hay voluntario aceptado.'}, status=status.HTTP_400_BAD_REQUEST)
         if not is_participant(request.user, req):
             return Response({'detail': 'Acceso denegado.'}, status=status.HTTP_403_FORBIDDEN)
-        conversation, _ = Conversation.objects.get_or_create(request=req)
+        try:
+            conversation = req.conversation
+        except Conversation.DoesNotExist:
+            return Response({'detail': 'La conversación no existe.'}, status=status.HTTP_404_NOT_FOUND)
         return Response({'conversation_id': conversation.id})
 
 
@@ -43,24 +179,23 @@ class MessageListCreateView(APIView):
 
     @extend_schema(
         summary='Listar mensajes',
-        description='Devuelve mensajes paginados de una conversación. Solo participantes.',
+        description='Devuelve mensajes paginados de una conversación, incluido el historial archivado. Solo participantes.',
         responses={200: MessageSerializer(many=True)},
     )
     def get(self, request, conversation_id):
-        conversation = get_object_or_404(Conversation, id=conversation_id)
-        if not has_approved_membership(request.user, conversation.request.community_id):
-            return Response({'detail': 'No perteneces a la comunidad.'}, status=status.HTTP_403_FORBIDDEN)
-        if not is_participant(request.user, conversation.request):
-            return Response({'detail': 'Acceso denegado.'}, status=status.HTTP_403_FORBIDDEN)
-        messages = (
-            Message.objects.filter(conversation=conversation)
-            .select_related('sender_user', 'sender_user__profile')
-            .order_by('-created_at')
-        )
+        conversation = get_conversation_with_access(request.user, conversation_id)
+        error = conversation_access_error(request.user, conversation)
+        if error:
+            return Response({'detail': error}, status=status.HTTP_403_FORBIDDEN)
+        messages = conversation_messages(conversation)
+        if conversation.has_archive:
+            messages = MessageHistory(conversation, messages)
         paginator = StandardResultsPagination()
         page = paginator.paginate_queryset(messages, request)
         serializer = MessageSerializer(page, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        response = paginator.get_paginated_response(serializer.data)
+        response.data['last_read_message_id'] = conversation.last_read_message_id
+        return response
 
     @extend_schema(
         summary='Enviar mensaje',
@@ -69,9 +204,9 @@ class MessageListCreateView(APIView):
         responses={201: MessageSerializer},
     )
     def post(self, request, conversation_id):
-        conversation = get_object_or_404(Conversation, id=conversation_id)
+        conversation = get_conversation_with_access(request.user, conversation_id)
         req = conversation.request
-        if not has_approved_membership(request.user, req.community_id):
+        if not (is_superadmin(request.user) or conversation.is_community_member):
             return Response({'detail': 'No perteneces a la comunidad.'}, status=status.HTTP_403_FORBIDDEN)
         if not is_participant(request.user, req):
             return Response({'detail': 'Acceso denegado.'}, status=status.HTTP_403_FORBIDDEN)
@@ -84,4 +219,39 @@ class MessageListCreateView(APIView):
             sender_user=request.user,
             body=serializer.validated_data['body'],
         )
+        advance_read_pointer(conversation, request.user, message.id)
         return Response(MessageSerializer(message).data, status=status.HTTP_201_CREATED)
+
+
+class ConversationReadView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary='Marcar conversación como leída',
+        description='Avanza el puntero de lectura del usuario hasta message_id (o el último mensaje). Es idempotente.',
+        request=ConversationReadSerializer,
+    )
+    def post(self, request, conversation_id):
+        conversation = get_conversation_with_access(request.user, conversation_id)
+        if not (is_superadmin(request.user) or conversation.is_community_member):
+            return Response({'detail': 'No perteneces a la comunidad.'}, status=status.HTTP_403_FORBIDDEN)
+        if not is_participant(request.user, conversation.request):
+            return Response({'detail': 'Acceso denegado.'}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = ConversationReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Conversaciones anteriores a last_message_id (o sin él rellenado) se acotan con el último mensaje real.
+        last_message_id = (
+            conversation.last_message_id
+            or Message.objects.filter(conversation=conversation).aggregate(last=Max('id'))['last']
+            or 0
+        )
+        message_id = min(serializer.validated_data.get('message_id', last_message_id), last_message_id)
+
+        last_read_message_id = advance_read_pointer(conversation, request.user, message_id)
+        return Response(
+            {
+                'conversation_id': conversation.id,
+                'last_read_message_id': last_read_message_id,
+            }
+        )
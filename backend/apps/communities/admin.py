@@ -4,8 +4,10 @@ from apps.communities.models import Community, Membership
 
 @admin.register(Community)
 class CommunityAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'created_at')
+    list_display = ('id', 'name', 'shard', 'created_at')
     search_fields = ('name',)
+    # Cambiar de shard exige mover los datos: manage.py move_community_shard.
+    readonly_fields = ('shard',)
 
 
 @admin.register(Membership)
@@ -4,3 +4,8 @@
 class CommunitiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.communities'
+
+    def ready(self):
+        from apps.communities.signals import connect_signals
+
+        connect_signals()
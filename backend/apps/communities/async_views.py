@@ -0,0 +1,10 @@
+from apps.communities.directory import aget_directory
+from apps.communities.views import CommunityListView, directory_response
+from apps.core.async_api import async_api_view
+
+
+async def community_list_get(request):
+    return directory_response(request, await aget_directory())
+
+
+community_list = async_api_view(community_list_get, CommunityListView.as_view(), authenticate=False)
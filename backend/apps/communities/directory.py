@@ -0,0 +1,57 @@
+import hashlib
+import json
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from apps.communities.models import Community
+from apps.communities.serializers import CommunitySerializer
+from apps.core.routers import read_from_primary
+
+DIRECTORY_CACHE_KEY = 'communities:directory'
+DIRECTORY_CACHE_TIMEOUT = 300
+
+
+def directory_queryset():
+    return Community.objects.all().order_by('id')
+
+
+def serialize_directory(communities):
+    body = json.dumps(CommunitySerializer(communities, many=True).data, cls=DjangoJSONEncoder).encode('utf-8')
+    etag = '"{}"'.format(hashlib.sha256(body).hexdigest()[:32])
+    return {'body': body, 'etag': etag}
+
+
+def build_directory():
+    return serialize_directory(directory_queryset())
+
+
+def get_directory():
+    if not settings.API_CACHES_ENABLED:
+        return build_directory()
+    directory = cache.get(DIRECTORY_CACHE_KEY)
+    if directory is None:
+        with read_from_primary():
+            directory = build_directory()
+        cache.set(DIRECTORY_CACHE_KEY, directory, DIRECTORY_CACHE_TIMEOUT)
+    return directory
+
+
+async def aget_directory():
+    if not settings.API_CACHES_ENABLED:
+        return serialize_directory([community async for community in directory_queryset()])
+    directory = await cache.aget(DIRECTORY_CACHE_KEY)
+    if directory is None:
+        with read_from_primary():
+            directory = serialize_directory([community async for community in directory_queryset()])
+        await cache.aset(DIRECTORY_CACHE_KEY, directory, DIRECTORY_CACHE_TIMEOUT)
+    return directory
+
+
+def invalidate_directory(using=None, **kwargs):
+    # Tras el commit: antes, una lectura concurrente volvería a cachear el directorio sin el cambio.
+    if settings.API_CACHES_ENABLED:
+        transaction.on_commit(partial(cache.delete, DIRECTORY_CACHE_KEY), using=using)
@@ -0,0 +1,120 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+
+from apps.communities.models import Community
+from apps.core.db import stream
+from apps.core.shards import shard_aliases
+
+# En orden de dependencia; se borran en orden inverso.
+COMMUNITY_DATA = [
+    ('communities.Membership', 'community_id'),
+    ('requests.Request', 'community_id'),
+    ('requests.VolunteerOffer', 'request__community_id'),
+    ('loans.LoanItem', 'community_id'),
+    ('loans.LoanRequest', 'item__community_id'),
+    ('chat.Conversation', 'request__community_id'),
+    ('chat.Message', 'conversation__request__community_id'),
+    ('chat.ConversationReadState', 'conversation__request__community_id'),
+    ('chat.ConversationArchive', 'conversation__request__community_id'),
+    ('chat.ConversationArchiveChunk', 'archive__conversation__request__community_id'),
+    ('reports.Report', 'request__community_id'),
+]
+
+
+def community_querysets(community_id, alias):
+    for label, field in COMMUNITY_DATA:
+        model = apps.get_model(label)
+        yield model, model.objects.using(alias).filter(**{field: community_id}).order_by('pk')
+
+
+def copy_rows(model, queryset, alias, batch_size):
+    connection = connections[alias]
+    qn = connection.ops.quote_name
+    fields = model._meta.concrete_fields
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        qn(model._meta.db_table),
+        ', '.join(qn(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+
+    copied = 0
+    batch = []
+    with connection.cursor() as cursor:
+        for row in stream(queryset.values_list(*[field.attname for field in fields]), chunk_size=batch_size):
+            batch.append([field.get_db_prep_value(value, connection) for field, value in zip(fields, row)])
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                copied += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            copied += len(batch)
+    return copied
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve las membresías, peticiones, préstamos, chats y reportes de una comunidad a otro shard. '
+        'Mientras copia, las escrituras de esa comunidad responden 503.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('community_id', type=int)
+        parser.add_argument('target', help='Alias de BD destino (default o una clave de DJANGO_COMMUNITY_SHARDS)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--drain-seconds',
+            type=float,
+            default=5,
+            help='Espera tras bloquear las escrituras para que terminen las que ya estaban en curso',
+        )
+
+    def handle(self, *args, **options):
+        target = options['target']
+        if target not in shard_aliases():
+            raise CommandError(f'Shard desconocido: {target}. Disponibles: {", ".join(shard_aliases())}')
+
+        community = Community.objects.using(DEFAULT_DB_ALIAS).filter(id=options['community_id']).first()
+        if community is None:
+            raise CommandError(f'La comunidad {options["community_id"]} no existe.')
+        source = community.shard
+        if source == target:
+            raise CommandError(f'La comunidad {community.id} ya está en {target}.')
+
+        self.freeze(community, True)
+        time.sleep(options['drain_seconds'])
+        copied = {}
+        try:
+            with transaction.atomic(using=target):
+                # Restos de un intento anterior interrumpido: la comunidad aún no se lee de aquí.
+                for model, queryset in reversed(list(community_querysets(community.id, target))):
+                    queryset.delete()
+                for model, queryset in community_querysets(community.id, source):
+                    # Las filas conservan su pk, del bloque de IDs de otro shard: la secuencia de target no se toca.
+                    copied[model._meta.label] = copy_rows(model, queryset, target, options['batch_size'])
+            community.shard = target
+            community.writes_frozen = False
+            community.save(using=DEFAULT_DB_ALIAS, update_fields=['shard', 'writes_frozen'])
+        except IntegrityError as exc:
+            raise CommandError(
+                f'IDs en conflicto en {target}; ejecuta migrate en cada shard para reservar sus rangos de IDs. {exc}'
+            )
+        finally:
+            # Si la copia falla la comunidad sigue en su shard de origen: se desbloquea.
+            if community.writes_frozen:
+                self.freeze(community, False)
+
+        with transaction.atomic(using=source):
+            for model, queryset in reversed(list(community_querysets(community.id, source))):
+                queryset.delete()
+
+        for label, count in copied.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Comunidad {community.id} movida de {source} a {target}.'))
+
+    def freeze(self, community, frozen):
+        community.writes_frozen = frozen
+        Community.objects.using(DEFAULT_DB_ALIAS).filter(id=community.id).update(writes_frozen=frozen)
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+BASE_COMMUNITIES = [
+    ('Obanos', 'Comunidad local de Obanos para el MVP.'),
+    ('Com. Vecinos', 'Comunidad de vecinos para pruebas del MVP.'),
+]
+
+
+def create_base_communities(apps, schema_editor):
+    Community = apps.get_model('communities', 'Community')
+    for name, description in BASE_COMMUNITIES:
+        if not Community.objects.filter(name=name).exists():
+            Community.objects.create(name=name, description=description)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_base_communities, migrations.RunPython.noop),
+    ]
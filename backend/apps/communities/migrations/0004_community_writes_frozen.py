@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0003_community_shard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='writes_frozen',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -5,6 +5,10 @@ from django.db import models
 class Community(models.Model):
     name = models.CharField(max_length=120)
     description = models.CharField(max_length=500, blank=True)
+    # Alias de BD donde viven sus membresías, peticiones, préstamos, chats y reportes.
+    shard = models.CharField(max_length=64, default='default')
+    # Mientras move_community_shard copia sus datos, las escrituras de la comunidad responden 503.
+    writes_frozen = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -23,8 +27,8 @@ class Membership(models.Model):
         MEMBER = 'member', 'member'
         MODERATOR = 'moderator', 'moderator'
 
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    community = models.ForeignKey(Community, on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_constraint=False)
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, db_constraint=False)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.APPROVED)
     role_in_community = models.CharField(max_length=20, choices=Role.choices, default=Role.MEMBER)
     joined_at = models.DateTimeField(null=True, blank=True)
@@ -2,6 +2,7 @@
 from rest_framework import serializers
 
 from apps.communities.models import Community, Membership
+from apps.profiles.summaries import user_display_name
 
 
 class CommunitySerializer(serializers.ModelSerializer):
@@ -38,18 +39,7 @@ class CommunityMemberSerializer(serializers.ModelSerializer):
         )
 
     def get_display_name(self, obj):
-        user = getattr(obj, 'user', None)
-        if not user:
-            return ''
-
-        try:
-            profile = user.profile
-        except ObjectDoesNotExist:
-            profile = None
-
-        if profile and profile.display_name:
-            return profile.display_name
-        return user.email or f'Usuario {user.id}'
+        return user_display_name(getattr(obj, 'user', None), 'Usuario {id}')
 
     def get_bio(self, obj):
         user = getattr(obj, 'user', None)
@@ -0,0 +1,9 @@
+from django.db.models.signals import post_delete, post_save
+
+from apps.communities.directory import invalidate_directory
+from apps.communities.models import Community
+
+
+def connect_signals():
+    post_save.connect(invalidate_directory, sender=Community, dispatch_uid='communities_directory_save')
+    post_delete.connect(invalidate_directory, sender=Community, dispatch_uid='communities_directory_delete')
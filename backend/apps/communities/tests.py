@@ -1,9 +1,21 @@
-﻿from django.contrib.auth import get_user_model
-from django.test import TestCase
+﻿import json
+from io import StringIO
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, TestCase, override_settings
 from rest_framework.test import APIClient
 
+from apps.communities.directory import DIRECTORY_CACHE_KEY
 from apps.communities.models import Community, Membership
+from apps.core.routers import CommunityShardRouter
+from apps.core.shards import resolve_request_shard, route_request, shard_id_range, use_shard
 from apps.profiles.models import Profile
+from apps.reports.models import Report
+from apps.requests.models import Request
 
 User = get_user_model()
 
@@ -127,3 +139,181 @@ class CommunityMembersModerationTests(TestCase):
         self.assertEqual(response.status_code, 200)
         membership = Membership.objects.get(user=self.member_two, community=self.community)
         self.assertEqual(membership.role_in_community, Membership.Role.MODERATOR)
+
+
+@override_settings(API_CACHES_ENABLED=True)
+class CommunityDirectoryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_base_communities_exist_without_writes_on_read(self):
+        names = [row['name'] for row in self.client.get('/api/communities').json()]
+        self.assertIn('Obanos', names)
+        self.assertIn('Com. Vecinos', names)
+
+    def test_cached_directory_does_not_touch_the_database(self):
+        first = self.client.get('/api/communities')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('ETag', first)
+        self.assertIn('max-age', first['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/communities')
+        self.assertEqual(second.content, first.content)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get('/api/communities', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        for header in (f'W/{first["ETag"]}', f'"otra", {first["ETag"]}', '*'):
+            self.assertEqual(self.client.get('/api/communities', HTTP_IF_NONE_MATCH=header).status_code, 304)
+        self.assertEqual(self.client.get('/api/communities', HTTP_IF_NONE_MATCH='"otra"').status_code, 200)
+
+    def test_directory_is_invalidated_when_a_community_changes(self):
+        first = self.client.get('/api/communities')
+        with self.captureOnCommitCallbacks(execute=True):
+            community = Community.objects.create(name='Comunidad Nueva')
+
+        response = self.client.get('/api/communities')
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertIn('Comunidad Nueva', [row['name'] for row in response.json()])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            community.delete()
+        response = self.client.get('/api/communities')
+        self.assertNotIn('Comunidad Nueva', [row['name'] for row in response.json()])
+
+    def test_directory_is_not_invalidated_before_commit(self):
+        self.client.get('/api/communities')
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Community.objects.create(name='Comunidad Pendiente')
+            self.assertIsNotNone(cache.get(DIRECTORY_CACHE_KEY))
+        self.assertTrue(callbacks)
+
+    @override_settings(API_CACHES_ENABLED=False)
+    def test_directory_is_read_from_the_database_without_a_shared_cache(self):
+        first = self.client.get('/api/communities')
+        Community.objects.filter(name='Obanos').update(name='Obanos Renombrada')
+        response = self.client.get('/api/communities')
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertIn('Obanos Renombrada', [row['name'] for row in response.json()])
+        self.assertIsNone(cache.get(DIRECTORY_CACHE_KEY))
+
+
+@override_settings(COMMUNITY_SHARDS={'eu': {}})
+class CommunityShardRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.router = CommunityShardRouter()
+        self.local = Community.objects.create(name='Comunidad Local')
+        self.remote = Community.objects.create(name='Comunidad Norte', shard='eu')
+
+    def test_request_shard_comes_from_community_or_url_object(self):
+        self.assertEqual(resolve_request_shard(self.factory.get(f'/api/requests?community_id={self.remote.id}')), 'eu')
+        self.assertEqual(resolve_request_shard(self.factory.get(f'/api/requests?community_id={self.local.id}')), 'default')
+        self.assertEqual(resolve_request_shard(self.factory.get(f'/api/communities/{self.remote.id}/members')), 'eu')
+        self.assertEqual(resolve_request_shard(self.factory.get('/api/me')), 'default')
+
+        body = json.dumps({'community_id': self.remote.id, 'title': 'Norte'})
+        request = self.factory.post('/api/requests', body, content_type='application/json')
+        self.assertEqual(resolve_request_shard(request), 'eu')
+
+        cache.set('shard-locate:request_id:123', self.remote.id)
+        self.assertEqual(resolve_request_shard(self.factory.get('/api/requests/123/offers')), 'eu')
+
+    def test_shard_is_read_without_cache(self):
+        request = self.factory.get(f'/api/requests?community_id={self.local.id}')
+        self.assertEqual(resolve_request_shard(request), 'default')
+        # Como lo haría move_community_shard desde otro proceso: sin señales que invaliden nada en este.
+        Community.objects.filter(id=self.local.id).update(shard='eu')
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_request_shard(request), 'eu')
+
+    def test_router_keeps_global_models_in_default(self):
+        user = User(username='shard@example.com')
+        with use_shard('eu'):
+            self.assertEqual(self.router.db_for_read(Request), 'eu')
+            self.assertEqual(self.router.db_for_write(Membership), 'eu')
+            self.assertIsNone(self.router.db_for_read(User))
+            self.assertIsNone(self.router.db_for_read(Community))
+
+        remote_request = Request(community=self.remote)
+        remote_request._state.db = 'eu'
+        self.assertEqual(self.router.db_for_read(Report, instance=remote_request), 'eu')
+        self.assertEqual(self.router.db_for_read(User, instance=remote_request), 'default')
+        self.assertTrue(self.router.allow_relation(remote_request, user))
+
+        self.assertFalse(self.router.allow_migrate('eu', 'communities'))
+        self.assertTrue(self.router.allow_migrate('eu', 'chat'))
+        self.assertIsNone(self.router.allow_migrate('eu', 'auth', model_name='user'))
+
+    def test_writes_to_a_community_being_moved_are_rejected(self):
+        Community.objects.filter(id=self.remote.id).update(writes_frozen=True)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='frozen@example.com', password='Pass1234!'))
+
+        response = client.post('/api/requests', {'community_id': self.remote.id, 'title': 'Norte'}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertEqual(route_request(self.factory.get(f'/api/requests?community_id={self.remote.id}')), ('eu', False))
+
+    def test_each_database_has_its_own_id_block(self):
+        self.assertEqual(shard_id_range('default'), (1, 10**12))
+        self.assertEqual(shard_id_range('eu'), (10**12 + 1, 2 * 10**12))
+
+    def test_move_command_validates_target(self):
+        with self.assertRaisesMessage(CommandError, 'Shard desconocido'):
+            call_command('move_community_shard', self.local.id, 'us')
+        with self.assertRaisesMessage(CommandError, 'ya está en eu'):
+            call_command('move_community_shard', self.remote.id, 'eu')
+
+
+@skipUnless(settings.COMMUNITY_SHARDS, 'Requiere DJANGO_COMMUNITY_SHARDS con al menos un shard')
+class CommunityShardMoveTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.target = next(iter(settings.COMMUNITY_SHARDS))
+        self.community = Community.objects.create(name='Comunidad Viajera')
+        self.user = User.objects.create_user(username='shard-move@example.com', email='shard-move@example.com', password='Pass1234!')
+        Profile.objects.create(user=self.user, display_name='Viajera')
+        Membership.objects.create(user=self.user, community=self.community, status=Membership.Status.APPROVED)
+        self.request = Request.objects.create(community=self.community, created_by_user=self.user, title='Mover', description='Test')
+        Report.objects.create(reporter_user=self.user, request=self.request, reason=Report.Reason.OTHER)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_moved_community_is_served_from_its_shard(self):
+        call_command('move_community_shard', self.community.id, self.target, drain_seconds=0, stdout=StringIO())
+        self.assertFalse(Community.objects.get(id=self.community.id).writes_frozen)
+
+        self.assertFalse(Request.objects.using('default').filter(id=self.request.id).exists())
+        self.assertTrue(Request.objects.using(self.target).filter(id=self.request.id).exists())
+        self.assertEqual(Membership.objects.using(self.target).filter(community=self.community).count(), 1)
+
+        response = self.client.get(f'/api/requests?community_id={self.community.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.request.id])
+
+        response = self.client.get(f'/api/requests/{self.request.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['request']['created_by_display_name'], 'Viajera')
+
+        me = self.client.get('/api/me').data
+        self.assertIn(self.community.id, [row['community_id'] for row in me['communities']])
+
+        self.client.force_authenticate(User.objects.create_superuser(username='shard-root@example.com', password='Pass1234!'))
+        reports = self.client.get('/api/reports').data
+        self.assertEqual([row['request_id'] for row in reports['results']], [self.request.id])
+
+        with use_shard(self.target):
+            created = Request.objects.create(community=self.community, created_by_user=self.user, title='Nueva', description='Test')
+        low, high = shard_id_range(self.target)
+        self.assertTrue(low <= created.id <= high)
+        self.assertEqual(self.client.get(f'/api/requests/{created.id}').status_code, 200)
+
+        call_command('move_community_shard', self.community.id, 'default', drain_seconds=0, stdout=StringIO())
+        self.assertTrue(Request.objects.using('default').filter(id=self.request.id).exists())
@@ -1,40 +1,43 @@
-﻿from django.shortcuts import get_object_or_404
+﻿from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from drf_spectacular.utils import OpenApiParameter, extend_schema
+from django.utils.http import parse_etags
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.communities.directory import get_directory
 from apps.communities.models import Community, Membership
 from apps.communities.serializers import (
     CommunityMemberSerializer,
     CommunityMemberUpdateSerializer,
     CommunitySerializer,
 )
+from apps.core.openapi import OpenApiParameter, extend_schema
 from apps.core.pagination import StandardResultsPagination
 from apps.core.permissions import is_moderator_in_community, is_superadmin
-from apps.profiles.models import Profile
+from apps.core.shards import join_global, sharding_enabled
+from apps.profiles.models import get_profile_or_default
 
 
-def ensure_base_communities():
-    Community.objects.get_or_create(
-        name='Obanos',
-        defaults={'description': 'Comunidad local de Obanos para el MVP.'},
-    )
-    Community.objects.get_or_create(
-        name='Com. Vecinos',
-        defaults={'description': 'Comunidad de vecinos para pruebas del MVP.'},
-    )
+def etag_matches(request, etag):
+    # Comparación débil (RFC 9110): un proxy con gzip devuelve W/"...", y el cliente puede mandar varias.
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    return '*' in etags or etag in {tag.removeprefix('W/') for tag in etags}
 
 
-def can_manage_community(user, community_id):
-    return is_superadmin(user) or is_moderator_in_community(user, community_id)
+def directory_response(request, directory):
+    if etag_matches(request, directory['etag']):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = HttpResponse(directory['body'], content_type='application/json')
+    response['ETag'] = directory['etag']
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
 
 
-def get_default_display_name(user):
-    if user.email and '@' in user.email:
-        return user.email.split('@', 1)[0]
-    return f'Usuario {user.id}'
+def can_manage_community(user, community_id):
+    return is_superadmin(user) or is_moderator_in_community(user, community_id)
 
 
 class CommunityListView(APIView):
@@ -42,14 +45,11 @@ class CommunityListView(APIView):
 
     @extend_schema(
         summary='Listar comunidades',
-        description='Devuelve la lista de comunidades disponibles. En la demo incluye Obanos y Com. Vecinos.',
+        description='Devuelve la lista de comunidades disponibles (cacheada, con ETag). En la demo incluye Obanos y Com. Vecinos.',
         responses={200: CommunitySerializer(many=True)},
     )
     def get(self, request):
-        ensure_base_communities()
-        communities = Community.objects.all().order_by('id')
-        serializer = CommunitySerializer(communities, many=True)
-        return Response(serializer.data)
+        return directory_response(request, get_directory())
 
 
 class JoinCommunityView(APIView):
@@ -96,11 +96,11 @@ class CommunityMembersListView(APIView):
         if not can_manage_community(request.user, community.id):
             return Response({'detail': 'No tienes permisos de moderación en esta comunidad.'}, status=status.HTTP_403_FORBIDDEN)
 
-        memberships = (
-            Membership.objects.filter(community=community)
-            .select_related('user', 'user__profile')
-            .order_by('role_in_community', 'user__email')
-        )
+        memberships = join_global(Membership.objects.filter(community=community), 'user', 'user__profile')
+        if sharding_enabled():
+            memberships = sorted(memberships, key=lambda m: (m.role_in_community, m.user.email))
+        else:
+            memberships = memberships.order_by('role_in_community', 'user__email')
 
         paginator = StandardResultsPagination()
         page = paginator.paginate_queryset(memberships, request)
@@ -123,7 +123,7 @@ class CommunityMemberUpdateView(APIView):
             return Response({'detail': 'No tienes permisos de moderación en esta comunidad.'}, status=status.HTTP_403_FORBIDDEN)
 
         membership = get_object_or_404(
-            Membership.objects.select_related('user', 'user__profile'),
+            join_global(Membership.objects.all(), 'user', 'user__profile'),
             community=community,
             user_id=user_id,
         )
@@ -142,10 +142,7 @@ class CommunityMemberUpdateView(APIView):
         profile_fields_to_update = []
         profile = None
         if 'display_name' in validated or 'bio' in validated:
-            profile, _ = Profile.objects.get_or_create(
-                user=membership.user,
-                defaults={'display_name': get_default_display_name(membership.user)},
-            )
+            profile = get_profile_or_default(membership.user)
 
             if 'display_name' in validated:
                 profile.display_name = validated['display_name']
@@ -154,7 +151,9 @@ class CommunityMemberUpdateView(APIView):
                 profile.bio = validated['bio']
                 profile_fields_to_update.append('bio')
 
-            if profile_fields_to_update:
+            if profile.pk is None:
+                profile.save()
+            elif profile_fields_to_update:
                 profile.save(update_fields=profile_fields_to_update + ['updated_at'])
 
         membership_fields_to_update = []
@@ -1 +1,13 @@
-﻿
+﻿from django.contrib import admin
+from apps.core.models import SlowQueryPlan
+
+
+@admin.register(SlowQueryPlan)
+class SlowQueryPlanAdmin(admin.ModelAdmin):
+    list_display = ('id', 'created_at', 'view', 'database', 'duration_ms', 'fingerprint')
+    list_filter = ('database', 'view')
+    search_fields = ('view', 'sql')
+    readonly_fields = ('created_at', 'database', 'view', 'duration_ms', 'fingerprint', 'sql', 'plan', 'error')
+
+    def has_add_permission(self, request):
+        return False
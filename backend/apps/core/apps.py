@@ -4,3 +4,9 @@
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
+
+    def ready(self):
+        from apps.core import checks  # noqa: F401
+        from apps.core.signals import connect_signals
+
+        connect_signals()
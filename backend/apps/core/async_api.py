@@ -0,0 +1,52 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+
+from apps.core.authentication import JWTAuthentication
+
+JSON_DUMPS_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+def api_response(data, status_code=status.HTTP_200_OK):
+    return JsonResponse(data, status=status_code, safe=False, json_dumps_params=JSON_DUMPS_PARAMS)
+
+
+def error_response(detail, status_code):
+    return api_response({'detail': detail}, status_code)
+
+
+def exception_response(exc, authenticator):
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = api_response(data, exc.status_code)
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+        response['WWW-Authenticate'] = authenticator.authenticate_header(None)
+    return response
+
+
+# Vista Django asíncrona para el GET; el resto de métodos (POST, OPTIONS...) los atiende la vista DRF síncrona.
+def async_api_view(get, fallback, authenticate=True):
+    authenticator = JWTAuthentication()
+    sync_fallback = sync_to_async(fallback)
+
+    async def view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_fallback(request, *args, **kwargs)
+
+        api_request = Request(request)
+        try:
+            if authenticate:
+                result = await authenticator.aauthenticate(request)
+                if result is None:
+                    raise NotAuthenticated()
+                api_request.user, api_request.auth = result
+            return await get(api_request, *args, **kwargs)
+        except APIException as exc:
+            return exception_response(exc, authenticator)
+
+    view.sync_fallback = sync_fallback
+    if hasattr(fallback, 'view_class'):
+        view.view_class = fallback.view_class
+    return csrf_exempt(view)
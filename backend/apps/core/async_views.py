@@ -0,0 +1,10 @@
+from apps.core.async_api import api_response, async_api_view
+from apps.core.me import aget_me_payload
+from apps.core.views import MeView
+
+
+async def me_get(request):
+    return api_response(await aget_me_payload(request.user))
+
+
+me = async_api_view(me_get, MeView.as_view())
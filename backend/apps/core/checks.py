@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Caches propias de cada proceso: un cache.delete en un worker no llega a los demás.
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register()
+def check_api_caches_backend(app_configs, **kwargs):
+    if settings.API_CACHES_ENABLED and settings.CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES:
+        return [
+            Error(
+                'DJANGO_API_CACHES=1 necesita una cache compartida entre workers.',
+                hint='Configura DJANGO_CACHE_BACKEND con Redis o Memcached, o desactiva DJANGO_API_CACHES.',
+                obj='CACHES',
+                id='core.E001',
+            )
+        ]
+    return []
@@ -0,0 +1,38 @@
+from django.db import connections
+
+
+def active_pool(connection):
+    # No se usa connection.pool porque crearía el pool si todavía no existe.
+    return type(connection)._connection_pools.get(connection.alias)
+
+
+def pool_stats():
+    stats = {}
+    for connection in connections.all():
+        pool = active_pool(connection) if hasattr(type(connection), '_connection_pools') else None
+        if pool is None:
+            continue
+        stats[connection.alias] = {'timeout_s': pool.timeout, **pool.get_stats()}
+    return stats
+
+
+def close_pools():
+    for connection in connections.all():
+        connection.close()
+        if hasattr(type(connection), '_connection_pools') and active_pool(connection) is not None:
+            connection.close_pool()
+
+
+def stream(queryset, chunk_size=2000):
+    # Por bloques de pk en autocommit: no queda una transacción abierta entre bloques, las escrituras del bucle
+    # se confirman según avanza y un generador abandonado no deja nada a medias. Devuelve las filas en orden de pk.
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        chunk = list((pks if last_pk is None else pks.filter(pk__gt=last_pk))[:chunk_size])
+        if not chunk:
+            return
+        yield from queryset.filter(pk__in=chunk).order_by('pk')
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1]
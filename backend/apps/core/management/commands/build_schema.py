@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.schema import generate_schema, render_schema, schema_version, write_artifacts
+
+
+class Command(BaseCommand):
+    help = 'Genera el esquema OpenAPI de la versión actual (APP_VERSION) y lo guarda como artefacto YAML y JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=settings.API_SCHEMA_DIR)
+
+    def handle(self, *args, **options):
+        if not settings.API_SCHEMA_ENABLED:
+            raise CommandError('El esquema está desactivado. Ejecuta con DJANGO_API_SCHEMA=1.')
+        output_dir = options['output_dir']
+        if not output_dir:
+            raise CommandError('Indica --output-dir o define API_SCHEMA_DIR.')
+
+        paths = write_artifacts(output_dir, render_schema(generate_schema()))
+        for path in paths:
+            self.stdout.write(str(path))
+        self.stdout.write(self.style.SUCCESS(f'Esquema OpenAPI {schema_version()} generado.'))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.core.sqltags import group_by_view
+
+STATEMENTS_SQL = (
+    'SELECT query, calls, total_exec_time, rows FROM pg_stat_statements '
+    'WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) '
+    'ORDER BY total_exec_time DESC LIMIT %s'
+)
+
+
+class Command(BaseCommand):
+    help = 'Muestra las consultas con más tiempo total en pg_stat_statements agrupadas por la vista que las lanzó.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Alias de BD (default o un shard)')
+        parser.add_argument('--views', type=int, default=10, help='Número de vistas a mostrar')
+        parser.add_argument('--limit', type=int, default=5, help='Consultas por vista')
+        parser.add_argument('--app', help='Solo las vistas de esta app (p. ej. requests o loans)')
+        parser.add_argument('--scan', type=int, default=2000, help='Sentencias de pg_stat_statements a agrupar')
+        parser.add_argument('--reset', action='store_true', help='Pone a cero las estadísticas después del informe')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias not in connections:
+            raise CommandError(f'Alias de BD desconocido: {alias}')
+
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+            if cursor.fetchone() is None:
+                raise CommandError(
+                    f"pg_stat_statements no está instalado en {alias}: añade shared_preload_libraries = "
+                    "'pg_stat_statements' en postgresql.conf y ejecuta CREATE EXTENSION pg_stat_statements."
+                )
+            cursor.execute(STATEMENTS_SQL, [options['scan']])
+            groups = group_by_view(cursor.fetchall())
+            if options['reset']:
+                cursor.execute('SELECT pg_stat_statements_reset()')
+
+        if options['app']:
+            groups = [group for group in groups if group[1] == options['app']]
+        for view, app, total_ms, calls, statements in groups[: options['views']]:
+            self.stdout.write(self.style.SUCCESS(f'{view} ({app}): {total_ms:.1f} ms en {calls} llamadas'))
+            for statement_ms, statement_calls, rows, sql in statements[: options['limit']]:
+                text = ' '.join(sql.split())
+                self.stdout.write(f'  {statement_ms:10.1f} ms {statement_calls:8d} llamadas {rows:10d} filas  {text[:160]}')
@@ -0,0 +1,106 @@
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+TARGETS = {
+    'wsgi': 'config.wsgi',
+    'asgi': 'config.asgi',
+}
+THIRD_PARTY_PACKAGES = (
+    'django',
+    'rest_framework',
+    'rest_framework_simplejwt',
+    'drf_spectacular',
+    'corsheaders',
+    'psycopg',
+    'yaml',
+    'jwt',
+)
+# Importa la aplicación y resuelve el URLconf, que es lo que paga la primera petición de cada worker.
+STARTUP_SCRIPT = '''
+import time
+start = time.perf_counter()
+import {module}
+from django.urls import get_resolver
+get_resolver().url_patterns
+print((time.perf_counter() - start) * 1000)
+'''
+
+
+def parse_importtime(output):
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        modules.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return modules
+
+
+def package_for(name, packages):
+    for package in packages:
+        if name == package or name.startswith(package + '.'):
+            return package
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Mide el arranque en frío de config.wsgi/config.asgi y el coste de importación por paquete y app.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=[*TARGETS, 'all'], default='all')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument('--schema', choices=['on', 'off'], help='Fuerza DJANGO_API_SCHEMA en los procesos medidos.')
+
+    def run_startup(self, module, env, importtime=False):
+        command = [sys.executable]
+        if importtime:
+            command += ['-X', 'importtime']
+        command += ['-c', STARTUP_SCRIPT.format(module=module)]
+        result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f'No se pudo importar {module}:\n{result.stderr[-2000:]}')
+        return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+    def handle(self, *args, **options):
+        env = os.environ.copy()
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+        if options['schema']:
+            env['DJANGO_API_SCHEMA'] = '1' if options['schema'] == 'on' else '0'
+
+        local_apps = [app for app in settings.INSTALLED_APPS if app.startswith('apps.')]
+        packages = sorted([*THIRD_PARTY_PACKAGES, *local_apps, 'config'], key=len, reverse=True)
+        targets = TARGETS if options['target'] == 'all' else {options['target']: TARGETS[options['target']]}
+
+        for name, module in targets.items():
+            timings = [self.run_startup(module, env)[0] for _ in range(max(options['repeat'], 1))]
+            _, importtime = self.run_startup(module, env, importtime=True)
+            modules = parse_importtime(importtime)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{module} ({name})'))
+            self.stdout.write(
+                f'  Arranque: mediana {statistics.median(timings):.1f} ms, '
+                f'mín {min(timings):.1f} ms, máx {max(timings):.1f} ms en {len(timings)} arranques'
+            )
+
+            totals = defaultdict(int)
+            for module_name, self_us, _ in modules:
+                totals[package_for(module_name, packages) or 'otros'] += self_us
+            self.stdout.write('  Coste de importación por paquete (self, ms):')
+            for package, total in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+                self.stdout.write(f'    {package:<28} {total / 1000:8.1f}')
+
+            self.stdout.write('  Módulos más caros (acumulado, ms):')
+            for module_name, _, cumulative_us in sorted(modules, key=lambda item: item[2], reverse=True)[:options['top']]:
+                self.stdout.write(f'    {module_name:<50} {cumulative_us / 1000:8.1f}')
+
+        self.stdout.write(self.style.SUCCESS('Perfil de arranque completado.'))
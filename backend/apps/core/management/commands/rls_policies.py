@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from apps.core.rls import POLICY_NAME, policy_sql, rls_models
+from apps.core.shards import shard_aliases
+
+
+class Command(BaseCommand):
+    help = 'Crea, elimina o muestra las políticas RLS de aislamiento por comunidad (requiere DJANGO_DATABASE_RLS=1).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['enable', 'disable', 'status'])
+        parser.add_argument('--database', action='append', help='Alias de BD (por defecto default y todos los shards)')
+
+    def handle(self, *args, **options):
+        for alias in options['database'] or shard_aliases():
+            if alias not in connections:
+                raise CommandError(f'Alias de BD desconocido: {alias}')
+            connection = connections[alias]
+            if options['action'] == 'status':
+                self.status(connection)
+                continue
+
+            with transaction.atomic(using=alias), connection.cursor() as cursor:
+                for model in rls_models():
+                    table = connection.ops.quote_name(model._meta.db_table)
+                    cursor.execute(f'DROP POLICY IF EXISTS {POLICY_NAME} ON {table}')
+                    if options['action'] == 'enable':
+                        cursor.execute(f'ALTER TABLE {table} ENABLE ROW LEVEL SECURITY')
+                        # FORCE: el dueño de las tablas (el usuario de la app) también pasa por la política.
+                        cursor.execute(f'ALTER TABLE {table} FORCE ROW LEVEL SECURITY')
+                        cursor.execute(f'CREATE POLICY {POLICY_NAME} ON {table} USING ({policy_sql(model)})')
+                    else:
+                        cursor.execute(f'ALTER TABLE {table} NO FORCE ROW LEVEL SECURITY')
+                        cursor.execute(f'ALTER TABLE {table} DISABLE ROW LEVEL SECURITY')
+            self.stdout.write(self.style.SUCCESS(f'{alias}: políticas {"creadas" if options["action"] == "enable" else "eliminadas"}.'))
+            self.warn_if_bypassed(connection)
+
+    def status(self, connection):
+        with connection.cursor() as cursor:
+            for model in rls_models():
+                cursor.execute(
+                    'SELECT c.relrowsecurity, c.relforcerowsecurity, '
+                    'EXISTS (SELECT 1 FROM pg_policy p WHERE p.polrelid = c.oid AND p.polname = %s) '
+                    'FROM pg_class c WHERE c.oid = %s::regclass',
+                    [POLICY_NAME, model._meta.db_table],
+                )
+                enabled, forced, has_policy = cursor.fetchone()
+                self.stdout.write(
+                    f'{connection.alias} {model._meta.db_table}: rls={"on" if enabled else "off"} '
+                    f'force={"on" if forced else "off"} policy={"yes" if has_policy else "no"}'
+                )
+        self.warn_if_bypassed(connection)
+
+    def warn_if_bypassed(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT rolsuper OR rolbypassrls FROM pg_roles WHERE rolname = current_user')
+            if cursor.fetchone()[0]:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'{connection.alias}: el rol {connection.settings_dict["USER"]} es superusuario o tiene BYPASSRLS; '
+                        'Postgres no le aplica las políticas.'
+                    )
+                )
@@ -214,6 +214,9 @@ class Command(BaseCommand):
                     )
                     msg_created = created_at + timedelta(days=msg.get('days_after', 1))
                     Message.objects.filter(id=message.id).update(created_at=msg_created)
+                    Conversation.objects.filter(id=conversation.id, last_message_id=message.id).update(
+                        last_message_at=msg_created
+                    )
 
             return req
 
@@ -0,0 +1,25 @@
+import argparse
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.memory import format_memory_report, trace_memory
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta otro comando bajo tracemalloc y muestra el pico de memoria y los sitios que más reservan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, help='Número de sitios de reserva (por defecto DJANGO_MEMORY_TRACE_TOP)')
+        parser.add_argument('--frames', type=int, help='Marcos guardados por reserva (por defecto DJANGO_MEMORY_TRACE_FRAMES)')
+        parser.add_argument('command_name', help='Comando a medir, p. ej. seed_demo')
+        parser.add_argument('command_args', nargs=argparse.REMAINDER, help='Argumentos del comando medido')
+
+    def handle(self, *args, **options):
+        if options['command_name'] == 'trace_memory':
+            raise CommandError('trace_memory no puede medirse a sí mismo.')
+
+        with trace_memory(top=options['top'], frames=options['frames']) as report:
+            call_command(options['command_name'], *options['command_args'], stdout=self.stdout, stderr=self.stderr)
+        self.stdout.write(self.style.SUCCESS(f"{options['command_name']}: memoria"))
+        self.stdout.write(format_memory_report(report))
@@ -0,0 +1,125 @@
+from functools import partial
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+
+from apps.communities.models import Membership
+from apps.core.routers import read_from_primary
+from apps.core.shards import aacross_shards, across_shards, join_global
+
+ME_CACHE_TIMEOUT = 600
+COMMUNITIES_VERSION_KEY = 'me:communities_version'
+
+
+def me_cache_key(user_id, communities_version):
+    return f'me:{user_id}:{communities_version}'
+
+
+def get_communities_version():
+    version = cache.get(COMMUNITIES_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(COMMUNITIES_VERSION_KEY, version, None)
+    return version
+
+
+async def aget_communities_version():
+    version = await cache.aget(COMMUNITIES_VERSION_KEY)
+    if version is None:
+        version = 1
+        await cache.aadd(COMMUNITIES_VERSION_KEY, version, None)
+    return version
+
+
+def user_memberships(user):
+    if user.is_superuser:
+        return Membership.objects.none()
+    return join_global(Membership.objects.filter(user=user), 'community').order_by('community_id')
+
+
+def serialize_me_payload(user, memberships):
+    try:
+        display_name = user.profile.display_name
+    except ObjectDoesNotExist:
+        display_name = ''
+
+    return {
+        'id': user.id,
+        'email': user.email,
+        'display_name': display_name,
+        'is_superadmin': bool(user.is_superuser),
+        'all_communities': bool(user.is_superuser),
+        'communities': [
+            {
+                'community_id': m.community_id,
+                'community_name': m.community.name,
+                'status': m.status,
+                'role_in_community': m.role_in_community,
+            }
+            for m in sorted(memberships, key=attrgetter('community_id'))
+        ],
+    }
+
+
+def build_me_payload(user):
+    # Vista global: las membresías se leen de todos los shards.
+    return serialize_me_payload(user, across_shards(user_memberships(user)))
+
+
+def get_me_payload(user):
+    if not settings.API_CACHES_ENABLED:
+        with read_from_primary():
+            return build_me_payload(user)
+    key = me_cache_key(user.id, get_communities_version())
+    payload = cache.get(key)
+    if payload is None:
+        with read_from_primary():
+            payload = build_me_payload(user)
+        cache.set(key, payload, ME_CACHE_TIMEOUT)
+    return payload
+
+
+async def aget_me_payload(user):
+    if not settings.API_CACHES_ENABLED:
+        with read_from_primary():
+            return serialize_me_payload(user, await aacross_shards(user_memberships(user)))
+    key = me_cache_key(user.id, await aget_communities_version())
+    payload = await cache.aget(key)
+    if payload is None:
+        with read_from_primary():
+            payload = serialize_me_payload(user, await aacross_shards(user_memberships(user)))
+        await cache.aset(key, payload, ME_CACHE_TIMEOUT)
+    return payload
+
+
+def delete_me(user_id):
+    cache.delete(me_cache_key(user_id, get_communities_version()))
+
+
+def invalidate_me(user_id, using=None):
+    # Tras el commit: antes, una lectura concurrente volvería a cachear el payload sin el cambio.
+    if settings.API_CACHES_ENABLED:
+        transaction.on_commit(partial(delete_me, user_id), using=using)
+
+
+def invalidate_me_for_instance(sender, instance, using=None, **kwargs):
+    invalidate_me(instance.user_id, using)
+
+
+def invalidate_me_for_user(sender, instance, using=None, **kwargs):
+    invalidate_me(instance.pk, using)
+
+
+def bump_communities_version(using=None, **kwargs):
+    if settings.API_CACHES_ENABLED:
+        transaction.on_commit(incr_communities_version, using=using)
+
+
+def incr_communities_version():
+    try:
+        cache.incr(COMMUNITIES_VERSION_KEY)
+    except ValueError:
+        cache.set(COMMUNITIES_VERSION_KEY, 2, None)
@@ -0,0 +1,86 @@
+import os
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+
+IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', '<unknown>')
+APP_PATH = f'{os.sep}apps{os.sep}'
+MIB = 1024 * 1024
+
+
+class MemoryReport:
+    def __init__(self):
+        self.peak = 0
+        self.retained = 0
+        self.sites = []
+
+    def as_dict(self):
+        return {'peak_bytes': self.peak, 'retained_bytes': self.retained, 'sites': self.sites}
+
+
+def short_path(filename):
+    base = str(settings.BASE_DIR) + os.sep
+    return filename[len(base) :] if filename.startswith(base) else filename
+
+
+def app_frame(traceback):
+    # El marco más interno del código de la app (serializer, vista, queryset) es el que interesa; si no hay, el más interno.
+    for frame in reversed(traceback):
+        if APP_PATH in frame.filename:
+            return frame
+    return traceback[-1]
+
+
+def allocation_sites(snapshot, baseline, top):
+    filters = [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES]
+    snapshot = snapshot.filter_traces(filters)
+    baseline = baseline.filter_traces(filters)
+    sites = []
+    # compare_to ordena por el valor absoluto de la diferencia: lo liberado se descarta antes de quedarse con los top.
+    grown = [stat for stat in snapshot.compare_to(baseline, 'traceback') if stat.size_diff > 0]
+    grown.sort(key=lambda stat: stat.size_diff, reverse=True)
+    for stat in grown[:top]:
+        frame = app_frame(stat.traceback)
+        sites.append(
+            {
+                'bytes': stat.size_diff,
+                'blocks': stat.count_diff,
+                'site': f'{short_path(frame.filename)}:{frame.lineno}',
+                'traceback': [f'{short_path(frame.filename)}:{frame.lineno}' for frame in stat.traceback],
+            }
+        )
+    return sites
+
+
+@contextmanager
+def trace_memory(top=None, frames=None):
+    # tracemalloc es global al proceso: con varios hilos por worker se mezclan las reservas de otras peticiones.
+    report = MemoryReport()
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames or settings.MEMORY_TRACE_FRAMES)
+    else:
+        tracemalloc.reset_peak()
+    baseline_size = tracemalloc.get_traced_memory()[0]
+    baseline = tracemalloc.take_snapshot()
+    try:
+        yield report
+    finally:
+        # Lo que sigue vivo al final (p. ej. response.data y el cuerpo renderizado) se atribuye a su sitio de reserva.
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started:
+            tracemalloc.stop()
+        report.peak = max(peak - baseline_size, 0)
+        report.retained = max(current - baseline_size, 0)
+        report.sites = allocation_sites(snapshot, baseline, top or settings.MEMORY_TRACE_TOP)
+
+
+def format_memory_report(report):
+    lines = [f'Pico: {report.peak / MIB:.2f} MiB, retenido al final: {report.retained / MIB:.2f} MiB']
+    for site in report.sites:
+        lines.append(f"  {site['bytes'] / MIB:8.2f} MiB {site['blocks']:8d} bloques  {site['site']}")
+        if site['traceback'][-1] != site['site']:
+            lines.append(f"{'':31}reservado en {site['traceback'][-1]}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,142 @@
+import hmac
+import os
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+from prometheus_client.exposition import CONTENT_TYPE_LATEST
+
+from apps.core.middleware import HybridMiddleware
+from apps.core.viewnames import view_label
+
+INF = float('inf')
+
+# Con PROMETHEUS_MULTIPROC_DIR cada worker escribe sus valores en ficheros mmap y /api/metrics los suma.
+REQUEST_SECONDS = Histogram(
+    'api_request_duration_seconds',
+    'Tiempo total de la petición',
+    ['view', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, INF),
+)
+DB_SECONDS = Histogram(
+    'api_request_db_seconds',
+    'Tiempo en BD por petición',
+    ['view'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, INF),
+)
+QUERIES = Histogram(
+    'api_request_queries',
+    'Consultas SQL por petición',
+    ['view'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, INF),
+)
+ROWS = Histogram(
+    'api_request_db_rows',
+    'Filas devueltas o afectadas por petición',
+    ['view'],
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, INF),
+)
+RESPONSE_BYTES = Histogram(
+    'api_response_size_bytes',
+    'Tamaño del cuerpo de la respuesta',
+    ['view'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, INF),
+)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('db_seconds', 'queries', 'rows')
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+
+
+def begin_request():
+    return _current.set(RequestMetrics())
+
+
+def end_request(token):
+    metrics = _current.get()
+    _current.reset(token)
+    return metrics
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_seconds += time.perf_counter() - start
+        metrics.queries += 1
+        metrics.rows += max(context['cursor'].rowcount, 0)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def response_size(response):
+    if response.streaming:
+        return int(response.get('Content-Length') or 0)
+    return len(response.content)
+
+
+def observe(request, response, metrics, seconds):
+    view = view_label(request)
+    REQUEST_SECONDS.labels(view=view, status=str(response.status_code)).observe(seconds)
+    DB_SECONDS.labels(view=view).observe(metrics.db_seconds)
+    QUERIES.labels(view=view).observe(metrics.queries)
+    ROWS.labels(view=view).observe(metrics.rows)
+    RESPONSE_BYTES.labels(view=view).observe(response_size(response))
+
+
+class MetricsMiddleware(HybridMiddleware):
+    # El más externo: mide la petición completa, incluidas las consultas de los demás middlewares.
+    def handle(self, request):
+        token = begin_request()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics = end_request(token)
+        observe(request, response, metrics, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        token = begin_request()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics = end_request(token)
+        observe(request, response, metrics, time.perf_counter() - start)
+        return response
+
+
+def metrics_registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    # Sin token solo se sirve en DEBUG: las etiquetas de vista y los volúmenes no deben quedar públicos.
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        return HttpResponse(status=403)
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=403)
+    return HttpResponse(generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST)
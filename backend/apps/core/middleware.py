@@ -0,0 +1,224 @@
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+
+from apps.core.nplusone import begin_collecting, end_collecting, report
+from apps.core.profiling import acquire_slot, authorized, profile_call, profiling_mode
+from apps.core.rls import begin_request, end_request, rls_enabled, use_rls_user
+from apps.core.routers import replica_alias, use_replica
+from apps.core.sampling import ensure_sampler, track_request, untrack_request
+from apps.core.shards import route_request, sharding_enabled, use_shard
+from apps.core.sqltags import begin_request as begin_sql_tags, end_request as end_sql_tags
+from apps.core.viewnames import view_label
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+FROZEN_RETRY_AFTER = 30
+
+
+def client_pin_keys(request):
+    keys = [f"replica-pin:ip:{request.META.get('REMOTE_ADDR', '')}"]
+    authorization = request.headers.get('Authorization')
+    if authorization:
+        keys.append('replica-pin:auth:' + hashlib.sha256(authorization.encode('utf-8')).hexdigest())
+    return keys
+
+
+def pin_key_for_writes(request):
+    return client_pin_keys(request)[-1]
+
+
+def frozen_response():
+    response = JsonResponse({'detail': 'La comunidad se está moviendo de shard; reinténtalo en unos minutos.'}, status=503)
+    response['Retry-After'] = str(FROZEN_RETRY_AFTER)
+    return response
+
+
+class HybridMiddleware:
+    # Vale para la pila WSGI y la ASGI: las subclases implementan handle() para la síncrona y __acall__ para la asíncrona.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class SqlCommentMiddleware(HybridMiddleware):
+    # Cada consulta de la petición lleva delante /* view=... app=... */ para localizarla en pg_stat_statements.
+    def handle(self, request):
+        token = begin_sql_tags(request)
+        try:
+            return self.get_response(request)
+        finally:
+            end_sql_tags(token)
+
+    async def __acall__(self, request):
+        token = begin_sql_tags(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            end_sql_tags(token)
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    # Las lecturas seguras de /api/ van a la réplica salvo que el cliente haya escrito hace menos de REPLICA_PIN_SECONDS.
+    def routes_to_replica(self, request):
+        return bool(replica_alias()) and request.method in SAFE_METHODS and request.path.startswith('/api/')
+
+    def pin_after_write(self, request, response):
+        if replica_alias() and request.method not in SAFE_METHODS and response.status_code < 400:
+            return pin_key_for_writes(request)
+        return None
+
+    def handle(self, request):
+        replica = self.routes_to_replica(request) and not cache.get_many(client_pin_keys(request))
+        with use_replica(replica):
+            response = self.get_response(request)
+        key = self.pin_after_write(request, response)
+        if key:
+            cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        replica = self.routes_to_replica(request) and not await cache.aget_many(client_pin_keys(request))
+        with use_replica(replica):
+            response = await self.get_response(request)
+        key = self.pin_after_write(request, response)
+        if key:
+            await cache.aset(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+
+class CommunityShardMiddleware(HybridMiddleware):
+    # Fija el shard de la petición a partir de community_id (URL, query o cuerpo) o del objeto de la URL,
+    # y rechaza las escrituras de una comunidad que se está moviendo de shard.
+    def handle(self, request):
+        if not sharding_enabled():
+            return self.get_response(request)
+
+        shard, frozen = route_request(request)
+        if frozen:
+            return frozen_response()
+        with use_shard(shard):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not sharding_enabled():
+            return await self.get_response(request)
+
+        shard, frozen = await sync_to_async(route_request)(request)
+        if frozen:
+            return frozen_response()
+        with use_shard(shard):
+            return await self.get_response(request)
+
+
+class RowLevelSecurityMiddleware(HybridMiddleware):
+    # Con RLS cada petición empieza sin acceso; el usuario lo fija la autenticación JWT o, para la sesión de
+    # Django (admin), process_view. Las conexiones lo aplican en su siguiente consulta (apps.core.rls).
+    def handle(self, request):
+        if not rls_enabled():
+            return self.get_response(request)
+
+        token = begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            end_request(token)
+
+    async def __acall__(self, request):
+        if not rls_enabled():
+            return await self.get_response(request)
+
+        token = begin_request()
+        try:
+            return await self.get_response(request)
+        finally:
+            end_request(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Aquí AuthenticationMiddleware ya ha resuelto la sesión; con JWT request.user es anónimo y no se toca nada.
+        user = getattr(request, 'user', None)
+        if rls_enabled() and user is not None and user.is_authenticated:
+            use_rls_user(user)
+        return None
+
+
+class ProfilingMiddleware(HybridMiddleware):
+    # Con X-Profile: 1 o memory (o ?_profile=) y token de superadmin la petición se ejecuta bajo cProfile o tracemalloc.
+    def handle(self, request):
+        mode = profiling_mode(request)
+        if mode is None or not authorized(request):
+            return self.get_response(request)
+
+        if not acquire_slot():
+            response = self.get_response(request)
+            response['X-Profile-Skipped'] = 'rate-limited'
+            return response
+        return profile_call(self.get_response, request, mode)
+
+    async def __acall__(self, request):
+        # cProfile solo ve el hilo que lo activa; en el bucle de eventos mezclaría peticiones concurrentes.
+        return await self.get_response(request)
+
+
+class SamplingMiddleware(HybridMiddleware):
+    # Marca el hilo como "atendiendo esta petición" para que el muestreador agrupe sus pilas por vista.
+    def handle(self, request):
+        ensure_sampler()
+        thread_id = track_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            untrack_request(thread_id)
+
+    async def __acall__(self, request):
+        # En el bucle de eventos se intercalan peticiones: un hilo no identifica a una vista.
+        return await self.get_response(request)
+
+
+class NPlusOneMiddleware(HybridMiddleware):
+    # Agrupa los SELECT de la petición por forma; los que se repiten se avisan en el log y en X-NPlusOne.
+    def handle(self, request):
+        if not settings.NPLUSONE_DETECTION:
+            return self.get_response(request)
+
+        token = begin_collecting()
+        try:
+            response = self.get_response(request)
+        finally:
+            collector = end_collecting(token)
+        return self.flag(request, response, collector)
+
+    async def __acall__(self, request):
+        if not settings.NPLUSONE_DETECTION:
+            return await self.get_response(request)
+
+        token = begin_collecting()
+        try:
+            response = await self.get_response(request)
+        finally:
+            collector = end_collecting(token)
+        return self.flag(request, response, collector)
+
+    def flag(self, request, response, collector):
+        findings = collector.findings()
+        if findings:
+            response['X-NPlusOne'] = str(len(findings))
+            report(view_label(request), findings)
+        return response
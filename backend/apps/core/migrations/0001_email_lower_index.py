@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+DUPLICATES_SHOWN = 20
+
+
+def check_duplicate_emails(apps, schema_editor):
+    # El índice fallaría con un error poco claro: mejor listar antes los emails que chocan sin mayúsculas.
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.using(schema_editor.connection.alias)
+        .exclude(email='')
+        .values(email_lower=Lower('email'))
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .order_by('email_lower')
+        .values_list('email_lower', 'total')
+    )
+    if duplicates:
+        listing = '\n'.join(f'  {email} ({total} usuarios)' for email, total in duplicates[:DUPLICATES_SHOWN])
+        raise RuntimeError(
+            f'Hay {len(duplicates)} emails repetidos sin distinguir mayúsculas; '
+            f'unifícalos o cámbialos antes de crear auth_user_email_lower_uniq:\n{listing}'
+        )
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción; así no bloquea las escrituras en auth_user.
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            sql=[
+                # Un intento anterior interrumpido deja el índice INVALID: se descarta antes de crearlo de nuevo.
+                'DROP INDEX CONCURRENTLY IF EXISTS auth_user_email_lower_uniq;',
+                "CREATE UNIQUE INDEX CONCURRENTLY auth_user_email_lower_uniq ON auth_user (NULLIF(LOWER(email), ''));",
+            ],
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS auth_user_email_lower_uniq;',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_email_lower_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQueryPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('database', models.CharField(max_length=64)),
+                ('view', models.CharField(blank=True, max_length=200)),
+                ('duration_ms', models.FloatField()),
+                ('fingerprint', models.CharField(db_index=True, max_length=40)),
+                ('sql', models.TextField()),
+                ('plan', models.JSONField(blank=True, null=True)),
+                ('error', models.CharField(blank=True, max_length=500)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
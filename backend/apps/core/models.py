@@ -1 +1,18 @@
-﻿
+﻿from django.db import models
+
+
+class SlowQueryPlan(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    database = models.CharField(max_length=64)
+    view = models.CharField(max_length=200, blank=True)
+    duration_ms = models.FloatField()
+    fingerprint = models.CharField(max_length=40, db_index=True)
+    sql = models.TextField()
+    plan = models.JSONField(null=True, blank=True)
+    error = models.CharField(max_length=500, blank=True)
+
+    class Meta:
+        ordering = ('-created_at',)
+
+    def __str__(self):
+        return f'{self.view or "-"} ({self.duration_ms:.0f} ms)'
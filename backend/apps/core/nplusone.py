@@ -0,0 +1,146 @@
+import logging
+import re
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from apps.core.memory import APP_PATH, short_path
+from apps.core.sqltags import split_tag
+
+logger = logging.getLogger(__name__)
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+\b')
+SELECT_LIST = re.compile(r'^SELECT .*? FROM ', re.DOTALL)
+# Marcos de la propia instrumentación: el sitio que interesa es el serializer o la vista que disparó la consulta.
+INSTRUMENTATION_MODULES = (
+    'apps.core.nplusone',
+    'apps.core.metrics',
+    'apps.core.sqltags',
+    'apps.core.slowqueries',
+    'apps.core.profiling',
+    'apps.core.rls',
+)
+
+_collector = ContextVar('nplusone_collector', default=None)
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+class QueryCollector:
+    def __init__(self):
+        self.counts = Counter()
+        self.sites = {}
+
+    def add(self, fingerprint, site):
+        self.counts[fingerprint] += 1
+        self.sites.setdefault(fingerprint, Counter())[site] += 1
+
+    def findings(self, threshold=None):
+        threshold = threshold or settings.NPLUSONE_THRESHOLD
+        return [
+            {'sql': fingerprint, 'count': count, 'sites': self.sites[fingerprint].most_common(3)}
+            for fingerprint, count in self.counts.most_common()
+            if count >= threshold
+        ]
+
+
+def fingerprint(sql):
+    sql = IN_LIST.sub('IN (...)', split_tag(sql)[2])
+    sql = STRING_LITERAL.sub('?', sql)
+    return NUMBER_LITERAL.sub('?', sql)
+
+
+def call_site():
+    frame = sys._getframe(2)
+    while frame is not None:
+        if APP_PATH in frame.f_code.co_filename and frame.f_globals.get('__name__') not in INSTRUMENTATION_MODULES:
+            return f'{short_path(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})'
+        frame = frame.f_back
+    return '?'
+
+
+def record_query(execute, sql, params, many, context):
+    collector = _collector.get()
+    if collector is not None and isinstance(sql, str) and not many:
+        query = split_tag(sql)[2]
+        if query.lstrip()[:6].upper() == 'SELECT':
+            collector.add(fingerprint(query), call_site())
+    return execute(sql, params, many, context)
+
+
+def install_query_collector(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def begin_collecting():
+    return _collector.set(QueryCollector())
+
+
+def end_collecting(token):
+    collector = _collector.get()
+    _collector.reset(token)
+    return collector
+
+
+def format_findings(label, findings):
+    lines = [f'N+1 en {label}:']
+    for finding in findings:
+        # Sin la lista de columnas se ve la tabla y el WHERE, que es lo que delata el N+1.
+        lines.append(f"  {finding['count']} x {SELECT_LIST.sub('SELECT ... FROM ', finding['sql'])[:300]}")
+        lines.extend(f'      {count} desde {site}' for site, count in finding['sites'])
+    return '\n'.join(lines)
+
+
+def report(label, findings, strict=None):
+    if not findings:
+        return
+    message = format_findings(label, findings)
+    strict = settings.NPLUSONE_STRICT if strict is None else strict
+    if strict:
+        raise NPlusOneError(message)
+    logger.warning(message)
+
+
+@contextmanager
+def detect_nplusone(label, strict=None, threshold=None):
+    token = begin_collecting()
+    try:
+        yield
+    finally:
+        collector = end_collecting(token)
+    report(label, collector.findings(threshold), strict)
+
+
+class NPlusOneTestMixin:
+    # Mezclar con TestCase: cada petición del cliente de pruebas falla con NPlusOneError si repite consultas.
+    nplusone_strict = True
+    nplusone_threshold = None
+
+    def setUp(self):
+        overrides = {'NPLUSONE_DETECTION': True, 'NPLUSONE_STRICT': self.nplusone_strict}
+        if self.nplusone_threshold:
+            overrides['NPLUSONE_THRESHOLD'] = self.nplusone_threshold
+        settings_override = self.settings(**overrides)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Con DJANGO_NPLUSONE=0 al arrancar, las conexiones no llevan el recolector: se pone solo durante la prueba.
+        connection_created.connect(install_query_collector, dispatch_uid='nplusone_test_connection')
+        self.addCleanup(connection_created.disconnect, dispatch_uid='nplusone_test_connection')
+        for connection in connections.all(initialized_only=True):
+            if record_query not in connection.execute_wrappers:
+                install_query_collector(None, connection)
+                self.addCleanup(connection.execute_wrappers.remove, record_query)
+        super().setUp()
+
+    def assertNoNPlusOne(self, label='bloque', threshold=None):
+        return detect_nplusone(label, strict=True, threshold=threshold or self.nplusone_threshold)
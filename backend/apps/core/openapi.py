@@ -0,0 +1,29 @@
+from django.conf import settings
+
+if settings.API_SCHEMA_ENABLED:
+    from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+    from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+
+    class JWTAuthenticationScheme(SimpleJWTScheme):
+        target_class = 'apps.core.authentication.JWTAuthentication'
+
+else:
+    # Sin esquema activo (producción) las anotaciones no hacen nada y drf_spectacular no se importa.
+    def extend_schema(*args, **kwargs):
+        def decorator(target):
+            return target
+
+        return decorator
+
+    class OpenApiParameter:
+        QUERY = 'query'
+        PATH = 'path'
+        HEADER = 'header'
+        COOKIE = 'cookie'
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+    class OpenApiResponse:
+        def __init__(self, *args, **kwargs):
+            pass
@@ -1,7 +1,11 @@
+from django.db.models import Exists, OuterRef
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.permissions import BasePermission
 
 from apps.chat.models import Conversation
 from apps.communities.models import Membership
+from apps.core.rls import rls_enabled
+from apps.core.shards import across_shards
 
 
 def is_superadmin(user):
@@ -32,6 +36,67 @@ def has_approved_membership(user, community_id):
     ).exists()
 
 
+async def ahas_approved_membership(user, community_id):
+    if is_superadmin(user):
+        return True
+    if not user or not user.is_authenticated:
+        return False
+
+    community_id = normalize_community_id(community_id)
+    if community_id is None:
+        return False
+
+    return await Membership.objects.filter(
+        user=user,
+        community_id=community_id,
+        status=Membership.Status.APPROVED,
+    ).aexists()
+
+
+def can_list_community(user, community_id):
+    # Con RLS la consulta del listado ya filtra por membresía en la BD: sin round-trip previo.
+    return rls_enabled() or has_approved_membership(user, community_id)
+
+
+async def acan_list_community(user, community_id):
+    return rls_enabled() or await ahas_approved_membership(user, community_id)
+
+
+def paginate_community_list(paginator, queryset, request, community_id):
+    # Con RLS la membresía solo se consulta si no hay filas que mostrar: quien no es miembro sigue recibiendo 403.
+    try:
+        page = paginator.paginate_queryset(queryset, request)
+    except NotFound:
+        if rls_enabled() and not has_approved_membership(request.user, community_id):
+            raise PermissionDenied('No perteneces a la comunidad.')
+        raise
+    if rls_enabled() and not page and not has_approved_membership(request.user, community_id):
+        raise PermissionDenied('No perteneces a la comunidad.')
+    return page
+
+
+async def apaginate_community_list(paginator, queryset, request, community_id):
+    try:
+        page = await paginator.apaginate_queryset(queryset, request)
+    except NotFound:
+        if rls_enabled() and not await ahas_approved_membership(request.user, community_id):
+            raise PermissionDenied('No perteneces a la comunidad.')
+        raise
+    if rls_enabled() and not page and not await ahas_approved_membership(request.user, community_id):
+        raise PermissionDenied('No perteneces a la comunidad.')
+    return page
+
+
+def approved_membership_exists(user, community_ref):
+    return Exists(
+        Membership.objects.filter(
+            user_id=getattr(user, 'id', None),
+            community_id=OuterRef(community_ref),
+            status=Membership.Status.APPROVED,
+        )
+    )
+
+
 def is_moderator_in_community(user, community_id):
     if is_superadmin(user):
         return True
@@ -55,7 +120,7 @@ def get_moderated_community_ids(user):
         from apps.communities.models import Community
 
         return list(Community.objects.values_list('id', flat=True))
-    return list(
+    return across_shards(
         Membership.objects.filter(
             user=user,
             status=Membership.Status.APPROVED,
@@ -64,6 +129,13 @@ def get_moderated_community_ids(user):
     )
 
 
+class IsSuperAdmin(BasePermission):
+    message = 'Solo superadmin puede realizar esta acción.'
+
+    def has_permission(self, request, view):
+        return is_superadmin(request.user)
+
+
 class IsMemberOfCommunityApproved(BasePermission):
     message = 'No perteneces a la comunidad o no estás aprobado.'
 
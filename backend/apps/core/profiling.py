@@ -0,0 +1,162 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import secrets
+import tempfile
+import time
+import zipfile
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from apps.core.authentication import JWTAuthentication
+from apps.core.memory import format_memory_report, trace_memory
+from apps.core.permissions import is_superadmin
+from apps.core.viewnames import view_label
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_PARAM = '_profile'
+SLOT_CACHE_KEY = 'profiling:slot'
+PROFILE_ID_PATTERN = re.compile(r'\d{8}-\d{6}-[\w.]+-[0-9a-f]{8}')
+SUMMARY_LINES = 60
+# X-Profile: 1 (o cpu) -> cProfile; X-Profile: memory -> tracemalloc.
+PROFILE_MODES = {'1': 'cpu', 'cpu': 'cpu', 'memory': 'memory'}
+
+_captured_queries = ContextVar('profiled_queries', default=None)
+
+
+def profiling_mode(request):
+    return PROFILE_MODES.get(request.headers.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_PARAM))
+
+
+def authorized(request):
+    # La vista vuelve a autenticar; aquí un token inválido solo significa "no se perfila".
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return result is not None and is_superadmin(result[0])
+
+
+def acquire_slot():
+    # Como mucho un perfil cada PROFILING_INTERVAL segundos (por proceso, o global con la cache compartida).
+    return cache.add(SLOT_CACHE_KEY, True, settings.PROFILING_INTERVAL)
+
+
+def record_profiled_query(execute, sql, params, many, context):
+    queries = _captured_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        # Sin parámetros: el artefacto no debe llevar datos de usuarios.
+        queries.append(
+            {
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'many': many,
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+            }
+        )
+
+
+def install_profiled_query_recorder(sender, connection, **kwargs):
+    if record_profiled_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_profiled_query)
+
+
+def profile_call(get_response, request, mode='cpu'):
+    queries = []
+    token = _captured_queries.set(queries)
+    profiler = memory = None
+    start = time.perf_counter()
+    try:
+        if mode == 'memory':
+            with trace_memory() as memory:
+                response = get_response(request)
+        else:
+            profiler = cProfile.Profile()
+            response = profiler.runcall(get_response, request)
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _captured_queries.reset(token)
+    response['X-Profile-Id'] = save_artifact(request, response, queries, elapsed_ms, profiler=profiler, memory=memory)
+    return response
+
+
+def profiles_dir():
+    return Path(settings.PROFILING_DIR)
+
+
+def summary_text(queries, meta, profiler=None, memory=None):
+    output = io.StringIO()
+    output.write(f"{meta['method']} {meta['path']} -> {meta['status']} ({meta['view']}) en {meta['elapsed_ms']:.1f} ms\n")
+    output.write(f"{len(queries)} consultas SQL, {sum(query['ms'] for query in queries):.1f} ms en BD\n\n")
+    if memory is not None:
+        output.write(format_memory_report(memory))
+    if profiler is not None:
+        stats = pstats.Stats(profiler, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LINES)
+    return output.getvalue()
+
+
+def save_artifact(request, response, queries, elapsed_ms, profiler=None, memory=None):
+    view = view_label(request)
+    profile_id = f'{timezone.now():%Y%m%d-%H%M%S}-{view}-{secrets.token_hex(4)}'
+    meta = {
+        'id': profile_id,
+        'method': request.method,
+        'path': request.path,
+        'view': view,
+        'status': response.status_code,
+        'elapsed_ms': round(elapsed_ms, 3),
+        'mode': 'memory' if memory is not None else 'cpu',
+    }
+
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        partial_path = directory / f'.{profile_id}.zip'
+        with zipfile.ZipFile(partial_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            if profiler is not None:
+                stats_path = os.path.join(tmp, 'profile.prof')
+                profiler.dump_stats(stats_path)
+                archive.write(stats_path, 'profile.prof')
+            if memory is not None:
+                archive.writestr('memory.json', json.dumps({**meta, **memory.as_dict()}, indent=2))
+            archive.writestr('queries.json', json.dumps({**meta, 'queries': queries}, indent=2))
+            archive.writestr('summary.txt', summary_text(queries, meta, profiler=profiler, memory=memory))
+        os.replace(partial_path, directory / f'{profile_id}.zip')
+
+    prune_artifacts()
+    return profile_id
+
+
+def list_artifacts():
+    directory = profiles_dir()
+    if not directory.is_dir():
+        return []
+    paths = [path for path in directory.glob('*.zip') if PROFILE_ID_PATTERN.fullmatch(path.stem)]
+    return sorted(paths, key=lambda path: path.name, reverse=True)
+
+
+def prune_artifacts():
+    for path in list_artifacts()[settings.PROFILING_KEEP :]:
+        path.unlink(missing_ok=True)
+
+
+def artifact_path(profile_id):
+    if not PROFILE_ID_PATTERN.fullmatch(profile_id):
+        return None
+    path = profiles_dir() / f'{profile_id}.zip'
+    return path if path.is_file() else None
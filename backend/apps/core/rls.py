@@ -0,0 +1,121 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+
+# Tabla protegida -> expresión que dice si la fila es visible; las hijas se apoyan en la política de su padre.
+RLS_POLICIES = {
+    'requests.Request': 'community_id IN ({memberships})',
+    'loans.LoanItem': 'community_id IN ({memberships})',
+    'requests.VolunteerOffer': 'EXISTS (SELECT 1 FROM requests_request r WHERE r.id = request_id)',
+    'loans.LoanRequest': 'EXISTS (SELECT 1 FROM loans_loanitem i WHERE i.id = item_id)',
+    'chat.Conversation': 'EXISTS (SELECT 1 FROM requests_request r WHERE r.id = request_id)',
+    'chat.Message': 'EXISTS (SELECT 1 FROM chat_conversation c WHERE c.id = conversation_id)',
+    'chat.ConversationReadState': 'EXISTS (SELECT 1 FROM chat_conversation c WHERE c.id = conversation_id)',
+    'chat.ConversationArchive': 'EXISTS (SELECT 1 FROM chat_conversation c WHERE c.id = conversation_id)',
+    'chat.ConversationArchiveChunk': 'EXISTS (SELECT 1 FROM chat_conversationarchive a WHERE a.id = archive_id)',
+    'reports.Report': 'EXISTS (SELECT 1 FROM requests_request r WHERE r.id = request_id)',
+}
+POLICY_NAME = 'community_isolation'
+APPROVED_MEMBERSHIPS_SQL = (
+    "SELECT m.community_id FROM communities_membership m "
+    "WHERE m.user_id = NULLIF(current_setting('app.user_id', true), '')::bigint AND m.status = 'approved'"
+)
+BYPASS_SQL = "current_setting('app.rls_bypass', true) = 'on'"
+SET_STATE_SQL = "SELECT set_config('app.user_id', %s, false), set_config('app.rls_bypass', %s, false)"
+
+BYPASS = ('', 'on')
+DENY = ('', 'off')
+
+_request_state = ContextVar('rls_request_state', default=None)
+
+
+def rls_enabled():
+    return settings.DATABASE_RLS
+
+
+def rls_models():
+    return [apps.get_model(label) for label in RLS_POLICIES]
+
+
+def policy_sql(model):
+    condition = RLS_POLICIES[model._meta.label].format(memberships=APPROVED_MEMBERSHIPS_SQL)
+    return f'{BYPASS_SQL} OR {condition}'
+
+
+def state_for_user(user):
+    if user is None or not user.is_authenticated:
+        return DENY
+    return (str(user.id), 'on' if user.is_superuser else 'off')
+
+
+def current_state(connection):
+    # Un SET hecho dentro de una transacción vale mientras su marca siga pendiente de on_commit: un rollback
+    # (completo o de su savepoint) la descarta y el estado vuelve a ser desconocido.
+    marker = getattr(connection, 'rls_marker', None)
+    if marker is not None and not any(func is marker for _, func, _ in connection.run_on_commit):
+        return None
+    return getattr(connection, 'rls_state', None)
+
+
+def sync_state(connection):
+    # Fuera de una petición (comandos, warm-up) se ve todo; dentro, el estado de la petición.
+    state = _request_state.get() or BYPASS
+    if current_state(connection) == state:
+        return
+    connection.rls_state, connection.rls_marker = state, None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(SET_STATE_SQL, state)
+    except Exception:
+        connection.rls_state = None
+        raise
+    if connection.in_atomic_block:
+        marker = connection.rls_marker = lambda: setattr(connection, 'rls_marker', None)
+        transaction.on_commit(marker, using=connection.alias)
+
+
+def apply_rls_state(execute, sql, params, many, context):
+    # El estado se fija justo antes de la primera consulta que lo necesita y solo si la conexión tiene otro:
+    # el mismo usuario en una conexión reutilizada (CONN_MAX_AGE) no cuesta ningún round-trip.
+    if rls_enabled():
+        sync_state(context['connection'])
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def bypass_rls():
+    # Solo para el bloque: al salir las conexiones vuelven al estado de la petición.
+    token = _request_state.set(BYPASS)
+    try:
+        yield
+    finally:
+        _request_state.reset(token)
+
+
+def use_rls_user(user):
+    if rls_enabled() and _request_state.get() is not None:
+        _request_state.set(state_for_user(user))
+
+
+def use_rls_user_id(user_id):
+    # Antes de leer el usuario del token: así el SELECT de la autenticación ya fija el estado definitivo.
+    if rls_enabled() and _request_state.get() is not None:
+        _request_state.set((str(user_id), 'off'))
+
+
+def begin_request():
+    return _request_state.set(DENY)
+
+
+def end_request(token):
+    _request_state.reset(token)
+
+
+def reset_connection_state(sender, connection, **kwargs):
+    # Conexión nueva (o devuelta por el pool con el estado de otro): se fija de nuevo en la siguiente consulta.
+    connection.rls_state = connection.rls_marker = None
+    if apply_rls_state not in connection.execute_wrappers:
+        connection.execute_wrappers.append(apply_rls_state)
@@ -0,0 +1,90 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.core.shards import current_shard, is_sharded, is_sharded_model, sharding_enabled
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def replica_alias():
+    return settings.DATABASE_REPLICA_ALIAS
+
+
+@contextmanager
+def use_replica(enabled=True):
+    token = _read_from_replica.set(enabled and bool(replica_alias()))
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def read_from_primary():
+    # Para lo que se rellena en caché: no debe quedar guardado un dato atrasado de la réplica.
+    return use_replica(False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        # Sin esto Django escribiría en la BD de la que se leyó la instancia.
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == 'replica':
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == 'replica':
+            return False
+        return None
+
+
+class CommunityShardRouter:
+    # Los modelos de comunidad van al shard de la petición (o al de la instancia relacionada); los globales a default.
+    def shard_for(self, model, hints):
+        instance = hints.get('instance')
+        if is_sharded_model(model):
+            if instance is not None and is_sharded_model(type(instance)) and instance._state.db:
+                alias = instance._state.db
+            else:
+                alias = current_shard()
+            return None if alias in (DEFAULT_DB_ALIAS, 'replica') else alias
+        if instance is not None and instance._state.db in settings.COMMUNITY_SHARDS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_read(self, model, **hints):
+        if not sharding_enabled():
+            return None
+        return self.shard_for(model, hints)
+
+    def db_for_write(self, model, **hints):
+        if not sharding_enabled():
+            return None
+        return self.shard_for(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not sharding_enabled():
+            return None
+        if not (is_sharded_model(type(obj1)) and is_sharded_model(type(obj2))):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Los shards tienen el esquema completo, pero los datos iniciales y el SQL a mano solo de sus apps.
+        if db in settings.COMMUNITY_SHARDS and model_name is None:
+            return is_sharded(app_label)
+        return None
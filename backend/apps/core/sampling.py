@@ -0,0 +1,168 @@
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+from apps.core.viewnames import view_label
+
+PENDING_VIEW = 'middleware'
+OVERFLOW_FRAME = '(otras pilas)'
+MAX_STACKS = 20000
+MAX_DEPTH = 128
+# Pilas de los workers que ya terminaron (max_requests, reinicios): un único fichero en vez de uno por pid muerto.
+RETIRED_FILE = 'retired.folded'
+
+# Hilo -> petición en curso. Solo se muestrean hilos que están atendiendo una petición.
+_active = {}
+_sampler = None
+_start_lock = threading.Lock()
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def folded_stack(label, frame):
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join([label, *reversed(names)])
+
+
+def sample_label(request):
+    if getattr(request, 'resolver_match', None) is None:
+        return PENDING_VIEW
+    return view_label(request)
+
+
+class Sampler(threading.Thread):
+    def __init__(self, interval, directory, flush_seconds):
+        super().__init__(name='api-sampler', daemon=True)
+        self.interval = interval
+        self.directory = Path(directory)
+        self.flush_seconds = flush_seconds
+        self.pid = os.getpid()
+        self.stacks = Counter()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def run(self):
+        ticks_per_flush = max(int(self.flush_seconds / self.interval), 1)
+        ticks = 0
+        while not self.stopped.wait(self.interval):
+            self.sample()
+            ticks += 1
+            if ticks % ticks_per_flush == 0:
+                self.flush()
+
+    def sample(self):
+        frames = sys._current_frames()
+        for thread_id, request in list(_active.items()):
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            label = sample_label(request)
+            key = folded_stack(label, frame)
+            with self.lock:
+                if key not in self.stacks and len(self.stacks) >= MAX_STACKS:
+                    key = f'{label};{OVERFLOW_FRAME}'
+                self.stacks[key] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return Counter(self.stacks)
+
+    def flush(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f'{self.pid}.folded'
+        partial = self.directory / f'.{self.pid}.folded'
+        partial.write_text(format_folded(self.snapshot()), encoding='utf-8')
+        os.replace(partial, path)
+
+    def stop(self):
+        self.stopped.set()
+
+
+def sampler():
+    return _sampler
+
+
+def ensure_sampler():
+    # Con preload_app el hilo del master no sobrevive al fork: cada worker arranca el suyo con su primera petición.
+    global _sampler
+    if _sampler is not None and _sampler.pid == os.getpid():
+        return _sampler
+    with _start_lock:
+        if _sampler is None or _sampler.pid != os.getpid():
+            _sampler = Sampler(1 / settings.SAMPLING_HZ, settings.SAMPLING_DIR, settings.SAMPLING_FLUSH_SECONDS)
+            _sampler.start()
+    return _sampler
+
+
+def retire_worker(pid, directory=None):
+    # Lo llama el master de gunicorn en child_exit: suma las pilas del worker a RETIRED_FILE y borra su <pid>.folded.
+    directory = Path(directory or settings.SAMPLING_DIR)
+    path = directory / f'{pid}.folded'
+    (directory / f'.{pid}.folded').unlink(missing_ok=True)
+    if not path.is_file():
+        return
+    retired_path = directory / RETIRED_FILE
+    stacks = parse_folded(retired_path.read_text(encoding='utf-8')) if retired_path.is_file() else Counter()
+    stacks.update(parse_folded(path.read_text(encoding='utf-8')))
+    partial = directory / f'.{RETIRED_FILE}'
+    partial.write_text(format_folded(Counter(dict(stacks.most_common(MAX_STACKS)))), encoding='utf-8')
+    os.replace(partial, retired_path)
+    path.unlink()
+
+
+def stop_sampler():
+    global _sampler
+    if _sampler is not None:
+        _sampler.stop()
+        _sampler.join()
+        _sampler = None
+
+
+def track_request(request):
+    thread_id = threading.get_ident()
+    _active[thread_id] = request
+    return thread_id
+
+
+def untrack_request(thread_id):
+    _active.pop(thread_id, None)
+
+
+def format_folded(stacks):
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+def parse_folded(text):
+    stacks = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
+
+
+def collect_stacks(view=None):
+    # Suma lo escrito por todos los workers en SAMPLING_DIR más lo que este proceso aún no ha volcado.
+    stacks = Counter()
+    current = sampler()
+    directory = Path(settings.SAMPLING_DIR)
+    if directory.is_dir():
+        for path in directory.glob('*.folded'):
+            if current is not None and path.stem == str(current.pid):
+                continue
+            stacks.update(parse_folded(path.read_text(encoding='utf-8')))
+    if current is not None:
+        stacks.update(current.snapshot())
+    if view:
+        stacks = Counter({stack: count for stack, count in stacks.items() if stack.split(';', 1)[0] == view})
+    return stacks
@@ -0,0 +1,109 @@
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+
+SCHEMA_MEDIA_TYPES = {
+    'yaml': 'application/vnd.oai.openapi',
+    'json': 'application/vnd.oai.openapi+json',
+}
+
+_artifacts = {}
+_lock = threading.Lock()
+
+
+def schema_version():
+    return settings.APP_VERSION or 'dev'
+
+
+def schema_artifact_path(directory, fmt, version=None):
+    return Path(directory) / f'openapi-{version or schema_version()}.{fmt}'
+
+
+def generate_schema():
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def render_schema(schema):
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+    renderers = {'yaml': OpenApiYamlRenderer, 'json': OpenApiJsonRenderer}
+    return {fmt: renderer().render(schema, renderer_context={}) for fmt, renderer in renderers.items()}
+
+
+def make_artifact(body):
+    return {'body': body, 'etag': '"{}"'.format(hashlib.sha256(body).hexdigest())}
+
+
+def read_artifacts(directory):
+    paths = {fmt: schema_artifact_path(directory, fmt) for fmt in SCHEMA_MEDIA_TYPES}
+    if not all(path.is_file() for path in paths.values()):
+        return None
+    return {fmt: make_artifact(path.read_bytes()) for fmt, path in paths.items()}
+
+
+def write_artifacts(directory, bodies):
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    paths = []
+    for fmt, body in bodies.items():
+        path = schema_artifact_path(directory, fmt)
+        path.write_bytes(body)
+        paths.append(path)
+    return paths
+
+
+def load_artifacts():
+    directory = settings.API_SCHEMA_DIR
+    artifacts = read_artifacts(directory) if directory else None
+    if artifacts is None and settings.API_SCHEMA_ENABLED:
+        artifacts = {fmt: make_artifact(body) for fmt, body in render_schema(generate_schema()).items()}
+    return artifacts
+
+
+def get_schema_artifacts():
+    version = schema_version()
+    artifacts = _artifacts.get(version)
+    if artifacts is None:
+        with _lock:
+            artifacts = _artifacts.get(version)
+            if artifacts is None:
+                artifacts = load_artifacts()
+                if artifacts is not None:
+                    _artifacts.clear()
+                    _artifacts[version] = artifacts
+    return artifacts
+
+
+def reset_schema_artifacts():
+    _artifacts.clear()
+
+
+def requested_format(request):
+    if request.GET.get('format') == 'json' or 'json' in request.headers.get('Accept', ''):
+        return 'json'
+    return 'yaml'
+
+
+@require_GET
+def schema_view(request):
+    artifacts = get_schema_artifacts()
+    if artifacts is None:
+        return JsonResponse({'detail': 'Esquema no disponible.'}, status=404)
+
+    fmt = requested_format(request)
+    artifact = artifacts[fmt]
+    if artifact['etag'] in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(artifact['body'], content_type=SCHEMA_MEDIA_TYPES[fmt])
+    response['ETag'] = artifact['etag']
+    response['Cache-Control'] = 'public, no-cache'
+    response['X-Schema-Version'] = schema_version()
+    return response
@@ -1,10 +1,12 @@
 ﻿from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from apps.communities.models import Community, Membership
+from apps.core.users import normalize_email, users_with_email
 from apps.profiles.models import Profile
 
 User = get_user_model()
@@ -17,7 +19,7 @@ class RegisterSerializer(serializers.Serializer):
     community_id = serializers.IntegerField()
 
     def validate_email(self, value):
-        if User.objects.filter(email__iexact=value).exists():
+        if users_with_email(value).exists():
             raise serializers.ValidationError('Este email ya está registrado.')
         return value
 
@@ -30,17 +32,22 @@ class RegisterSerializer(serializers.Serializer):
             raise serializers.ValidationError('Comunidad no válida.')
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
-        email = validated_data['email'].lower()
+        email = normalize_email(validated_data['email'])
         password = validated_data['password']
         display_name = validated_data['display_name']
         community = Community.objects.get(id=validated_data['community_id'])
 
-        user = User.objects.create_user(
-            username=email,
-            email=email,
-            password=password,
-        )
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    username=email,
+                    email=email,
+                    password=password,
+                )
+        except IntegrityError:
+            raise serializers.ValidationError({'email': ['Este email ya está registrado.']})
         Profile.objects.create(user=user, display_name=display_name)
         Membership.objects.get_or_create(
             user=user,
@@ -62,7 +69,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         self.fields.pop(self.username_field, None)
 
     def validate(self, attrs):
-        attrs[self.username_field] = (attrs.get('email') or '').lower()
+        attrs[self.username_field] = normalize_email(attrs.get('email'))
         return super().validate(attrs)
 
 
@@ -71,4 +78,5 @@ class MeSerializer(serializers.Serializer):
     email = serializers.EmailField()
     display_name = serializers.CharField()
     is_superadmin = serializers.BooleanField()
+    all_communities = serializers.BooleanField()
     communities = serializers.ListField()
@@ -0,0 +1,237 @@
+import heapq
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.urls import Resolver404, resolve
+
+from apps.core.rls import bypass_rls
+
+# Todo lo que cuelga de una comunidad vive en su shard; usuarios, perfiles y comunidades solo en default.
+SHARDED_APPS = ('requests', 'loans', 'chat', 'reports')
+SHARDED_MODELS = {('communities', 'membership')}
+
+LOCATE_CACHE_TIMEOUT = 86400
+# Cada BD de comunidad genera pk en su propio bloque (default es el primero), así un pk identifica una sola fila en
+# todos los shards. El bloque sale del orden de DJANGO_COMMUNITY_SHARDS: los shards nuevos se añaden al final.
+SHARD_ID_BLOCK = 10**12
+
+# kwarg de la URL -> (modelo, campo con el que se llega a community_id)
+SHARD_LOOKUPS = {
+    'request_id': ('requests.Request', 'community_id'),
+    'loan_id': ('loans.LoanItem', 'community_id'),
+    'conversation_id': ('chat.Conversation', 'request__community_id'),
+    'report_id': ('reports.Report', 'request__community_id'),
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+FORM_CONTENT_TYPES = ('multipart/form-data', 'application/x-www-form-urlencoded')
+
+_current_shard = ContextVar('current_shard', default=DEFAULT_DB_ALIAS)
+
+
+def sharding_enabled():
+    return bool(settings.COMMUNITY_SHARDS)
+
+
+def shard_aliases():
+    return [DEFAULT_DB_ALIAS, *settings.COMMUNITY_SHARDS]
+
+
+def is_sharded(app_label, model_name=None):
+    return app_label in SHARDED_APPS or (app_label, model_name) in SHARDED_MODELS
+
+
+def is_sharded_model(model):
+    return is_sharded(model._meta.app_label, model._meta.model_name)
+
+
+def current_shard():
+    return _current_shard.get()
+
+
+@contextmanager
+def use_shard(alias):
+    token = _current_shard.set(alias)
+    try:
+        yield
+    finally:
+        _current_shard.reset(token)
+
+
+def shard_id_range(alias):
+    index = shard_aliases().index(alias)
+    return index * SHARD_ID_BLOCK + 1, (index + 1) * SHARD_ID_BLOCK
+
+
+def reserve_id_range(model, alias):
+    low, high = shard_id_range(alias)
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_get_serial_sequence(%s, %s)', [connection.ops.quote_name(model._meta.db_table), model._meta.pk.column]
+        )
+        sequence = cursor.fetchone()[0]
+        if sequence is None:
+            return
+        cursor.execute(f'SELECT last_value FROM {sequence}')
+        last_value = cursor.fetchone()[0]
+        if last_value > high:
+            raise ImproperlyConfigured(
+                f'{sequence} en {alias} ya pasó de {high}: el orden de DJANGO_COMMUNITY_SHARDS no puede cambiar.'
+            )
+        restart = f' RESTART WITH {low}' if last_value < low else ''
+        cursor.execute(f'ALTER SEQUENCE {sequence} MINVALUE {low} MAXVALUE {high} START WITH {low}{restart}')
+
+
+def reserve_shard_id_ranges(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    # post_migrate de cada app en cada BD: también cubre las tablas que se creen más adelante.
+    if not sharding_enabled() or using not in shard_aliases():
+        return
+    for model in sender.get_models():
+        if is_sharded_model(model) and router.allow_migrate_model(using, model):
+            reserve_id_range(model, using)
+
+
+def community_route(community_id):
+    # Sin cache: move_community_shard corre en otro proceso y, al terminar, todos los workers tienen que leer ya el
+    # shard nuevo (y antes, el bloqueo de escrituras). Es una búsqueda por pk en default.
+    if not sharding_enabled() or community_id is None:
+        return DEFAULT_DB_ALIAS, False
+    Community = apps.get_model('communities', 'Community')
+    route = Community.objects.using(DEFAULT_DB_ALIAS).filter(id=community_id).values_list('shard', 'writes_frozen').first()
+    return route or (DEFAULT_DB_ALIAS, False)
+
+
+def community_shard(community_id):
+    return community_route(community_id)[0]
+
+
+def use_community_shard(community_id):
+    return use_shard(community_shard(community_id))
+
+
+def locate_community_id(kwarg, pk):
+    key = f'shard-locate:{kwarg}:{pk}'
+    community_id = cache.get(key)
+    if community_id is None:
+        label, field = SHARD_LOOKUPS[kwarg]
+        model = apps.get_model(label)
+        for alias in shard_aliases():
+            # Aún no hay usuario autenticado: la búsqueda del shard no puede depender de RLS.
+            with bypass_rls():
+                community_id = model.objects.using(alias).filter(pk=pk).values_list(field, flat=True).first()
+            if community_id is not None:
+                cache.set(key, community_id, LOCATE_CACHE_TIMEOUT)
+                break
+    return community_id
+
+
+def body_community_id(request):
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data.get('community_id') if isinstance(data, dict) else None
+    if request.content_type in FORM_CONTENT_TYPES:
+        return request.POST.get('community_id')
+    return None
+
+
+def parse_community_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def resolve_request_community_id(request):
+    try:
+        kwargs = resolve(request.path_info, getattr(request, 'urlconf', None)).kwargs
+    except Resolver404:
+        return None
+
+    community_id = kwargs.get('community_id') or request.GET.get('community_id')
+    if community_id is None and request.method not in SAFE_METHODS:
+        community_id = body_community_id(request)
+    if community_id is None:
+        for kwarg in SHARD_LOOKUPS:
+            if kwarg in kwargs:
+                community_id = locate_community_id(kwarg, kwargs[kwarg])
+                break
+    return parse_community_id(community_id)
+
+
+def resolve_request_shard(request):
+    return community_shard(resolve_request_community_id(request))
+
+
+def route_request(request):
+    shard, frozen = community_route(resolve_request_community_id(request))
+    return shard, frozen and request.method not in SAFE_METHODS
+
+
+def atomic_on_shard(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with transaction.atomic(using=current_shard()):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def join_global(queryset, *lookups):
+    # En un shard no están las tablas de usuarios ni comunidades: no hay JOIN posible, se precargan desde default.
+    if sharding_enabled():
+        return queryset.prefetch_related(*lookups)
+    return queryset.select_related(*lookups)
+
+
+def across_shards(queryset):
+    if not sharding_enabled():
+        return list(queryset)
+    return [obj for alias in shard_aliases() for obj in queryset.using(alias)]
+
+
+async def aacross_shards(queryset):
+    if not sharding_enabled():
+        return [obj async for obj in queryset]
+    return [obj for alias in shard_aliases() async for obj in queryset.using(alias)]
+
+
+def count_across_shards(queryset):
+    if not sharding_enabled():
+        return queryset.count()
+    return sum(queryset.using(alias).count() for alias in shard_aliases())
+
+
+class ShardedResults:
+    # Lista paginable sobre todos los shards: count suma y cada página mezcla los primeros N de cada shard.
+    def __init__(self, queryset, key, reverse=False):
+        self.queryset = queryset
+        self.key = key
+        self.reverse = reverse
+        self.ordered = queryset.ordered
+
+    def count(self):
+        return count_across_shards(self.queryset)
+
+    def __getitem__(self, item):
+        stop = item.stop
+        rows = [list(self.queryset.using(alias)[:stop]) for alias in shard_aliases()]
+        merged = heapq.merge(*rows, key=self.key, reverse=self.reverse)
+        return list(islice(merged, item.start or 0, stop))
+
+
+def sharded_results(queryset, key, reverse=False):
+    if not sharding_enabled():
+        return queryset
+    return ShardedResults(queryset, key, reverse)
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+from apps.communities.models import Community, Membership
+from apps.core.me import bump_communities_version, invalidate_me_for_instance, invalidate_me_for_user
+from apps.core.nplusone import install_query_collector
+from apps.core.profiling import install_profiled_query_recorder
+from apps.core.rls import reset_connection_state
+from apps.core.shards import reserve_shard_id_ranges
+from apps.core.slowqueries import install_slow_query_recorder
+from apps.core.sqltags import install_sql_tagger
+from apps.profiles.models import Profile
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(invalidate_me_for_instance, sender=Membership, dispatch_uid='me_membership_save')
+    post_delete.connect(invalidate_me_for_instance, sender=Membership, dispatch_uid='me_membership_delete')
+    post_save.connect(invalidate_me_for_instance, sender=Profile, dispatch_uid='me_profile_save')
+    post_delete.connect(invalidate_me_for_instance, sender=Profile, dispatch_uid='me_profile_delete')
+    post_save.connect(invalidate_me_for_user, sender=User, dispatch_uid='me_user_save')
+    post_delete.connect(invalidate_me_for_user, sender=User, dispatch_uid='me_user_delete')
+    post_save.connect(bump_communities_version, sender=Community, dispatch_uid='me_community_save')
+    post_delete.connect(bump_communities_version, sender=Community, dispatch_uid='me_community_delete')
+    post_migrate.connect(reserve_shard_id_ranges, dispatch_uid='core_shard_id_ranges')
+    connection_created.connect(reset_connection_state, dispatch_uid='core_rls_connection')
+    if settings.NPLUSONE_DETECTION:
+        connection_created.connect(install_query_collector, dispatch_uid='core_nplusone_connection')
+    if settings.PROFILING_ENABLED:
+        connection_created.connect(install_profiled_query_recorder, dispatch_uid='core_profiling_connection')
+    if settings.SLOW_QUERY_MS:
+        connection_created.connect(install_slow_query_recorder, dispatch_uid='core_slow_query_connection')
+    if settings.SQL_COMMENTS_ENABLED:
+        connection_created.connect(install_sql_tagger, dispatch_uid='core_sql_tags_connection')
+    if settings.METRICS_ENABLED:
+        from apps.core.metrics import install_query_recorder
+
+        connection_created.connect(install_query_recorder, dispatch_uid='core_metrics_connection')
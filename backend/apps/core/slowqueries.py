@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, transaction
+
+from apps.core.sqltags import current_view, split_tag
+
+logger = logging.getLogger(__name__)
+
+# EXPLAIN ANALYZE ejecuta la consulta: solo lecturas, nunca INSERT/UPDATE/DELETE ni SELECT ... FOR UPDATE.
+READ_ONLY_SQL = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+LOCKING_SQL = re.compile(r'\bFOR\s+(UPDATE|SHARE|NO\s+KEY\s+UPDATE|KEY\s+SHARE)\b|\b(INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+EXPLAIN_PREFIX = 'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) '
+MAX_PENDING = 10
+
+# pid -> (pool, semáforo). Ni el hilo del pool ni el semáforo del master sirven tras el fork de preload_app.
+_executor = None
+_start_lock = threading.Lock()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(' '.join(sql.split()).encode('utf-8')).hexdigest()
+
+
+def explainable(sql, many):
+    return not many and bool(READ_ONLY_SQL.match(sql)) and not LOCKING_SQL.search(sql)
+
+
+def should_explain(sql):
+    # Muestra y, por sentencia, como mucho un plan cada SLOW_QUERY_INTERVAL segundos: repetir la consulta también cuesta.
+    if random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+        return False
+    return cache.add(f'slow-query:{fingerprint(sql)}', True, settings.SLOW_QUERY_INTERVAL)
+
+
+def explain_and_store(alias, sql, params, view, duration_ms):
+    from apps.core.models import SlowQueryPlan
+
+    plan = None
+    error = ''
+    connection = connections[alias]
+    try:
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute(f'SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}')
+            cursor.execute(EXPLAIN_PREFIX + sql, params)
+            plan = cursor.fetchone()[0]
+            transaction.set_rollback(True, using=alias)
+    except DatabaseError as exc:
+        error = str(exc)[:500]
+
+    return SlowQueryPlan.objects.create(
+        database=alias,
+        view=view,
+        duration_ms=round(duration_ms, 3),
+        fingerprint=fingerprint(sql),
+        sql=sql,
+        plan=plan,
+        error=error,
+    )
+
+
+def executor():
+    global _executor
+    if _executor is not None and _executor[0] == os.getpid():
+        return _executor[1:]
+    with _start_lock:
+        if _executor is None or _executor[0] != os.getpid():
+            pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slow-query-explain')
+            _executor = (os.getpid(), pool, threading.BoundedSemaphore(MAX_PENDING))
+    return _executor[1:]
+
+
+def run_explain(pending, alias, sql, params, view, duration_ms):
+    # Hilo propio = conexión propia: no toca la transacción de la petición y, con RLS, ve todas las filas.
+    try:
+        explain_and_store(alias, sql, params, view, duration_ms)
+    except Exception:
+        logger.exception('No se pudo guardar el plan de una consulta lenta')
+    finally:
+        connections.close_all()
+        pending.release()
+
+
+def schedule_explain(alias, sql, params, view, duration_ms):
+    pool, pending = executor()
+    if not pending.acquire(blocking=False):
+        return
+    pool.submit(run_explain, pending, alias, sql, params, view, duration_ms)
+
+
+def record_slow_query(execute, sql, params, many, context):
+    threshold = settings.SLOW_QUERY_MS
+    if not threshold:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= threshold and isinstance(sql, str):
+            plain_sql = split_tag(sql)[2]
+            if explainable(plain_sql, many) and should_explain(plain_sql):
+                schedule_explain(context['connection'].alias, plain_sql, params, current_view(), duration_ms)
+
+
+def install_slow_query_recorder(sender, connection, **kwargs):
+    if record_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_slow_query)
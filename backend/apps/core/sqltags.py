@@ -0,0 +1,71 @@
+import re
+from contextvars import ContextVar
+
+from apps.core.viewnames import view_app, view_label
+
+# Va delante del SQL: así sobrevive al recorte de pg_stat_activity y pg_stat_statements la conserva en query.
+TAG_PATTERN = re.compile(r'^/\* view=(?P<view>[\w.]+) app=(?P<app>\w+) \*/ ')
+PENDING_TAG = '/* view=middleware app=middleware */ '
+UNTAGGED_VIEW = '(sin etiqueta)'
+
+_current_request = ContextVar('sql_tag_request', default=None)
+
+
+def begin_request(request):
+    return _current_request.set(request)
+
+
+def end_request(token):
+    _current_request.reset(token)
+
+
+def sql_tag(request):
+    tag = getattr(request, '_sql_tag', None)
+    if tag is not None:
+        return tag
+    # Antes de resolver la URL (consultas de los middlewares) aún no hay vista: no se guarda.
+    if getattr(request, 'resolver_match', None) is None:
+        return PENDING_TAG
+    request._sql_tag = f'/* view={view_label(request)} app={view_app(request)} */ '
+    return request._sql_tag
+
+
+def current_view():
+    request = _current_request.get()
+    if request is None:
+        return ''
+    return TAG_PATTERN.match(sql_tag(request))['view']
+
+
+def tag_query(execute, sql, params, many, context):
+    request = _current_request.get()
+    if request is not None and isinstance(sql, str):
+        sql = sql_tag(request) + sql
+    return execute(sql, params, many, context)
+
+
+def install_sql_tagger(sender, connection, **kwargs):
+    if tag_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(tag_query)
+
+
+def split_tag(query):
+    match = TAG_PATTERN.match(query)
+    if match is None:
+        return UNTAGGED_VIEW, '-', query
+    return match['view'], match['app'], query[match.end():]
+
+
+def group_by_view(statements):
+    # statements: (query, calls, total_ms, rows) -> [(view, app, total_ms, calls, [(total_ms, calls, rows, sql), ...])]
+    groups = {}
+    for query, calls, total_ms, rows in statements:
+        view, app, sql = split_tag(query)
+        group = groups.setdefault(view, [view, app, 0.0, 0, []])
+        group[2] += total_ms
+        group[3] += calls
+        group[4].append((total_ms, calls, rows, sql))
+    result = [tuple(group) for group in groups.values()]
+    for group in result:
+        group[4].sort(key=lambda statement: statement[0], reverse=True)
+    return sorted(result, key=lambda group: group[2], reverse=True)
@@ -1,7 +1,43 @@
-﻿from django.contrib.auth import get_user_model
-from django.test import TestCase
+﻿import json
+import tempfile
+import tracemalloc
+import zipfile
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
 from apps.communities.models import Community, Membership
+from apps.core.checks import check_api_caches_backend
+from apps.core.db import stream
+from apps.core.metrics import REGISTRY
+from apps.core.memory import trace_memory
+from apps.core.middleware import NPlusOneMiddleware, ReplicaRoutingMiddleware
+from apps.core.models import SlowQueryPlan
+from apps.core.nplusone import NPlusOneError, NPlusOneTestMixin
+from apps.core.profiling import install_profiled_query_recorder, record_profiled_query
+from apps.core.rls import begin_request, bypass_rls, end_request
+from apps.core.routers import ReplicaRouter, read_from_primary, use_replica
+from apps.core.sampling import Sampler, collect_stacks, retire_worker, sampler, stop_sampler, track_request, untrack_request
+from apps.core.schema import reset_schema_artifacts
+from apps.core.serializers import RegisterSerializer
+from apps.core.slowqueries import executor, explain_and_store, explainable, install_slow_query_recorder, record_slow_query
+from apps.core.sqltags import group_by_view
+from apps.core.users import EMAIL_LOWER_INDEX, users_with_email
+from apps.core.warmup import reset_warmup_state, warm_up
+from apps.profiles.models import Profile
+from apps.requests.models import Request
 
 User = get_user_model()
 
@@ -47,3 +83,781 @@ class RegisterWithCommunityTests(TestCase):
         )
 
         self.assertEqual(response.status_code, 400)
+
+    def register(self, email):
+        return self.client.post(
+            '/api/auth/register',
+            {
+                'email': email,
+                'password': 'Pass1234!',
+                'display_name': 'Usuario Duplicado',
+                'community_id': self.community_a.id,
+            },
+        )
+
+    def test_register_rejects_email_with_different_case(self):
+        User.objects.create_user(username='legacy', email='Dup@Example.com', password='Pass1234!')
+        response = self.register('dup@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.data)
+
+    def test_duplicate_signup_race_returns_400_from_constraint(self):
+        User.objects.create_user(username='legacy', email='Race@Example.com', password='Pass1234!')
+        with mock.patch.object(RegisterSerializer, 'validate_email', side_effect=lambda value: value):
+            response = self.register('race@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['email'], ['Este email ya está registrado.'])
+        self.assertEqual(User.objects.filter(email__iexact='race@example.com').count(), 1)
+
+    def test_email_lookup_uses_lower_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = users_with_email('Someone@Example.com').explain()
+        self.assertIn(EMAIL_LOWER_INDEX, plan)
+
+
+@override_settings(API_CACHES_ENABLED=True)
+class MeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.community = Community.objects.create(name='Comunidad Me')
+        self.user = User.objects.create_user(username='me@example.com', email='me@example.com', password='Pass1234!')
+        Profile.objects.create(user=self.user, display_name='Yo')
+        self.membership = Membership.objects.create(user=self.user, community=self.community, status=Membership.Status.APPROVED)
+        self.client.force_authenticate(self.user)
+
+    def test_me_payload_is_cached_and_invalidated_by_changes(self):
+        response = self.client.get('/api/me')
+        self.assertEqual(response.data['display_name'], 'Yo')
+        self.assertEqual(response.data['communities'][0]['community_name'], 'Comunidad Me')
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/me')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.membership.role_in_community = Membership.Role.MODERATOR
+            self.membership.save()
+            # Hasta el commit se sigue sirviendo la copia anterior.
+            self.assertEqual(self.client.get('/api/me').data['communities'][0]['role_in_community'], Membership.Role.MEMBER)
+        response = self.client.get('/api/me')
+        self.assertEqual(response.data['communities'][0]['role_in_community'], Membership.Role.MODERATOR)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile.display_name = 'Yo Editado'
+            self.user.profile.save()
+        self.assertEqual(self.client.get('/api/me').data['display_name'], 'Yo Editado')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.community.name = 'Comunidad Renombrada'
+            self.community.save()
+        response = self.client.get('/api/me')
+        self.assertEqual(response.data['communities'][0]['community_name'], 'Comunidad Renombrada')
+
+    def test_superadmin_payload_does_not_list_every_community(self):
+        superadmin = User.objects.create_superuser(username='root@example.com', email='root@example.com', password='Pass1234!')
+        self.client.force_authenticate(superadmin)
+        response = self.client.get('/api/me')
+        self.assertTrue(response.data['is_superadmin'])
+        self.assertTrue(response.data['all_communities'])
+        self.assertEqual(response.data['communities'], [])
+
+    @override_settings(API_CACHES_ENABLED=False)
+    def test_me_is_not_cached_without_a_shared_cache(self):
+        self.client.get('/api/me')
+        Membership.objects.filter(pk=self.membership.pk).update(role_in_community=Membership.Role.MODERATOR)
+        self.assertEqual(self.client.get('/api/me').data['communities'][0]['role_in_community'], Membership.Role.MODERATOR)
+
+    def test_check_requires_a_shared_cache(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=locmem):
+            self.assertEqual([error.id for error in check_api_caches_backend(None)], ['core.E001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(check_api_caches_backend(None), [])
+        with override_settings(CACHES=locmem, API_CACHES_ENABLED=False):
+            self.assertEqual(check_api_caches_backend(None), [])
+
+
+class SchemaCacheTests(TestCase):
+    def setUp(self):
+        reset_schema_artifacts()
+        self.addCleanup(reset_schema_artifacts)
+
+    def test_schema_is_served_with_strong_etag(self):
+        response = self.client.get('/api/schema?format=json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/api/requests', response.json()['paths'])
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+
+        with mock.patch('apps.core.schema.generate_schema') as generate:
+            response = self.client.get('/api/schema?format=json', HTTP_IF_NONE_MATCH=etag)
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get('/api/schema')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_build_schema_artifact_is_served_for_its_version(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(API_SCHEMA_DIR=directory, APP_VERSION='1.2.3'):
+                call_command('build_schema', stdout=StringIO())
+                self.assertTrue((Path(directory) / 'openapi-1.2.3.json').is_file())
+
+                with override_settings(API_SCHEMA_ENABLED=False):
+                    response = self.client.get('/api/schema?format=json')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['X-Schema-Version'], '1.2.3')
+                self.assertEqual(response.content, (Path(directory) / 'openapi-1.2.3.json').read_bytes())
+
+    @override_settings(API_SCHEMA_ENABLED=False, API_SCHEMA_DIR='')
+    def test_schema_without_artifact_is_not_generated_when_disabled(self):
+        with mock.patch('apps.core.schema.generate_schema') as generate:
+            response = self.client.get('/api/schema')
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, 404)
+
+
+class ProfileStartupTests(TestCase):
+    def test_reports_import_cost_per_package(self):
+        out = StringIO()
+        call_command('profile_startup', target='wsgi', repeat=1, top=3, schema='off', stdout=out)
+        output = out.getvalue()
+        self.assertIn('config.wsgi', output)
+        self.assertIn('rest_framework_simplejwt', output)
+        self.assertIn('apps.requests', output)
+        self.assertNotIn('drf_spectacular ', output)
+
+    def test_trace_memory_wraps_another_command(self):
+        out, err = StringIO(), StringIO()
+        call_command('trace_memory', '--top', '5', 'check', '--deploy', stdout=out, stderr=err)
+        output = out.getvalue()
+        self.assertIn('security.W', err.getvalue())
+        self.assertIn('check: memoria', output)
+        self.assertIn('Pico:', output)
+
+
+class WarmupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_warmup_state()
+        reset_schema_artifacts()
+        self.addCleanup(reset_warmup_state)
+        self.addCleanup(reset_schema_artifacts)
+
+    def test_readiness_without_warmup_is_ready(self):
+        self.assertEqual(self.client.get('/api/health/ready').status_code, 200)
+
+    @override_settings(WARMUP_ENABLED=True, API_CACHES_ENABLED=True)
+    def test_readiness_reports_warmup_and_primes_caches(self):
+        response = self.client.get('/api/health/ready')
+        self.assertEqual(response.status_code, 503)
+
+        user = User.objects.create_user(username='warm@example.com', email='warm@example.com', password='Pass1234!')
+        User.objects.create_user(username='idle@example.com', email='idle@example.com', password='Pass1234!')
+        community = Community.objects.create(name='Comunidad Warm')
+        Request.objects.create(community=community, created_by_user=user, title='Warm', description='Warm', category='general')
+
+        state = warm_up(close_connections=False)
+        self.assertTrue(state['ready'])
+        self.assertEqual(state['steps']['caches']['result'], 1)
+        self.assertGreater(state['steps']['urls']['result'], 0)
+
+        response = self.client.get('/api/health/ready')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'ready')
+
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.assertNumQueries(0):
+            client.get('/api/me')
+
+
+class DatabasePoolTests(TestCase):
+    def test_pool_stats_are_superadmin_only(self):
+        client = APIClient()
+        user = User.objects.create_user(username='pool@example.com', email='pool@example.com', password='Pass1234!')
+        client.force_authenticate(user)
+        self.assertEqual(client.get('/api/health/db').status_code, 403)
+
+        superadmin = User.objects.create_superuser(username='pool-root@example.com', email='pool-root@example.com', password='Pass1234!')
+        client.force_authenticate(superadmin)
+        response = client.get('/api/health/db')
+        self.assertEqual(response.status_code, 200)
+        if connection.settings_dict['OPTIONS'].get('pool'):
+            self.assertIn('pool_size', response.data['pools']['default'])
+        else:
+            self.assertEqual(response.data['pools'], {})
+
+    def test_stream_reads_pk_chunks_without_a_transaction(self):
+        for index in range(5):
+            User.objects.create_user(username=f'stream{index}@example.com', password='Pass1234!')
+        queryset = User.objects.filter(username__startswith='stream')
+        with CaptureQueriesContext(connection) as queries:
+            usernames = [user.username for user in stream(queryset, chunk_size=2)]
+        self.assertEqual(usernames, [f'stream{index}@example.com' for index in range(5)])
+        # Tres bloques: la lista de pks y las filas de cada uno.
+        self.assertEqual(len(queries), 6)
+        self.assertFalse([query['sql'] for query in queries if 'SAVEPOINT' in query['sql'] or query['sql'].startswith('DECLARE')])
+
+        emails = User.objects.filter(username__startswith='stream').values_list('username', flat=True)
+        self.assertEqual(list(stream(emails, chunk_size=2)), usernames)
+
+
+@override_settings(ROOT_URLCONF='config.urls_async')
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.community = Community.objects.create(name='Comunidad Async')
+        self.user = User.objects.create_user(username='async@example.com', email='async@example.com', password='Pass1234!')
+        Profile.objects.create(user=self.user, display_name='Asíncrona')
+        Membership.objects.create(user=self.user, community=self.community, status=Membership.Status.APPROVED)
+        self.other = User.objects.create_user(username='async-other@example.com', email='async-other@example.com', password='Pass1234!')
+        for index in range(3):
+            Request.objects.create(
+                community=self.community,
+                created_by_user=self.user,
+                title=f'Async {index}',
+                description='Test',
+                category='general',
+            )
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def test_async_endpoints_match_sync_payloads(self):
+        client = AsyncClient()
+        response = await client.get(f'/api/requests?community_id={self.community.id}&page_size=2', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(len(data['results']), 2)
+        self.assertIn('page=2', data['next'])
+        self.assertEqual(data['results'][0]['created_by_display_name'], 'Asíncrona')
+        self.assertEqual(data['results'][0]['offers_count'], 0)
+
+        response = await client.get('/api/me', headers=self.headers)
+        self.assertEqual(response.json()['communities'][0]['community_name'], 'Comunidad Async')
+
+        response = await client.get('/api/communities')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Comunidad Async', [item['name'] for item in response.json()])
+
+    async def test_async_endpoints_enforce_authentication_and_membership(self):
+        client = AsyncClient()
+        response = await client.get(f'/api/requests?community_id={self.community.id}')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+        response = await client.get('/api/me', headers={'Authorization': 'Bearer invalido'})
+        self.assertEqual(response.status_code, 401)
+
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.other)}'}
+        response = await client.get(f'/api/requests?community_id={self.community.id}', headers=headers)
+        self.assertEqual(response.status_code, 403)
+
+        response = await client.get(f'/api/requests?community_id={self.community.id}&page=9', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_post_falls_back_to_sync_view(self):
+        client = AsyncClient()
+        response = await client.post(
+            '/api/requests',
+            {'community_id': self.community.id, 'title': 'Nueva', 'description': 'Test', 'category': 'general'},
+            content_type='application/json',
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['title'], 'Nueva')
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.community = Community.objects.create(name='Comunidad Métricas')
+        self.user = User.objects.create_user(username='metrics@example.com', email='metrics@example.com', password='Pass1234!')
+        Membership.objects.create(user=self.user, community=self.community, status=Membership.Status.APPROVED)
+        Request.objects.create(
+            community=self.community,
+            created_by_user=self.user,
+            title='Medida',
+            description='Test',
+            category='general',
+        )
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_records_latency_queries_and_size_per_view(self):
+        view = 'RequestListCreateView.get'
+        requests_before = self.sample('api_request_duration_seconds_count', view=view, status='200')
+        queries_before = self.sample('api_request_queries_sum', view=view)
+        rows_before = self.sample('api_request_db_rows_sum', view=view)
+
+        response = APIClient().get(f'/api/requests?community_id={self.community.id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.sample('api_request_duration_seconds_count', view=view, status='200'), requests_before + 1)
+        self.assertGreater(self.sample('api_request_queries_sum', view=view), queries_before)
+        self.assertGreater(self.sample('api_request_db_rows_sum', view=view), rows_before)
+        self.assertGreaterEqual(self.sample('api_response_size_bytes_sum', view=view), len(response.content))
+
+    @override_settings(ROOT_URLCONF='config.urls_async')
+    async def test_async_views_are_labelled_with_their_view_class(self):
+        view = 'RequestListCreateView.get'
+        before = self.sample('api_request_queries_count', view=view)
+        response = await AsyncClient().get(f'/api/requests?community_id={self.community.id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.sample('api_request_queries_count', view=view), before + 1)
+
+    def test_metrics_endpoint_requires_token_outside_debug(self):
+        APIClient().get('/api/no-existe')
+        self.assertEqual(self.client.get('/api/metrics').status_code, 403)
+
+        with override_settings(METRICS_TOKEN='secreto'):
+            self.assertEqual(self.client.get('/api/metrics').status_code, 403)
+            response = self.client.get('/api/metrics', headers={'Authorization': 'Bearer secreto'})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'api_request_duration_seconds_bucket', response.content)
+            self.assertIn(b'view="unmatched"', response.content)
+
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/api/metrics').status_code, 200)
+
+
+class SqlCommentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.community = Community.objects.create(name='Comunidad Etiquetas')
+        self.user = User.objects.create_user(username='tags@example.com', email='tags@example.com', password='Pass1234!')
+        Membership.objects.create(user=self.user, community=self.community, status=Membership.Status.APPROVED)
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.executed = []
+
+    def capture(self, execute, sql, params, many, context):
+        self.executed.append(sql)
+        return execute(sql, params, many, context)
+
+    def test_queries_are_tagged_with_view_and_app(self):
+        with connection.execute_wrapper(self.capture):
+            response = APIClient().get(f'/api/loans?community_id={self.community.id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        tagged = [sql for sql in self.executed if sql.startswith('/* view=LoanListCreateView.get app=loans */ ')]
+        self.assertTrue(any('loans_loanitem' in sql for sql in tagged))
+
+        self.executed.clear()
+        with connection.execute_wrapper(self.capture):
+            User.objects.count()
+        self.assertFalse(self.executed[0].startswith('/*'))
+
+    def test_statements_are_grouped_by_view(self):
+        groups = group_by_view(
+            [
+                ('/* view=ReportListView.get app=reports */ SELECT 1', 10, 50.0, 10),
+                ('/* view=LoanListCreateView.get app=loans */ SELECT 2', 5, 20.0, 5),
+                ('/* view=ReportListView.get app=reports */ SELECT 3', 2, 80.0, 2),
+                ('SELECT 4', 1, 1.0, 1),
+            ]
+        )
+        self.assertEqual([group[0] for group in groups], ['ReportListView.get', 'LoanListCreateView.get', '(sin etiqueta)'])
+        view, app, total_ms, calls, statements = groups[0]
+        self.assertEqual((app, total_ms, calls), ('reports', 130.0, 12))
+        self.assertEqual([statement[3] for statement in statements], ['SELECT 3', 'SELECT 1'])
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings_override = override_settings(PROFILING_ENABLED=True, PROFILING_DIR=self.directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        middleware_override = modify_settings(MIDDLEWARE={'append': 'apps.core.middleware.ProfilingMiddleware'})
+        middleware_override.enable()
+        self.addCleanup(middleware_override.disable)
+        # Con DJANGO_PROFILING apagado al arrancar, la conexión de las pruebas no lleva el recolector de consultas.
+        if record_profiled_query not in connection.execute_wrappers:
+            install_profiled_query_recorder(None, connection)
+            self.addCleanup(connection.execute_wrappers.remove, record_profiled_query)
+        self.admin = User.objects.create_superuser(username='profiler@example.com', email='profiler@example.com', password='Pass1234!')
+        self.member = User.objects.create_user(username='member@example.com', email='member@example.com', password='Pass1234!')
+        self.client = APIClient()
+        self.admin_headers = {'Authorization': f'Bearer {AccessToken.for_user(self.admin)}'}
+
+    def test_superadmin_request_is_profiled_once_per_interval(self):
+        response = self.client.get('/api/reports', headers={**self.admin_headers, 'X-Profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        profile_id = response['X-Profile-Id']
+        self.assertIn('ReportListView.get', profile_id)
+
+        download = self.client.get(f'/api/profiles/{profile_id}', headers=self.admin_headers)
+        self.assertEqual(download.status_code, 200)
+        with zipfile.ZipFile(BytesIO(b''.join(download.streaming_content))) as archive:
+            self.assertEqual(sorted(archive.namelist()), ['profile.prof', 'queries.json', 'summary.txt'])
+            queries = json.loads(archive.read('queries.json'))
+        self.assertEqual(queries['status'], 200)
+        self.assertTrue(any('reports_report' in query['sql'] for query in queries['queries']))
+
+        response = self.client.get('/api/reports?_profile=1', headers=self.admin_headers)
+        self.assertEqual(response['X-Profile-Skipped'], 'rate-limited')
+        self.assertNotIn('X-Profile-Id', response)
+
+        listing = self.client.get('/api/profiles', headers=self.admin_headers)
+        self.assertEqual([item['id'] for item in listing.data], [profile_id])
+
+    def test_memory_mode_reports_peak_and_allocation_sites(self):
+        for index in range(30):
+            Community.objects.create(name=f'Comunidad memoria {index}')
+        response = self.client.get('/api/communities', headers={**self.admin_headers, 'X-Profile': 'memory'})
+        download = self.client.get(f"/api/profiles/{response['X-Profile-Id']}", headers=self.admin_headers)
+        with zipfile.ZipFile(BytesIO(b''.join(download.streaming_content))) as archive:
+            self.assertNotIn('profile.prof', archive.namelist())
+            memory = json.loads(archive.read('memory.json'))
+        self.assertEqual(memory['mode'], 'memory')
+        self.assertGreater(memory['peak_bytes'], 0)
+        self.assertTrue(memory['sites'])
+
+    def test_freed_memory_does_not_hide_allocation_sites(self):
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        released = [bytes(1000) for _ in range(1000)]
+        with trace_memory(top=1) as report:
+            del released[:]
+            kept = [bytes(100) for _ in range(100)]
+        self.assertEqual(len(report.sites), 1)
+        self.assertGreater(report.sites[0]['bytes'], 0)
+        self.assertEqual(len(kept), 100)
+
+    def test_only_superadmins_can_profile_or_download(self):
+        member_headers = {'Authorization': f'Bearer {AccessToken.for_user(self.member)}'}
+        response = self.client.get('/api/communities', headers={**member_headers, 'X-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response)
+        response = self.client.get('/api/communities', headers={'Authorization': 'Bearer invalido', 'X-Profile': '1'})
+        self.assertNotIn('X-Profile-Id', response)
+
+        self.assertEqual(self.client.get('/api/profiles', headers=member_headers).status_code, 403)
+        self.assertEqual(self.client.get('/api/profiles/no-existe', headers=self.admin_headers).status_code, 404)
+
+
+class SamplingTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings_override = override_settings(SAMPLING_DIR=self.directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_folded_stacks_are_grouped_by_view_and_merged_across_workers(self):
+        request = RequestFactory().get('/api/reports')
+        request.resolver_match = resolve('/api/reports')
+        worker = Sampler(0.05, self.directory.name, 30)
+
+        thread_id = track_request(request)
+        try:
+            worker.sample()
+        finally:
+            untrack_request(thread_id)
+        worker.sample()
+
+        stacks = worker.snapshot()
+        self.assertEqual(sum(stacks.values()), 1)
+        stack = next(iter(stacks))
+        self.assertTrue(stack.startswith('ReportListView.get;'))
+        self.assertIn('SamplingTests.test_folded_stacks_are_grouped_by_view_and_merged_across_workers', stack)
+
+        worker.flush()
+        self.assertEqual(collect_stacks(), stacks)
+        self.assertEqual(collect_stacks('LoanListCreateView.get'), {})
+
+        admin = User.objects.create_superuser(username='sampler@example.com', email='sampler@example.com', password='Pass1234!')
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get('/api/profiles/samples?view=ReportListView.get')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode(), f'{stack} 1\n')
+
+    def test_retired_workers_are_merged_into_one_file(self):
+        directory = Path(self.directory.name)
+        (directory / '101.folded').write_text('ReportListView.get;a 2\n', encoding='utf-8')
+        (directory / '102.folded').write_text('ReportListView.get;a 1\nLoanListCreateView.get;b 3\n', encoding='utf-8')
+        (directory / '.102.folded').write_text('', encoding='utf-8')
+
+        retire_worker(101)
+        retire_worker(102)
+        retire_worker(103)
+
+        self.assertEqual(sorted(path.name for path in directory.iterdir()), ['retired.folded'])
+        self.assertEqual(collect_stacks(), {'ReportListView.get;a': 3, 'LoanListCreateView.get;b': 3})
+
+    @modify_settings(MIDDLEWARE={'prepend': 'apps.core.middleware.SamplingMiddleware'})
+    def test_middleware_starts_one_sampler_per_process(self):
+        self.addCleanup(stop_sampler)
+        APIClient().get('/api/communities')
+        first = sampler()
+        self.assertTrue(first.is_alive())
+        APIClient().get('/api/communities')
+        self.assertIs(sampler(), first)
+
+
+class SlowQueryPlanTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.community = Community.objects.create(name='Comunidad Lenta')
+        self.user = User.objects.create_user(username='slow@example.com', email='slow@example.com', password='Pass1234!')
+        Membership.objects.create(user=self.user, community=self.community, status=Membership.Status.APPROVED)
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        # Con DJANGO_SLOW_QUERY_MS=0 al arrancar, la conexión de las pruebas no lleva el recolector.
+        if record_slow_query not in connection.execute_wrappers:
+            install_slow_query_recorder(None, connection)
+            self.addCleanup(connection.execute_wrappers.remove, record_slow_query)
+
+    @override_settings(SLOW_QUERY_MS=0.000001, SLOW_QUERY_SAMPLE_RATE=1.0)
+    def test_slow_reads_are_scheduled_once_with_their_view(self):
+        with mock.patch('apps.core.slowqueries.schedule_explain') as schedule:
+            APIClient().get(f'/api/requests?community_id={self.community.id}', headers=self.headers)
+            APIClient().get(f'/api/requests?community_id={self.community.id}', headers=self.headers)
+
+        scheduled = [call.args for call in schedule.call_args_list]
+        request_queries = [args for args in scheduled if 'FROM "requests_request"' in args[1]]
+        self.assertEqual(len(request_queries), len({args[1] for args in request_queries}))
+        alias, sql, params, view, duration_ms = request_queries[0]
+        self.assertEqual((alias, view), ('default', 'RequestListCreateView.get'))
+        self.assertFalse(sql.startswith('/*'))
+        self.assertTrue(all(explainable(args[1], False) for args in scheduled))
+
+    def test_plan_is_stored_without_side_effects(self):
+        Request.objects.create(community=self.community, created_by_user=self.user, title='Plan', description='Test', category='general')
+        plan = explain_and_store(
+            'default', 'SELECT * FROM requests_request WHERE community_id = %s', [self.community.id], 'RequestListCreateView.get', 150.0
+        )
+        self.assertEqual(plan.error, '')
+        self.assertEqual(plan.plan[0]['Plan']['Actual Rows'], 1)
+
+        failed = explain_and_store('default', 'SELECT * FROM no_existe', [], '', 150.0)
+        self.assertIn('no_existe', failed.error)
+        self.assertEqual(SlowQueryPlan.objects.count(), 2)
+
+        self.assertFalse(explainable('SELECT * FROM requests_request FOR UPDATE', False))
+        self.assertFalse(explainable('UPDATE requests_request SET title = %s', False))
+        self.assertFalse(explainable('WITH moved AS (DELETE FROM chat_message RETURNING *) SELECT 1', False))
+
+    def test_each_process_gets_its_own_explain_pool(self):
+        pool, pending = executor()
+        self.assertEqual(executor(), (pool, pending))
+        with mock.patch('apps.core.slowqueries.os.getpid', return_value=-1):
+            forked_pool, forked_pending = executor()
+        self.addCleanup(forked_pool.shutdown)
+        self.assertIsNot(forked_pool, pool)
+        self.assertIsNot(forked_pending, pending)
+
+
+class NPlusOneTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.community = Community.objects.create(name='Comunidad N+1')
+        self.user = User.objects.create_user(username='nplusone@example.com', email='nplusone@example.com', password='Pass1234!')
+        Membership.objects.create(user=self.user, community=self.community, status=Membership.Status.APPROVED)
+        for index in range(6):
+            author = User.objects.create_user(username=f'autor{index}@example.com', password='Pass1234!')
+            Profile.objects.create(user=author, display_name=f'Autor {index}')
+            Request.objects.create(community=self.community, created_by_user=author, title=f'N+1 {index}', description='Test', category='general')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def per_row_lookups(self, request=None):
+        names = []
+        for item in Request.objects.all():
+            names.append(item.created_by_user.username)
+        return HttpResponse(', '.join(names))
+
+    def test_request_list_does_not_repeat_queries(self):
+        response = APIClient().get(f'/api/requests?community_id={self.community.id}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertNotIn('X-NPlusOne', response)
+
+    def test_strict_mode_reports_query_and_call_site(self):
+        with self.assertRaises(NPlusOneError) as raised:
+            with self.assertNoNPlusOne('bucle'):
+                self.per_row_lookups()
+        message = str(raised.exception)
+        self.assertIn('6 x SELECT ... FROM "auth_user" WHERE "auth_user"."id" = %s', message)
+        self.assertIn('apps/core/tests.py', message)
+        self.assertIn('(per_row_lookups)', message)
+
+    @override_settings(NPLUSONE_STRICT=False)
+    def test_middleware_flags_response_and_logs_when_not_strict(self):
+        middleware = NPlusOneMiddleware(self.per_row_lookups)
+        with self.assertLogs('apps.core.nplusone', 'WARNING'):
+            response = middleware(RequestFactory().get('/api/requests'))
+        self.assertEqual(response['X-NPlusOne'], '1')
+
+
+@override_settings(DATABASE_REPLICA_ALIAS='replica')
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.routed = []
+
+    def record_route(self, request):
+        with mock.patch.object(connections['default'], 'in_atomic_block', False):
+            self.routed.append(self.router.db_for_read(User))
+        return HttpResponse(status=201 if request.method == 'POST' else 200)
+
+    def test_router_uses_replica_only_when_enabled_and_outside_transactions(self):
+        with mock.patch.object(connections['default'], 'in_atomic_block', False):
+            self.assertIsNone(self.router.db_for_read(User))
+            with use_replica():
+                self.assertEqual(self.router.db_for_read(User), 'replica')
+                self.assertIsNone(self.router.db_for_write(User))
+                with read_from_primary():
+                    self.assertIsNone(self.router.db_for_read(User))
+            with override_settings(DATABASE_REPLICA_ALIAS=None), use_replica():
+                self.assertIsNone(self.router.db_for_read(User))
+
+        with use_replica():
+            self.assertIsNone(self.router.db_for_read(User))
+        self.assertFalse(self.router.allow_migrate('replica', 'core'))
+
+    def test_instances_read_from_replica_are_written_to_primary(self):
+        user = User(username='replica@example.com')
+        user._state.db = 'replica'
+        self.assertEqual(self.router.db_for_write(User, instance=user), 'default')
+
+    def test_middleware_pins_client_to_primary_after_write(self):
+        middleware = ReplicaRoutingMiddleware(self.record_route)
+        headers = {'HTTP_AUTHORIZATION': 'Bearer uno', 'REMOTE_ADDR': '10.0.0.1'}
+
+        middleware(self.factory.get('/api/requests', **headers))
+        middleware(self.factory.post('/api/requests', **headers))
+        middleware(self.factory.get('/api/requests', **headers))
+        middleware(self.factory.get('/api/requests', HTTP_AUTHORIZATION='Bearer dos', REMOTE_ADDR='10.0.0.2'))
+        middleware(self.factory.get('/admin/', REMOTE_ADDR='10.0.0.3'))
+
+        self.assertEqual(self.routed, ['replica', None, None, 'replica', None])
+
+    def test_failed_write_does_not_pin(self):
+        middleware = ReplicaRoutingMiddleware(lambda request: HttpResponse(status=400))
+        middleware(self.factory.post('/api/requests', REMOTE_ADDR='10.0.0.1'))
+
+        middleware = ReplicaRoutingMiddleware(self.record_route)
+        middleware(self.factory.get('/api/requests', REMOTE_ADDR='10.0.0.1'))
+        self.assertEqual(self.routed, ['replica'])
+
+
+@override_settings(DATABASE_RLS=True)
+class RowLevelSecurityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.community = Community.objects.create(name='Comunidad RLS')
+        self.other_community = Community.objects.create(name='Comunidad Ajena')
+        self.user = User.objects.create_user(username='rls@example.com', email='rls@example.com', password='Pass1234!')
+        Membership.objects.create(user=self.user, community=self.community, status=Membership.Status.APPROVED)
+        self.visible = Request.objects.create(community=self.community, created_by_user=self.user, title='Visible', description='Test')
+        Request.objects.create(community=self.other_community, created_by_user=self.user, title='Oculta', description='Test')
+
+        # Un superusuario no pasa por las políticas: las pruebas usan un rol normal, como en producción.
+        with connection.cursor() as cursor:
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute('CREATE ROLE auzolan_rls_test NOLOGIN')
+            cursor.execute('GRANT ALL ON ALL TABLES IN SCHEMA public TO auzolan_rls_test')
+            cursor.execute('GRANT ALL ON ALL SEQUENCES IN SCHEMA public TO auzolan_rls_test')
+        call_command('rls_policies', 'enable', stdout=StringIO())
+        with connection.cursor() as cursor:
+            cursor.execute('SET ROLE auzolan_rls_test')
+        self.addCleanup(self.reset_role)
+
+    def reset_role(self):
+        with connection.cursor() as cursor:
+            cursor.execute('RESET ROLE')
+
+    def list_requests(self, user, community):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client.get(f'/api/requests?community_id={community.id}')
+
+    def list_titles(self, user, community):
+        response = self.list_requests(user, community)
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.data['results']]
+
+    def test_database_filters_requests_by_approved_membership(self):
+        self.assertEqual(self.list_titles(self.user, self.community), ['Visible'])
+        self.assertEqual(self.list_requests(self.user, self.other_community).status_code, 403)
+
+        response = APIClient().get(f'/api/requests/{self.visible.id}')
+        self.assertEqual(response.status_code, 401)
+
+    def test_superadmin_bypasses_policies(self):
+        with connection.cursor() as cursor:
+            cursor.execute('RESET ROLE')
+        superadmin = User.objects.create_superuser(username='rls-root@example.com', password='Pass1234!')
+        with connection.cursor() as cursor:
+            cursor.execute('SET ROLE auzolan_rls_test')
+        self.assertEqual(self.list_titles(superadmin, self.other_community), ['Oculta'])
+
+    def rls_setting(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT current_setting(%s, true)', [name])
+            return cursor.fetchone()[0]
+
+    def test_connection_state_does_not_leak_into_the_next_request(self):
+        with connection.cursor() as cursor:
+            cursor.execute('RESET ROLE')
+        superadmin = User.objects.create_superuser(username='rls-leak@example.com', password='Pass1234!')
+        with connection.cursor() as cursor:
+            cursor.execute('SET ROLE auzolan_rls_test')
+        self.assertEqual(self.list_titles(superadmin, self.other_community), ['Oculta'])
+        self.assertEqual(self.list_requests(self.user, self.other_community).status_code, 403)
+
+        token = begin_request()
+        try:
+            self.assertEqual(self.rls_setting('app.rls_bypass'), 'off')
+            with bypass_rls():
+                self.assertEqual(self.rls_setting('app.rls_bypass'), 'on')
+            self.assertEqual(self.rls_setting('app.rls_bypass'), 'off')
+        finally:
+            end_request(token)
+
+    def test_state_is_only_set_when_the_connection_switches_users(self):
+        for expected in (1, 0):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.list_titles(self.user, self.community), ['Visible'])
+            self.assertEqual(sum('set_config' in query['sql'] for query in queries.captured_queries), expected)
+
+    def test_rolled_back_state_is_set_again(self):
+        self.assertEqual(self.rls_setting('app.rls_bypass'), 'on')
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            token = begin_request()
+            self.assertEqual(self.rls_setting('app.rls_bypass'), 'off')
+            raise RuntimeError
+        try:
+            self.assertEqual(self.rls_setting('app.rls_bypass'), 'off')
+        finally:
+            end_request(token)
+
+    def test_session_users_are_mapped_for_django_views(self):
+        with connection.cursor() as cursor:
+            cursor.execute('RESET ROLE')
+        self.user.is_staff = True
+        self.user.save(update_fields=['is_staff'])
+        self.user.user_permissions.add(Permission.objects.get(codename='view_request'))
+        with connection.cursor() as cursor:
+            cursor.execute('SET ROLE auzolan_rls_test')
+
+        client = APIClient()
+        client.force_login(self.user)
+        response = client.get('/admin/requests/request/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Visible')
+        self.assertNotContains(response, 'Oculta')
+
+    def test_status_reports_policies(self):
+        out = StringIO()
+        call_command('rls_policies', 'status', '--database', 'default', stdout=out)
+        self.assertIn('requests_request: rls=on force=on policy=yes', out.getvalue())
@@ -0,0 +1,18 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Value
+from django.db.models.functions import Lower, NullIf
+
+EMAIL_LOWER_INDEX = 'auth_user_email_lower_uniq'
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def email_key():
+    # Misma expresión que el índice único de 0001_email_lower_index para que PostgreSQL lo use.
+    return NullIf(Lower('email'), Value(''))
+
+
+def users_with_email(email):
+    return get_user_model().objects.annotate(email_key=email_key()).filter(email_key=normalize_email(email))
@@ -0,0 +1,24 @@
+UNMATCHED_VIEW = 'unmatched'
+
+
+def resolved_view(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return getattr(match.func, 'view_class', None) or match.func
+
+
+def view_label(request):
+    view = resolved_view(request)
+    if view is None:
+        return UNMATCHED_VIEW
+    return f'{view.__name__}.{request.method.lower()}'
+
+
+def view_app(request):
+    # apps.requests.views -> requests
+    view = resolved_view(request)
+    if view is None:
+        return UNMATCHED_VIEW
+    parts = view.__module__.split('.')
+    return parts[1] if parts[0] == 'apps' and len(parts) > 1 else parts[0]
@@ -1,13 +1,22 @@
-﻿from django.contrib.auth import get_user_model
-from django.core.exceptions import ObjectDoesNotExist
-from drf_spectacular.utils import OpenApiResponse, extend_schema
+﻿from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import FileResponse, Http404, HttpResponse
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from apps.communities.models import Community, Membership
-from apps.core.serializers import RegisterSerializer, CustomTokenObtainPairSerializer
+from apps.core.db import pool_stats
+from apps.core.me import get_me_payload
+from apps.core.openapi import OpenApiResponse, extend_schema
+from apps.core.permissions import IsSuperAdmin
+from apps.core.profiling import artifact_path, list_artifacts
+from apps.core.sampling import collect_stacks, format_folded
+from apps.core.schema import schema_version
+from apps.core.serializers import RegisterSerializer, CustomTokenObtainPairSerializer, MeSerializer
+from apps.core.warmup import warmup_state
 
 User = get_user_model()
 
@@ -69,46 +78,103 @@ class CustomTokenRefreshView(TokenRefreshView):
 class MeView(APIView):
     @extend_schema(
         summary='Perfil del usuario actual',
-        description='Devuelve los datos básicos del usuario autenticado y sus membresías.',
+        description=(
+            'Devuelve los datos básicos del usuario autenticado y sus membresías (cacheado por usuario). '
+            'Para superadmin communities va vacío y all_communities es true.'
+        ),
+        responses={200: MeSerializer},
     )
     def get(self, request):
-        if request.user.is_superuser:
-            communities = Community.objects.all().order_by('id')
-            memberships_payload = [
-                {
-                    'community_id': c.id,
-                    'community_name': c.name,
-                    'status': Membership.Status.APPROVED,
-                    'role_in_community': 'superadmin',
-                }
-                for c in communities
-            ]
-        else:
-            memberships = (
-                Membership.objects.filter(user=request.user)
-                .select_related('community')
-                .order_by('community_id')
-            )
-            memberships_payload = [
+        return Response(get_me_payload(request.user))
+
+
+class ReadinessView(APIView):
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(
+        summary='Readiness del proceso',
+        description=(
+            'Devuelve 200 cuando el warm-up (BD, URLs, serializers y cachés) ha terminado y 503 mientras tanto. '
+            'Sin warm-up configurado (DJANGO_WARMUP) el proceso está listo desde el arranque.'
+        ),
+        responses={
+            200: OpenApiResponse(description='Listo para recibir tráfico'),
+            503: OpenApiResponse(description='Warm-up en curso'),
+        },
+    )
+    def get(self, request):
+        state = warmup_state()
+        if settings.WARMUP_ENABLED and not state['ready']:
+            return Response({'status': 'warming_up'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({'status': 'ready', 'version': schema_version(), 'warmup_ms': state['duration_ms']})
+
+
+class DatabasePoolStatsView(APIView):
+    permission_classes = [IsSuperAdmin]
+
+    @extend_schema(
+        summary='Estado del pool de conexiones',
+        description='Solo superadmin. Tamaño, conexiones disponibles, peticiones en espera y tiempos de espera del pool de psycopg de este proceso.',
+        responses={200: OpenApiResponse(description='Estadísticas por alias de base de datos')},
+    )
+    def get(self, request):
+        return Response({'pools': pool_stats()})
+
+
+class ProfileListView(APIView):
+    permission_classes = [IsSuperAdmin]
+
+    @extend_schema(
+        summary='Perfiles de peticiones',
+        description='Solo superadmin. Artefactos de cProfile y tracemalloc guardados, del más reciente al más antiguo.',
+        responses={200: OpenApiResponse(description='Lista de perfiles (id, tamaño y fecha)')},
+    )
+    def get(self, request):
+        return Response(
+            [
                 {
-                    'community_id': m.community_id,
-                    'community_name': m.community.name,
-                    'status': m.status,
-                    'role_in_community': m.role_in_community,
+                    'id': path.stem,
+                    'size': path.stat().st_size,
+                    'created_at': datetime.fromtimestamp(path.stat().st_mtime, tz=dt_timezone.utc),
                 }
-                for m in memberships
+                for path in list_artifacts()
             ]
+        )
+
+
+class ProfileDownloadView(APIView):
+    permission_classes = [IsSuperAdmin]
 
-        try:
-            display_name = request.user.profile.display_name
-        except ObjectDoesNotExist:
-            display_name = ''
-
-        data = {
-            'id': request.user.id,
-            'email': request.user.email,
-            'display_name': display_name,
-            'is_superadmin': bool(request.user.is_superuser),
-            'communities': memberships_payload,
-        }
-        return Response(data)
+    @extend_schema(
+        summary='Descargar un perfil',
+        description=(
+            'Solo superadmin. ZIP con profile.prof (pstats) o memory.json (tracemalloc), '
+            'queries.json (SQL con tiempos) y summary.txt.'
+        ),
+        responses={
+            200: OpenApiResponse(description='Artefacto ZIP'),
+            404: OpenApiResponse(description='Perfil no encontrado'),
+        },
+    )
+    def get(self, request, profile_id):
+        path = artifact_path(profile_id)
+        if path is None:
+            raise Http404('Perfil no encontrado.')
+        return FileResponse(path.open('rb'), as_attachment=True, filename=path.name, content_type='application/zip')
+
+
+class SampledStacksView(APIView):
+    permission_classes = [IsSuperAdmin]
+
+    @extend_schema(
+        summary='Pilas muestreadas por vista',
+        description=(
+            'Solo superadmin. Folded stacks (una línea "vista;marco;...;marco N" por pila) de todos los workers, '
+            'listas para flamegraph.pl o speedscope. ?view=ReportListView.get filtra por vista.'
+        ),
+        responses={200: OpenApiResponse(description='Texto plano con las pilas y su número de muestras')},
+    )
+    def get(self, request):
+        stacks = collect_stacks(request.query_params.get('view'))
+        return HttpResponse(format_folded(stacks), content_type='text/plain; charset=utf-8')
@@ -0,0 +1,142 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.core.db import close_pools
+
+logger = logging.getLogger(__name__)
+
+_state = {'ready': False, 'duration_ms': None, 'steps': {}}
+RECENT_ROWS_PER_USER = 5
+
+
+def is_ready():
+    return _state['ready']
+
+
+def warmup_state():
+    return dict(_state)
+
+
+def reset_warmup_state():
+    _state.update({'ready': False, 'duration_ms': None, 'steps': {}})
+
+
+def check_databases():
+    for connection in connections.all():
+        if connection.alias == 'replica' and not settings.DATABASE_REPLICA_ALIAS:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+
+def walk_patterns(patterns):
+    for pattern in patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            yield from walk_patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def warm_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    return sum(1 for _ in walk_patterns(resolver.url_patterns))
+
+
+def all_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from all_subclasses(subclass)
+
+
+def warm_serializers():
+    count = 0
+    for serializer_class in set(all_subclasses(serializers.Serializer)):
+        if not serializer_class.__module__.startswith('apps.'):
+            continue
+        try:
+            serializer_class().fields
+        except Exception:
+            logger.debug('No se pudo precalentar %s', serializer_class.__name__, exc_info=True)
+            continue
+        count += 1
+    return count
+
+
+def prime_caches():
+    from apps.communities.directory import get_directory
+    from apps.core.me import get_me_payload
+    from apps.core.schema import get_schema_artifacts
+
+    get_directory()
+    get_schema_artifacts()
+
+    if not settings.API_CACHES_ENABLED:
+        return 0
+    since = timezone.now() - timedelta(days=settings.WARMUP_ME_DAYS)
+    user_ids = recently_active_user_ids(since, settings.WARMUP_ME_USERS)
+    users = get_user_model().objects.filter(is_active=True, id__in=user_ids).select_related('profile')
+    count = 0
+    for user in users:
+        get_me_payload(user)
+        count += 1
+    return count
+
+
+def recently_active_user_ids(since, limit):
+    # Sin escribir last_login en cada login: la actividad sale de los últimos mensajes y peticiones, leídos por pk.
+    from apps.chat.models import Message
+    from apps.core.shards import across_shards
+    from apps.requests.models import Request
+
+    last_seen = {}
+    for queryset in (
+        Message.objects.order_by('-id').values_list('sender_user_id', 'created_at'),
+        Request.objects.order_by('-id').values_list('created_by_user_id', 'created_at'),
+    ):
+        for user_id, created_at in across_shards(queryset[:limit * RECENT_ROWS_PER_USER]):
+            if created_at >= since:
+                last_seen[user_id] = max(created_at, last_seen.get(user_id, created_at))
+    return sorted(last_seen, key=last_seen.get, reverse=True)[:limit]
+
+
+def release_connections():
+    close_pools()
+    for cache in caches.all(initialized_only=True):
+        cache.close()
+
+
+def warm_up(close_connections=True):
+    started = time.perf_counter()
+    steps = {}
+    for name, step in (
+        ('databases', check_databases),
+        ('urls', warm_urls),
+        ('serializers', warm_serializers),
+        ('caches', prime_caches),
+    ):
+        step_started = time.perf_counter()
+        result = step()
+        steps[name] = {'ms': round((time.perf_counter() - step_started) * 1000, 1), 'result': result}
+
+    # Antes del fork no deben quedar sockets abiertos que heredarían todos los workers.
+    if close_connections:
+        release_connections()
+
+    _state.update({'ready': True, 'duration_ms': round((time.perf_counter() - started) * 1000, 1), 'steps': steps})
+    logger.info('Warm-up completado en %s ms', _state['duration_ms'], extra={'steps': steps})
+    return warmup_state()
+
+
+def warm_up_worker():
+    check_databases()
@@ -9,8 +9,10 @@ class LoanItem(models.Model):
         AVAILABLE = 'available', 'available'
         LOANED = 'loaned', 'loaned'
 
-    community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='loan_items')
-    owner_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, related_name='owned_loan_items')
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='loan_items', db_constraint=False)
+    owner_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.PROTECT, related_name='owned_loan_items', db_constraint=False
+    )
     title = models.CharField(max_length=120)
     description = models.CharField(max_length=500, blank=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.AVAILABLE)
@@ -20,6 +22,7 @@ class LoanItem(models.Model):
         related_name='borrowed_loan_items',
         null=True,
         blank=True,
+        db_constraint=False,
     )
     loaned_at = models.DateTimeField(null=True, blank=True)
     returned_at = models.DateTimeField(null=True, blank=True)
@@ -44,7 +47,9 @@ class LoanRequest(models.Model):
         WITHDRAWN = 'withdrawn', 'withdrawn'
 
     item = models.ForeignKey(LoanItem, on_delete=models.CASCADE, related_name='requests')
-    requester_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='loan_requests')
+    requester_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='loan_requests', db_constraint=False
+    )
     message = models.CharField(max_length=280, blank=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     responded_at = models.DateTimeField(null=True, blank=True)
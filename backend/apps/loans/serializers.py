@@ -1,25 +1,13 @@
-from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import serializers
 
 from apps.communities.models import Community
 from apps.loans.models import LoanItem, LoanRequest
+from apps.profiles.summaries import UserSummaryListSerializer, UserSummaryMixin
 
 
-def resolve_display_name(user):
-    if not user:
-        return ''
+class LoanItemSerializer(UserSummaryMixin, serializers.ModelSerializer):
+    user_summary_fields = ('owner_user_id', 'borrower_user_id')
 
-    try:
-        profile = user.profile
-    except ObjectDoesNotExist:
-        profile = None
-
-    if profile and profile.display_name:
-        return profile.display_name
-    return user.email or f'Usuario #{user.id}'
-
-
-class LoanItemSerializer(serializers.ModelSerializer):
     community_id = serializers.PrimaryKeyRelatedField(source='community', queryset=Community.objects.all())
     owner_user_id = serializers.IntegerField(read_only=True)
     owner_display_name = serializers.SerializerMethodField()
@@ -54,12 +42,13 @@ class LoanItemSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         )
+        list_serializer_class = UserSummaryListSerializer
 
     def get_owner_display_name(self, obj):
-        return resolve_display_name(getattr(obj, 'owner_user', None))
+        return self.user_display_name(obj.owner_user_id)
 
     def get_borrower_display_name(self, obj):
-        return resolve_display_name(getattr(obj, 'borrower_user', None))
+        return self.user_display_name(obj.borrower_user_id)
 
     def get_pending_requests_count(self, obj):
         if hasattr(obj, 'pending_requests_count'):
@@ -73,7 +62,9 @@ class LoanItemUpdateSerializer(serializers.ModelSerializer):
         fields = ('title', 'description')
 
 
-class LoanRequestSerializer(serializers.ModelSerializer):
+class LoanRequestSerializer(UserSummaryMixin, serializers.ModelSerializer):
+    user_summary_fields = ('requester_user_id',)
+
     item_id = serializers.IntegerField(read_only=True)
     requester_user_id = serializers.IntegerField(read_only=True)
     requester_display_name = serializers.SerializerMethodField()
@@ -92,6 +83,7 @@ class LoanRequestSerializer(serializers.ModelSerializer):
             'updated_at',
         )
         read_only_fields = ('status', 'responded_at', 'created_at', 'updated_at')
+        list_serializer_class = UserSummaryListSerializer
 
     def get_requester_display_name(self, obj):
-        return resolve_display_name(getattr(obj, 'requester_user', None))
+        return self.user_display_name(obj.requester_user_id)
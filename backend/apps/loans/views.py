@@ -1,14 +1,20 @@
-from django.db import transaction
 from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.openapi import OpenApiParameter, extend_schema
 from apps.core.pagination import StandardResultsPagination
-from apps.core.permissions import has_approved_membership, is_superadmin, normalize_community_id
+from apps.core.permissions import (
+    can_list_community,
+    has_approved_membership,
+    is_superadmin,
+    normalize_community_id,
+    paginate_community_list,
+)
+from apps.core.shards import atomic_on_shard
 from apps.loans.models import LoanItem, LoanRequest
 from apps.loans.serializers import LoanItemSerializer, LoanItemUpdateSerializer, LoanRequestSerializer
 
@@ -37,12 +43,11 @@ class LoanListCreateView(APIView):
         community_id_int = normalize_community_id(community_id)
         if community_id_int is None:
             return Response({'detail': 'community_id inválido.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not has_approved_membership(request.user, community_id_int):
+        if not can_list_community(request.user, community_id_int):
             return Response({'detail': 'No perteneces a la comunidad.'}, status=status.HTTP_403_FORBIDDEN)
 
         queryset = (
             LoanItem.objects.filter(community_id=community_id_int)
-            .select_related('owner_user', 'owner_user__profile', 'borrower_user', 'borrower_user__profile')
             .annotate(
                 pending_requests_count=Count(
                     'requests',
@@ -64,7 +69,7 @@ class LoanListCreateView(APIView):
             queryset = queryset.order_by('created_at')
 
         paginator = StandardResultsPagination()
-        page = paginator.paginate_queryset(queryset, request)
+        page = paginate_community_list(paginator, queryset, request, community_id_int)
         serializer = LoanItemSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
 
@@ -95,12 +100,7 @@ class LoanDetailView(APIView):
     )
     def get(self, request, loan_id):
         item = get_object_or_404(
-            LoanItem.objects.select_related(
-                'owner_user',
-                'owner_user__profile',
-                'borrower_user',
-                'borrower_user__profile',
-            ).annotate(
+            LoanItem.objects.annotate(
                 pending_requests_count=Count(
                     'requests',
                     filter=Q(requests__status=LoanRequest.Status.PENDING),
@@ -171,7 +171,6 @@ class LoanRequestListCreateView(APIView):
 
         queryset = (
             LoanRequest.objects.filter(item=item)
-            .select_related('requester_user', 'requester_user__profile')
             .order_by('-created_at')
         )
         paginator = StandardResultsPagination()
@@ -209,7 +208,7 @@ class LoanRequestListCreateView(APIView):
 class LoanRequestAcceptView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
-    @transaction.atomic
+    @atomic_on_shard
     @extend_schema(
         summary='Aceptar solicitud de préstamo',
         description='Solo quien presta el item o superadmin puede aceptar; el item pasa a loaned.',
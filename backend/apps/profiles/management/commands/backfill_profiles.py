@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.core.db import stream
+from apps.profiles.models import Profile, default_display_name_for_user
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Crea el perfil de los usuarios que todavía no lo tienen.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        users = User.objects.filter(profile__isnull=True).order_by('id').only('id', 'email')
+
+        created = 0
+        batch = []
+        for user in stream(users, chunk_size=batch_size):
+            batch.append(Profile(user=user, display_name=default_display_name_for_user(user)))
+            if len(batch) >= batch_size:
+                created += self.insert(batch)
+                batch = []
+        if batch:
+            created += self.insert(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Perfiles creados: {created}'))
+
+    def insert(self, batch):
+        # Con ignore_conflicts bulk_create devuelve todo el lote: se cuentan las filas que existen de verdad.
+        existing = Profile.objects.filter(user_id__in=[profile.user_id for profile in batch])
+        before = existing.count()
+        Profile.objects.bulk_create(batch, ignore_conflicts=True)
+        return existing.count() - before
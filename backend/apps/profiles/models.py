@@ -1,7 +1,14 @@
 ﻿from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 
 
+def default_display_name_for_user(user):
+    if user.email and '@' in user.email:
+        return user.email.split('@', 1)[0]
+    return f'Usuario {user.id}'
+
+
 class Profile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='profile')
     display_name = models.CharField(max_length=80)
@@ -11,3 +18,10 @@ class Profile(models.Model):
 
     def __str__(self):
         return self.display_name
+
+
+def get_profile_or_default(user):
+    try:
+        return user.profile
+    except ObjectDoesNotExist:
+        return Profile(user=user, display_name=default_display_name_for_user(user))
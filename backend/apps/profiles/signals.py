@@ -0,0 +1,34 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from apps.profiles.models import Profile, default_display_name_for_user
+from apps.profiles.summaries import invalidate_user_summary
+
+
+def ensure_profile(user):
+    Profile.objects.get_or_create(user=user, defaults={'display_name': default_display_name_for_user(user)})
+
+
+def create_profile_for_new_user(sender, instance, created, raw=False, **kwargs):
+    # Se difiere al commit para no chocar con quien crea el perfil en la misma transacción (registro, seeds, tests).
+    if created and not raw:
+        transaction.on_commit(partial(ensure_profile, instance))
+
+
+def invalidate_summary_for_user(sender, instance, using=None, **kwargs):
+    invalidate_user_summary(instance.id, using)
+
+
+def invalidate_summary_for_profile(sender, instance, using=None, **kwargs):
+    invalidate_user_summary(instance.user_id, using)
+
+
+def connect_signals():
+    user_model = get_user_model()
+    post_save.connect(create_profile_for_new_user, sender=user_model, dispatch_uid='profiles_create_for_new_user')
+    post_save.connect(invalidate_summary_for_user, sender=user_model, dispatch_uid='profiles_summary_user_saved')
+    post_save.connect(invalidate_summary_for_profile, sender=Profile, dispatch_uid='profiles_summary_profile_saved')
+    post_delete.connect(invalidate_summary_for_profile, sender=Profile, dispatch_uid='profiles_summary_profile_deleted')
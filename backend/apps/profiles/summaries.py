@@ -0,0 +1,225 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from rest_framework import serializers
+
+from apps.core.routers import read_from_primary
+
+USER_SUMMARY_CACHE_TIMEOUT = 3600
+USER_SUMMARY_LRU_SIZE = 10000
+USER_SUMMARY_CONTEXT_KEY = 'user_summaries'
+DEFAULT_FALLBACK_NAME = 'Usuario #{id}'
+
+
+def user_summary_version_key(user_id):
+    return f'user-summary-version:{user_id}'
+
+
+def user_summary_cache_key(user_id, version):
+    return f'user-summary:{user_id}:{version}'
+
+
+def new_version():
+    # Marca de tiempo y no contador: si la cache pierde la clave de versión, la nueva no repite una ya usada.
+    return time.time_ns()
+
+
+def resolve_display_name(user_id, email, profile_display_name, fallback=DEFAULT_FALLBACK_NAME):
+    return profile_display_name or email or fallback.format(id=user_id)
+
+
+def user_display_name(user, fallback=DEFAULT_FALLBACK_NAME):
+    if not user:
+        return ''
+
+    try:
+        profile = user.profile
+    except ObjectDoesNotExist:
+        profile = None
+
+    return resolve_display_name(user.id, user.email, profile.display_name if profile else '', fallback)
+
+
+def bump_user_summary_version(user_id):
+    cache.set(user_summary_version_key(user_id), new_version(), None)
+
+
+def invalidate_user_summary(user_id, using=None):
+    # Tras el commit: antes, una lectura concurrente volvería a cachear el nombre anterior.
+    if settings.API_CACHES_ENABLED:
+        transaction.on_commit(partial(bump_user_summary_version, user_id), using=using)
+
+
+class SummaryLRU:
+    # Copia en proceso por (usuario, versión): al cambiar la versión en la cache compartida deja de encontrarse.
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            summary = self.items.get(key)
+            if summary is not None:
+                self.items.move_to_end(key)
+            return summary
+
+    def set(self, key, summary):
+        with self.lock:
+            self.items[key] = summary
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+_lru = SummaryLRU(USER_SUMMARY_LRU_SIZE)
+
+
+class UserSummaryLoader:
+    def __init__(self):
+        self._summaries = {}
+
+    def _missing(self, user_ids):
+        return {user_id for user_id in user_ids if user_id and user_id not in self._summaries}
+
+    def _version_keys(self, missing):
+        return {user_summary_version_key(user_id): user_id for user_id in missing}
+
+    def _versions(self, keys, found):
+        # Los usuarios aún sin versión reciben una nueva, que se guarda antes de leer la BD.
+        versions = {keys[key]: version for key, version in found.items()}
+        created = {key: new_version() for key in keys if key not in found}
+        versions.update({keys[key]: version for key, version in created.items()})
+        return versions, created
+
+    def _store_lru(self, versions):
+        missing = set()
+        for user_id, version in versions.items():
+            summary = _lru.get((user_id, version))
+            if summary is None:
+                missing.add(user_id)
+            else:
+                self._summaries[user_id] = summary
+        return missing
+
+    def _cache_keys(self, missing, versions):
+        return {user_summary_cache_key(user_id, versions[user_id]): user_id for user_id in missing}
+
+    def _store_cached(self, keys, cached, versions):
+        for key, summary in cached.items():
+            user_id = keys[key]
+            self._summaries[user_id] = summary
+            _lru.set((user_id, versions[user_id]), summary)
+        return set(keys.values()) - {keys[key] for key in cached}
+
+    def _store_loaded(self, rows, versions=None):
+        loaded = {}
+        for row in rows:
+            loaded[row['id']] = {'id': row['id'], 'display_name': row['profile__display_name'] or row['email']}
+        self._summaries.update(loaded)
+        if versions is None:
+            return {}
+        for user_id, summary in loaded.items():
+            _lru.set((user_id, versions[user_id]), summary)
+        return {user_summary_cache_key(user_id, versions[user_id]): summary for user_id, summary in loaded.items()}
+
+    def _query(self, user_ids):
+        return get_user_model().objects.filter(id__in=user_ids).values('id', 'email', 'profile__display_name')
+
+    def prime(self, user_ids):
+        missing = self._missing(user_ids)
+        if not missing:
+            return
+        if not settings.API_CACHES_ENABLED:
+            with read_from_primary():
+                self._store_loaded(self._query(missing))
+            return
+        # Versiones en la cache compartida, resúmenes en el LRU del proceso y, si faltan, en la cache compartida.
+        version_keys = self._version_keys(missing)
+        versions, created = self._versions(version_keys, cache.get_many(list(version_keys)))
+        if created:
+            cache.set_many(created, None)
+        missing = self._store_lru(versions)
+        if missing:
+            keys = self._cache_keys(missing, versions)
+            missing = self._store_cached(keys, cache.get_many(list(keys)), versions)
+        if missing:
+            with read_from_primary():
+                loaded = self._store_loaded(self._query(missing), versions)
+            cache.set_many(loaded, USER_SUMMARY_CACHE_TIMEOUT)
+
+    async def aprime(self, user_ids):
+        missing = self._missing(user_ids)
+        if not missing:
+            return
+        if not settings.API_CACHES_ENABLED:
+            with read_from_primary():
+                self._store_loaded([row async for row in self._query(missing)])
+            return
+        version_keys = self._version_keys(missing)
+        versions, created = self._versions(version_keys, await cache.aget_many(list(version_keys)))
+        if created:
+            await cache.aset_many(created, None)
+        missing = self._store_lru(versions)
+        if missing:
+            keys = self._cache_keys(missing, versions)
+            missing = self._store_cached(keys, await cache.aget_many(list(keys)), versions)
+        if missing:
+            with read_from_primary():
+                loaded = self._store_loaded([row async for row in self._query(missing)], versions)
+            await cache.aset_many(loaded, USER_SUMMARY_CACHE_TIMEOUT)
+
+    def get(self, user_id):
+        if not user_id:
+            return None
+        self.prime([user_id])
+        return self._summaries.get(user_id)
+
+    def display_name(self, user_id, fallback=DEFAULT_FALLBACK_NAME):
+        summary = self.get(user_id)
+        if not summary:
+            return ''
+        return summary['display_name'] or fallback.format(id=user_id)
+
+
+def get_user_summary_loader(context):
+    loader = context.get(USER_SUMMARY_CONTEXT_KEY)
+    if loader is None:
+        loader = UserSummaryLoader()
+        context[USER_SUMMARY_CONTEXT_KEY] = loader
+    return loader
+
+
+def summary_user_ids(serializer_class, items):
+    return [getattr(item, field, None) for item in items for field in serializer_class.user_summary_fields]
+
+
+async def aprime_user_summaries(serializer_class, items, context):
+    await get_user_summary_loader(context).aprime(summary_user_ids(serializer_class, items))
+
+
+class UserSummaryListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        get_user_summary_loader(self.context).prime(summary_user_ids(self.child, items))
+        return super().to_representation(items)
+
+
+class UserSummaryMixin:
+    # Campos *_user_id cuyos nombres se cargan en bloque (una consulta por página) al serializar listas.
+    user_summary_fields = ()
+    user_fallback_name = DEFAULT_FALLBACK_NAME
+
+    def user_display_name(self, user_id):
+        return get_user_summary_loader(self.context).display_name(user_id, self.user_fallback_name)
@@ -1,4 +1,7 @@
-﻿from django.contrib.auth import get_user_model
+﻿from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from rest_framework.test import APIClient
 
@@ -53,3 +56,45 @@ class MeProfileTests(TestCase):
         self.assertEqual(response.status_code, 400)
         self.user.refresh_from_db()
         self.assertEqual(self.user.email, 'profile@example.com')
+
+
+class ProfileReadPathTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='sinperfil@example.com',
+            email='sinperfil@example.com',
+            password='Pass1234!',
+        )
+
+    def test_get_profile_without_profile_does_not_write(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/profile')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['display_name'], 'sinperfil')
+        self.assertFalse(Profile.objects.filter(user=self.user).exists())
+
+    def test_get_profile_is_joined_with_authenticated_user(self):
+        Profile.objects.create(user=self.user, display_name='Con Perfil')
+        token = self.client.post(
+            '/api/auth/token',
+            {'email': 'sinperfil@example.com', 'password': 'Pass1234!'},
+            format='json',
+        ).data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/profile')
+        self.assertEqual(response.data['display_name'], 'Con Perfil')
+
+    def test_new_users_get_a_profile_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create_user(username='auto@example.com', email='auto@example.com', password='Pass1234!')
+        self.assertEqual(Profile.objects.get(user=user).display_name, 'auto')
+
+    def test_backfill_profiles_creates_missing_profiles(self):
+        output = StringIO()
+        call_command('backfill_profiles', stdout=output)
+        self.assertIn('Perfiles creados: 1', output.getvalue())
+        self.assertEqual(Profile.objects.get(user=self.user).display_name, 'sinperfil')
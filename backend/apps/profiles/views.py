@@ -1,18 +1,12 @@
-﻿from drf_spectacular.utils import extend_schema
-from rest_framework import permissions, status
+﻿from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.profiles.models import Profile
+from apps.core.openapi import extend_schema
+from apps.profiles.models import get_profile_or_default
 from apps.profiles.serializers import ProfileUpdateSerializer
 
 
-def default_display_name_for_user(user):
-    if user.email and '@' in user.email:
-        return user.email.split('@', 1)[0]
-    return f'Usuario {user.id}'
-
-
 class MeProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -21,10 +15,7 @@ class MeProfileView(APIView):
         description='Devuelve la información editable del usuario autenticado.',
     )
     def get(self, request):
-        profile, _ = Profile.objects.get_or_create(
-            user=request.user,
-            defaults={'display_name': default_display_name_for_user(request.user)},
-        )
+        profile = get_profile_or_default(request.user)
 
         return Response(
             {
@@ -49,10 +40,7 @@ class MeProfileView(APIView):
         serializer.is_valid(raise_exception=True)
         validated = serializer.validated_data
 
-        profile, _ = Profile.objects.get_or_create(
-            user=request.user,
-            defaults={'display_name': default_display_name_for_user(request.user)},
-        )
+        profile = get_profile_or_default(request.user)
 
         fields_to_update = []
         if 'display_name' in validated:
@@ -62,7 +50,9 @@ class MeProfileView(APIView):
             profile.bio = validated['bio']
             fields_to_update.append('bio')
 
-        if fields_to_update:
+        if profile.pk is None:
+            profile.save()
+        elif fields_to_update:
             profile.save(update_fields=fields_to_update + ['updated_at'])
 
         return Response(
@@ -16,7 +16,7 @@ class Report(models.Model):
         HARASSMENT = 'harassment', 'harassment'
         OTHER = 'other', 'other'
 
-    reporter_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
+    reporter_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, db_constraint=False)
     request = models.ForeignKey(Request, on_delete=models.CASCADE)
     reason = models.CharField(max_length=40, choices=Reason.choices)
     description = models.CharField(max_length=500, blank=True)
@@ -1,10 +1,12 @@
-﻿from django.core.exceptions import ObjectDoesNotExist
-from rest_framework import serializers
+﻿from rest_framework import serializers
 
+from apps.profiles.summaries import UserSummaryListSerializer, UserSummaryMixin
 from apps.reports.models import Report
 
 
-class ReportSerializer(serializers.ModelSerializer):
+class ReportSerializer(UserSummaryMixin, serializers.ModelSerializer):
+    user_summary_fields = ('reporter_user_id',)
+
     reporter_user_id = serializers.IntegerField(read_only=True)
     reporter_display_name = serializers.SerializerMethodField()
     request_id = serializers.IntegerField(read_only=True)
@@ -14,20 +16,7 @@ class ReportSerializer(serializers.ModelSerializer):
     request_community_name = serializers.CharField(source='request.community.name', read_only=True)
 
     def get_reporter_display_name(self, obj):
-        reporter = getattr(obj, 'reporter_user', None)
-        if not reporter:
-            return ''
-
-        try:
-            profile = reporter.profile
-        except ObjectDoesNotExist:
-            profile = None
-
-        if profile and profile.display_name:
-            return profile.display_name
-        if reporter.email:
-            return reporter.email
-        return f'Usuario #{reporter.id}'
+        return self.user_display_name(obj.reporter_user_id)
 
     class Meta:
         model = Report
@@ -47,4 +36,5 @@ class ReportSerializer(serializers.ModelSerializer):
             'updated_at',
         )
         read_only_fields = ('status', 'created_at', 'updated_at')
+        list_serializer_class = UserSummaryListSerializer
 
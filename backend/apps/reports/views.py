@@ -1,11 +1,12 @@
 ﻿import logging
+from operator import attrgetter
 
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.openapi import OpenApiParameter, extend_schema
 from apps.core.pagination import StandardResultsPagination
 from apps.core.permissions import (
     get_moderated_community_ids,
@@ -14,6 +15,7 @@ from apps.core.permissions import (
     is_superadmin,
     normalize_community_id,
 )
+from apps.core.shards import join_global, sharded_results
 from apps.reports.models import Report
 from apps.reports.serializers import ReportSerializer
 from apps.requests.models import Request
@@ -64,12 +66,7 @@ class ReportListView(APIView):
         community_id = request.query_params.get('community_id')
         report_status = request.query_params.get('status')
 
-        queryset = Report.objects.select_related(
-            'request',
-            'request__community',
-            'reporter_user',
-            'reporter_user__profile',
-        ).order_by('-created_at')
+        queryset = join_global(Report.objects.select_related('request'), 'request__community').order_by('-created_at')
 
         if is_superadmin(request.user):
             if community_id:
@@ -96,8 +93,9 @@ class ReportListView(APIView):
         if report_status:
             queryset = queryset.filter(status=report_status)
 
+        # Vista global: con shards se pagina sobre los reportes de todos ellos.
         paginator = StandardResultsPagination()
-        page = paginator.paginate_queryset(queryset, request)
+        page = paginator.paginate_queryset(sharded_results(queryset, key=attrgetter('created_at'), reverse=True), request)
         serializer = ReportSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
 
@@ -113,7 +111,7 @@ class ReportStatusUpdateView(APIView):
     )
     def post(self, request, report_id):
         report = get_object_or_404(
-            Report.objects.select_related('request', 'request__community'),
+            join_global(Report.objects.select_related('request'), 'request__community'),
             id=report_id,
         )
         if not is_moderator_in_community(request.user, report.request.community_id):
@@ -0,0 +1,27 @@
+from rest_framework import status
+
+from apps.core.async_api import api_response, async_api_view, error_response
+from apps.core.pagination import AsyncResultsPagination
+from apps.core.permissions import acan_list_community, apaginate_community_list
+from apps.profiles.summaries import aprime_user_summaries
+from apps.requests.serializers import RequestSerializer
+from apps.requests.views import RequestListCreateView, parse_list_community_id, request_list_queryset
+
+
+async def request_list_get(request):
+    community_id_int, error = parse_list_community_id(request.query_params)
+    if error:
+        return error_response(error, status.HTTP_400_BAD_REQUEST)
+    if not await acan_list_community(request.user, community_id_int):
+        return error_response('No perteneces a la comunidad.', status.HTTP_403_FORBIDDEN)
+
+    queryset = request_list_queryset(community_id_int, request.query_params, request.user)
+    paginator = AsyncResultsPagination()
+    page = await apaginate_community_list(paginator, queryset, request, community_id_int)
+    context = {}
+    await aprime_user_summaries(RequestSerializer, page, context)
+    serializer = RequestSerializer(page, many=True, context=context)
+    return api_response(paginator.get_paginated_data(serializer.data))
+
+
+request_list = async_api_view(request_list_get, RequestListCreateView.as_view())
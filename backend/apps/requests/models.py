@@ -10,8 +10,8 @@ class Request(models.Model):
         RESOLVED = 'resolved', 'resolved'
         CANCELLED = 'cancelled', 'cancelled'
 
-    community = models.ForeignKey(Community, on_delete=models.CASCADE)
-    created_by_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
+    community = models.ForeignKey(Community, on_delete=models.CASCADE, db_constraint=False)
+    created_by_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, db_constraint=False)
     title = models.CharField(max_length=120)
     description = models.TextField()
     category = models.CharField(max_length=60)
@@ -43,7 +43,7 @@ class VolunteerOffer(models.Model):
         WITHDRAWN = 'withdrawn', 'withdrawn'
 
     request = models.ForeignKey(Request, on_delete=models.CASCADE, related_name='offers')
-    volunteer_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    volunteer_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, db_constraint=False)
     message = models.CharField(max_length=280, blank=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.OFFERED)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -1,11 +1,14 @@
-﻿from django.core.exceptions import ObjectDoesNotExist
-from rest_framework import serializers
+﻿from rest_framework import serializers
 
 from apps.communities.models import Community
+from apps.profiles.summaries import UserSummaryListSerializer, UserSummaryMixin
 from apps.requests.models import Request, VolunteerOffer
 
 
-class RequestSerializer(serializers.ModelSerializer):
+class RequestSerializer(UserSummaryMixin, serializers.ModelSerializer):
+    user_summary_fields = ('created_by_user_id',)
+    user_fallback_name = 'Usuario {id}'
+
     community_id = serializers.PrimaryKeyRelatedField(source='community', queryset=Community.objects.all())
     created_by_user_id = serializers.IntegerField(read_only=True)
     accepted_offer_id = serializers.IntegerField(read_only=True)
@@ -33,20 +36,10 @@ class RequestSerializer(serializers.ModelSerializer):
             'closed_at',
         )
         read_only_fields = ('status', 'accepted_offer_id', 'created_at', 'updated_at', 'closed_at')
+        list_serializer_class = UserSummaryListSerializer
 
     def get_created_by_display_name(self, obj):
-        user = getattr(obj, 'created_by_user', None)
-        if not user:
-            return ''
-
-        try:
-            profile = user.profile
-        except ObjectDoesNotExist:
-            profile = None
-
-        if profile and profile.display_name:
-            return profile.display_name
-        return user.email or f'Usuario {user.id}'
+        return self.user_display_name(obj.created_by_user_id)
 
     def get_offers_count(self, obj):
         if hasattr(obj, 'offers_count'):
@@ -60,7 +53,10 @@ class RequestUpdateSerializer(serializers.ModelSerializer):
         fields = ('title', 'description', 'category', 'time_window_text', 'location_area_text', 'location_radius_km')
 
 
-class VolunteerOfferSerializer(serializers.ModelSerializer):
+class VolunteerOfferSerializer(UserSummaryMixin, serializers.ModelSerializer):
+    user_summary_fields = ('volunteer_user_id',)
+    user_fallback_name = 'Usuario {id}'
+
     request_id = serializers.IntegerField(read_only=True)
     volunteer_user_id = serializers.IntegerField(read_only=True)
     volunteer_display_name = serializers.SerializerMethodField()
@@ -78,17 +74,7 @@ class VolunteerOfferSerializer(serializers.ModelSerializer):
             'updated_at',
         )
         read_only_fields = ('status', 'created_at', 'updated_at')
+        list_serializer_class = UserSummaryListSerializer
 
     def get_volunteer_display_name(self, obj):
-        user = getattr(obj, 'volunteer_user', None)
-        if not user:
-            return ''
-
-        try:
-            profile = user.profile
-        except ObjectDoesNotExist:
-            profile = None
-
-        if profile and profile.display_name:
-            return profile.display_name
-        return user.email or f'Usuario {user.id}'
+        return self.user_display_name(obj.volunteer_user_id)
@@ -1,9 +1,12 @@
 ﻿from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
+from apps.chat.models import Conversation
 from apps.communities.models import Community, Membership
+from apps.profiles.models import Profile
+from apps.profiles.summaries import SummaryLRU, UserSummaryLoader, bump_user_summary_version
 from apps.requests.models import Request, VolunteerOffer
-from apps.chat.models import Conversation
 
 User = get_user_model()
 
@@ -29,6 +32,109 @@ class RequestPermissionsTests(TestCase):
         self.assertEqual(response.status_code, 403)
 
 
+@override_settings(API_CACHES_ENABLED=True)
+class RequestListUserSummaryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.community = Community.objects.create(name='Obanos')
+        self.viewer = User.objects.create_user(username='viewer@example.com', email='viewer@example.com', password='Pass1234!')
+        Membership.objects.create(user=self.viewer, community=self.community, status=Membership.Status.APPROVED)
+        self.authors = []
+        for index in range(3):
+            author = User.objects.create_user(
+                username=f'author{index}@example.com',
+                email=f'author{index}@example.com',
+                password='Pass1234!',
+            )
+            self.authors.append(author)
+            Request.objects.create(
+                community=self.community,
+                created_by_user=author,
+                title=f'Test {index}',
+                description='Test',
+                category='general',
+            )
+        cache.clear()
+
+    def list_requests(self):
+        return self.client.get(f'/api/requests?community_id={self.community.id}')
+
+    def test_display_names_are_loaded_in_one_query_per_page(self):
+        self.client.force_authenticate(self.viewer)
+        with self.assertNumQueries(4):
+            response = self.list_requests()
+        self.assertEqual(response.status_code, 200)
+
+        for index in range(3, 6):
+            author = User.objects.create_user(
+                username=f'author{index}@example.com',
+                email=f'author{index}@example.com',
+                password='Pass1234!',
+            )
+            Request.objects.create(
+                community=self.community,
+                created_by_user=author,
+                title=f'Test {index}',
+                description='Test',
+                category='general',
+            )
+        with self.assertNumQueries(4):
+            response = self.list_requests()
+        self.assertEqual(len(response.data['results']), 6)
+
+        with self.assertNumQueries(3):
+            self.list_requests()
+
+    def test_display_name_change_is_reflected(self):
+        self.client.force_authenticate(self.viewer)
+        response = self.list_requests()
+        names = {item['created_by_user_id']: item['created_by_display_name'] for item in response.data['results']}
+        self.assertEqual(names[self.authors[0].id], 'author0@example.com')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Profile.objects.create(user=self.authors[0], display_name='Ane')
+            stale = self.list_requests()
+        names = {item['created_by_user_id']: item['created_by_display_name'] for item in stale.data['results']}
+        self.assertEqual(names[self.authors[0].id], 'author0@example.com')
+
+        response = self.list_requests()
+        names = {item['created_by_user_id']: item['created_by_display_name'] for item in response.data['results']}
+        self.assertEqual(names[self.authors[0].id], 'Ane')
+
+    def test_other_workers_see_the_new_version(self):
+        self.client.force_authenticate(self.viewer)
+        self.list_requests()
+        # Otro worker cambia el nombre: aquí solo llega la nueva versión en la cache compartida.
+        Profile.objects.create(user=self.authors[1], display_name='Miren')
+        bump_user_summary_version(self.authors[1].id)
+        names = {item['created_by_user_id']: item['created_by_display_name'] for item in self.list_requests().data['results']}
+        self.assertEqual(names[self.authors[1].id], 'Miren')
+
+    def test_fallback_names_keep_each_serializer_format(self):
+        self.client.force_authenticate(self.viewer)
+        User.objects.filter(pk=self.authors[2].pk).update(email='')
+        names = {item['created_by_user_id']: item['created_by_display_name'] for item in self.list_requests().data['results']}
+        self.assertEqual(names[self.authors[2].id], f'Usuario {self.authors[2].id}')
+        self.assertEqual(UserSummaryLoader().display_name(self.authors[2].id), f'Usuario #{self.authors[2].id}')
+
+    @override_settings(API_CACHES_ENABLED=False)
+    def test_names_are_read_from_the_database_without_a_shared_cache(self):
+        self.client.force_authenticate(self.viewer)
+        self.list_requests()
+        Profile.objects.create(user=self.authors[0], display_name='Ane')
+        names = {item['created_by_user_id']: item['created_by_display_name'] for item in self.list_requests().data['results']}
+        self.assertEqual(names[self.authors[0].id], 'Ane')
+
+    def test_lru_is_bounded(self):
+        lru = SummaryLRU(2)
+        lru.set((1, 1), {'id': 1})
+        lru.set((2, 1), {'id': 2})
+        lru.get((1, 1))
+        lru.set((3, 1), {'id': 3})
+        self.assertIsNone(lru.get((2, 1)))
+        self.assertEqual(lru.get((1, 1)), {'id': 1})
+
+
 class AcceptOfferFlowTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -1,22 +1,24 @@
 ﻿import logging
 
-from django.db import transaction
 from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.chat.models import Conversation
+from apps.core.openapi import OpenApiParameter, extend_schema
 from apps.core.pagination import StandardResultsPagination
 from apps.core.permissions import (
+    can_list_community,
     has_approved_membership,
     is_moderator_in_community,
     is_superadmin,
     normalize_community_id,
+    paginate_community_list,
 )
+from apps.core.shards import atomic_on_shard
 from apps.requests.models import Request, VolunteerOffer
 from apps.requests.serializers import (
     RequestSerializer,
@@ -27,6 +29,38 @@ from apps.requests.serializers import (
 logger = logging.getLogger(__name__)
 
 
+def parse_list_community_id(params):
+    community_id = params.get('community_id')
+    if not community_id:
+        return None, 'community_id es obligatorio.'
+    community_id_int = normalize_community_id(community_id)
+    if community_id_int is None:
+        return None, 'community_id inválido.'
+    return community_id_int, None
+
+
+def request_list_queryset(community_id, params, user):
+    queryset = (
+        Request.objects.filter(community_id=community_id)
+        .annotate(offers_count=Count('offers'))
+        .order_by('-created_at')
+    )
+    status_filter = params.get('status')
+    category_filter = params.get('category')
+    mine_filter = params.get('mine')
+    order_filter = params.get('order')
+
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    if category_filter:
+        queryset = queryset.filter(category=category_filter)
+    if mine_filter in ['1', 'true', 'True', 'yes', 'si', 'sí']:
+        queryset = queryset.filter(created_by_user=user)
+    if order_filter == 'oldest':
+        queryset = queryset.order_by('created_at')
+    return queryset
+
+
 class RequestListCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -45,37 +79,15 @@ class RequestListCreateView(APIView):
         responses={200: RequestSerializer(many=True)},
     )
     def get(self, request):
-        community_id = request.query_params.get('community_id')
-        if not community_id:
-            return Response({'detail': 'community_id es obligatorio.'}, status=status.HTTP_400_BAD_REQUEST)
-        community_id_int = normalize_community_id(community_id)
-        if community_id_int is None:
-            return Response({'detail': 'community_id inválido.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not has_approved_membership(request.user, community_id_int):
+        community_id_int, error = parse_list_community_id(request.query_params)
+        if error:
+            return Response({'detail': error}, status=status.HTTP_400_BAD_REQUEST)
+        if not can_list_community(request.user, community_id_int):
             return Response({'detail': 'No perteneces a la comunidad.'}, status=status.HTTP_403_FORBIDDEN)
 
-        queryset = (
-            Request.objects.filter(community_id=community_id_int)
-            .select_related('created_by_user', 'created_by_user__profile')
-            .annotate(offers_count=Count('offers'))
-            .order_by('-created_at')
-        )
-        status_filter = request.query_params.get('status')
-        category_filter = request.query_params.get('category')
-        mine_filter = request.query_params.get('mine')
-        order_filter = request.query_params.get('order')
-
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        if category_filter:
-            queryset = queryset.filter(category=category_filter)
-        if mine_filter in ['1', 'true', 'True', 'yes', 'si', 'sí']:
-            queryset = queryset.filter(created_by_user=request.user)
-        if order_filter == 'oldest':
-            queryset = queryset.order_by('created_at')
-
+        queryset = request_list_queryset(community_id_int, request.query_params, request.user)
         paginator = StandardResultsPagination()
-        result_page = paginator.paginate_queryset(queryset, request)
+        result_page = paginate_community_list(paginator, queryset, request, community_id_int)
         serializer = RequestSerializer(result_page, many=True)
         return paginator.get_paginated_response(serializer.data)
 
@@ -104,7 +116,7 @@ class RequestDetailView(APIView):
     )
     def get(self, request, request_id):
         obj = get_object_or_404(
-            Request.objects.select_related('created_by_user', 'created_by_user__profile'),
+            Request,
             id=request_id,
         )
         if not has_approved_membership(request.user, obj.community_id):
@@ -201,7 +213,6 @@ class OfferListCreateView(APIView):
 
         offers = (
             VolunteerOffer.objects.filter(request=req)
-            .select_related('volunteer_user', 'volunteer_user__profile')
             .order_by('-created_at')
         )
         serializer = VolunteerOfferSerializer(offers, many=True)
@@ -237,7 +248,7 @@ class OfferListCreateView(APIView):
 class AcceptOfferView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
-    @transaction.atomic
+    @atomic_on_shard
     @extend_schema(
         summary='Aceptar oferta',
         description='Acepta una oferta y rechaza el resto, pone la petición en in_progress y crea conversación.',
@@ -2,5 +2,11 @@
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'config.urls_async')
 
 application = get_asgi_application()
+
+if os.environ.get('DJANGO_WARMUP') == '1':
+    from apps.core.warmup import warm_up
+
+    warm_up()
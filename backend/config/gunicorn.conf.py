@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+import shutil
+
+# Uso: cd backend && gunicorn -c config/gunicorn.conf.py
+# El master importa la app y hace el warm-up una vez antes de crear los workers (preload_app).
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_WARMUP', '1')
+
+interface = os.environ.get('APP_SERVER_INTERFACE', 'wsgi')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '0'))
+preload_app = True
+accesslog = '-'
+
+if interface == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn_worker.UvicornWorker')
+else:
+    wsgi_app = 'config.wsgi:application'
+    worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+
+def post_fork(server, worker):
+    from apps.core.warmup import warm_up_worker
+
+    warm_up_worker()
+
+
+def on_starting(server):
+    # Métricas multiproceso: se descartan los ficheros de una ejecución anterior.
+    multiproc_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+    if os.environ.get('DJANGO_SAMPLING') == '1':
+        from apps.core.sampling import retire_worker
+
+        retire_worker(worker.pid)
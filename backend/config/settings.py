@@ -1,7 +1,10 @@
-﻿import os
+﻿import json
+import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'dev-secret-key-change-me')
@@ -9,6 +12,46 @@ DEBUG = os.environ.get('DJANGO_DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = [h for h in os.environ.get('DJANGO_ALLOWED_HOSTS', '*').split(',') if h]
 
+# Con el esquema desactivado (por defecto fuera de DEBUG) no se importa drf_spectacular y /api/schema sirve el artefacto de build_schema.
+API_SCHEMA_ENABLED = os.environ.get('DJANGO_API_SCHEMA', '1' if DEBUG else '0') == '1'
+
+# Métricas Prometheus por vista en /api/metrics (latencia, tiempo y nº de consultas SQL, filas, tamaño de respuesta).
+# Fuera de DEBUG /api/metrics exige METRICS_TOKEN.
+METRICS_ENABLED = os.environ.get('DJANGO_METRICS', '1') == '1'
+METRICS_TOKEN = os.environ.get('DJANGO_METRICS_TOKEN', '')
+
+# Comentario /* view=... app=... */ delante de cada consulta hecha durante una petición (manage.py pg_stat_report).
+SQL_COMMENTS_ENABLED = os.environ.get('DJANGO_SQL_COMMENTS', '1') == '1'
+
+# Perfilado bajo demanda (cabecera X-Profile: 1 con token de superadmin): un perfil cada PROFILING_INTERVAL segundos.
+PROFILING_ENABLED = os.environ.get('DJANGO_PROFILING', '0') == '1'
+PROFILING_DIR = os.environ.get('DJANGO_PROFILING_DIR', str(BASE_DIR / 'var' / 'profiles'))
+PROFILING_INTERVAL = int(os.environ.get('DJANGO_PROFILING_INTERVAL', '60'))
+PROFILING_KEEP = int(os.environ.get('DJANGO_PROFILING_KEEP', '20'))
+
+# tracemalloc (X-Profile: memory y manage.py trace_memory): marcos por reserva y sitios en el informe.
+MEMORY_TRACE_FRAMES = int(os.environ.get('DJANGO_MEMORY_TRACE_FRAMES', '10'))
+MEMORY_TRACE_TOP = int(os.environ.get('DJANGO_MEMORY_TRACE_TOP', '15'))
+
+# Consultas de lectura más lentas que SLOW_QUERY_MS (0 = desactivado): EXPLAIN ANALYZE en otra conexión y plan en el admin.
+SLOW_QUERY_MS = float(os.environ.get('DJANGO_SLOW_QUERY_MS', '0'))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get('DJANGO_SLOW_QUERY_SAMPLE_RATE', '0.2'))
+SLOW_QUERY_INTERVAL = int(os.environ.get('DJANGO_SLOW_QUERY_INTERVAL', '300'))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.environ.get('DJANGO_SLOW_QUERY_EXPLAIN_TIMEOUT_MS', '5000'))
+
+# Detector de N+1: avisa (o falla con STRICT) si una petición repite el mismo SELECT NPLUSONE_THRESHOLD veces.
+NPLUSONE_DETECTION = os.environ.get('DJANGO_NPLUSONE', '1' if DEBUG else '0') == '1'
+NPLUSONE_STRICT = os.environ.get('DJANGO_NPLUSONE_STRICT', '0') == '1'
+NPLUSONE_THRESHOLD = int(os.environ.get('DJANGO_NPLUSONE_THRESHOLD', '5'))
+
+# Muestreo continuo de pilas por vista (folded stacks para flamegraph), volcado por worker en SAMPLING_DIR.
+SAMPLING_ENABLED = os.environ.get('DJANGO_SAMPLING', '0') == '1'
+SAMPLING_HZ = float(os.environ.get('DJANGO_SAMPLING_HZ', '20'))
+if SAMPLING_ENABLED and SAMPLING_HZ <= 0:
+    raise ImproperlyConfigured('DJANGO_SAMPLING_HZ debe ser mayor que 0 (muestras por segundo en cada worker).')
+SAMPLING_DIR = os.environ.get('DJANGO_SAMPLING_DIR', str(BASE_DIR / 'var' / 'samples'))
+SAMPLING_FLUSH_SECONDS = int(os.environ.get('DJANGO_SAMPLING_FLUSH_SECONDS', '30'))
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -17,7 +60,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
-    'drf_spectacular',
+    *(['drf_spectacular'] if API_SCHEMA_ENABLED else []),
     'corsheaders',
     'apps.core',
     'apps.communities',
@@ -29,17 +72,25 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    *(['apps.core.metrics.MetricsMiddleware'] if METRICS_ENABLED else []),
+    *(['apps.core.middleware.SqlCommentMiddleware'] if SQL_COMMENTS_ENABLED else []),
+    *(['apps.core.middleware.SamplingMiddleware'] if SAMPLING_ENABLED else []),
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'apps.core.middleware.ReplicaRoutingMiddleware',
+    'apps.core.middleware.RowLevelSecurityMiddleware',
+    'apps.core.middleware.CommunityShardMiddleware',
+    *(['apps.core.middleware.ProfilingMiddleware'] if PROFILING_ENABLED else []),
+    'apps.core.middleware.NPlusOneMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'config.urls'
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'config.urls')
 
 TEMPLATES = [
     {
@@ -60,6 +111,8 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 ASGI_APPLICATION = 'config.asgi.application'
 
+DB_POOL_ENABLED = os.environ.get('POSTGRES_POOL', '0') == '1'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -68,8 +121,66 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
         'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        # Con pool las conexiones las gestiona psycopg; sin pool se reutilizan por hilo durante CONN_MAX_AGE segundos.
+        'CONN_MAX_AGE': 0 if DB_POOL_ENABLED else int(os.environ.get('POSTGRES_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('POSTGRES_CONN_HEALTH_CHECKS', '1') == '1',
+        'OPTIONS': {},
+    }
+}
+
+if DB_POOL_ENABLED:
+    # CONN_HEALTH_CHECKS activa ConnectionPool.check_connection al entregar cada conexión del pool.
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.environ.get('POSTGRES_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.environ.get('POSTGRES_POOL_TIMEOUT', '10')),
+        'max_idle': float(os.environ.get('POSTGRES_POOL_MAX_IDLE', '600')),
+        'max_lifetime': float(os.environ.get('POSTGRES_POOL_MAX_LIFETIME', '3600')),
+    }
+
+# Réplica de lectura: el alias existe siempre (en tests es espejo de default) pero solo se usa con POSTGRES_REPLICA_HOST.
+DATABASE_REPLICA_ALIAS = 'replica' if os.environ.get('POSTGRES_REPLICA_HOST') else None
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': os.environ.get('POSTGRES_REPLICA_DB', DATABASES['default']['NAME']),
+    'USER': os.environ.get('POSTGRES_REPLICA_USER', DATABASES['default']['USER']),
+    'PASSWORD': os.environ.get('POSTGRES_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+    'HOST': os.environ.get('POSTGRES_REPLICA_HOST', DATABASES['default']['HOST']),
+    'PORT': os.environ.get('POSTGRES_REPLICA_PORT', DATABASES['default']['PORT']),
+    'OPTIONS': {**DATABASES['default']['OPTIONS']},
+    'TEST': {'MIRROR': 'default'},
+}
+
+# Sharding por comunidad: {"eu": {"HOST": "...", "NAME": "..."}}. Cada alias hereda la configuración de default.
+COMMUNITY_SHARDS = json.loads(os.environ.get('DJANGO_COMMUNITY_SHARDS', '{}'))
+for shard_alias, shard_overrides in COMMUNITY_SHARDS.items():
+    DATABASES[shard_alias] = {**DATABASES['default'], 'OPTIONS': {**DATABASES['default']['OPTIONS']}, **shard_overrides}
+
+DATABASE_ROUTERS = ['apps.core.routers.CommunityShardRouter', 'apps.core.routers.ReplicaRouter']
+
+# Tras una escritura correcta, las lecturas de ese cliente van al primario durante estos segundos (read-your-writes).
+REPLICA_PIN_SECONDS = int(os.environ.get('DJANGO_REPLICA_PIN_SECONDS', '5'))
+
+# Row-level security de Postgres sobre los datos de comunidad (crear políticas con manage.py rls_policies enable).
+DATABASE_RLS = os.environ.get('DJANGO_DATABASE_RLS', '0') == '1'
+
+APP_VERSION = os.environ.get('APP_VERSION', '')
+API_SCHEMA_DIR = os.environ.get('API_SCHEMA_DIR', '')
+
+# gunicorn.conf.py lo activa; sin warm-up /api/health/ready responde 200 desde el arranque.
+WARMUP_ENABLED = os.environ.get('DJANGO_WARMUP') == '1'
+WARMUP_ME_USERS = int(os.environ.get('DJANGO_WARMUP_ME_USERS', '200'))
+WARMUP_ME_DAYS = int(os.environ.get('DJANGO_WARMUP_ME_DAYS', '7'))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
     }
 }
+# /api/me, el directorio de comunidades y los nombres de usuario se cachean y se invalidan con cache.delete, que solo
+# llega a todos los workers con una cache compartida: manage.py check falla si se activan con LocMemCache.
+API_CACHES_ENABLED = os.environ.get('DJANGO_API_CACHES', '0') == '1'
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -89,16 +200,18 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.core.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+if API_SCHEMA_ENABLED:
+    REST_FRAMEWORK['DEFAULT_SCHEMA_CLASS'] = 'drf_spectacular.openapi.AutoSchema'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -1,7 +1,18 @@
-﻿from django.contrib import admin
+﻿from django.conf import settings
+from django.contrib import admin
 from django.urls import path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from apps.core.views import RegisterView, MeView, CustomTokenObtainPairView, CustomTokenRefreshView
+from apps.core.schema import schema_view
+from apps.core.views import (
+    CustomTokenObtainPairView,
+    CustomTokenRefreshView,
+    DatabasePoolStatsView,
+    MeView,
+    ProfileDownloadView,
+    ProfileListView,
+    SampledStacksView,
+    ReadinessView,
+    RegisterView,
+)
 from apps.communities.views import (
     CommunityListView,
     JoinCommunityView,
@@ -18,7 +29,13 @@ from apps.requests.views import (
     ModerationRequestCloseView,
     ModerationRequestDeleteView,
 )
-from apps.chat.views import RequestConversationView, MessageListCreateView
+from apps.chat.views import (
+    ConversationListView,
+    ConversationReadView,
+    ConversationUnreadView,
+    RequestConversationView,
+    MessageListCreateView,
+)
 from apps.reports.views import ReportCreateView, ReportListView, ReportStatusUpdateView
 from apps.loans.views import (
     LoanListCreateView,
@@ -31,8 +48,12 @@ from apps.loans.views import (
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/schema', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('api/schema', schema_view, name='schema'),
+    path('api/health/ready', ReadinessView.as_view()),
+    path('api/health/db', DatabasePoolStatsView.as_view()),
+    path('api/profiles', ProfileListView.as_view()),
+    path('api/profiles/samples', SampledStacksView.as_view()),
+    path('api/profiles/<str:profile_id>', ProfileDownloadView.as_view()),
     path('api/auth/register', RegisterView.as_view()),
     path('api/auth/token', CustomTokenObtainPairView.as_view()),
     path('api/auth/token/refresh', CustomTokenRefreshView.as_view()),
@@ -50,7 +71,10 @@ urlpatterns = [
     path('api/moderation/requests/<int:request_id>/close', ModerationRequestCloseView.as_view()),
     path('api/moderation/requests/<int:request_id>', ModerationRequestDeleteView.as_view()),
     path('api/requests/<int:request_id>/conversation', RequestConversationView.as_view()),
+    path('api/conversations', ConversationListView.as_view()),
+    path('api/conversations/unread', ConversationUnreadView.as_view()),
     path('api/conversations/<int:conversation_id>/messages', MessageListCreateView.as_view()),
+    path('api/conversations/<int:conversation_id>/read', ConversationReadView.as_view()),
     path('api/requests/<int:request_id>/reports', ReportCreateView.as_view()),
     path('api/reports', ReportListView.as_view()),
     path('api/reports/<int:report_id>/status', ReportStatusUpdateView.as_view()),
@@ -61,3 +85,13 @@ urlpatterns = [
     path('api/loans/<int:loan_id>/requests/<int:loan_request_id>/reject', LoanRequestRejectView.as_view()),
     path('api/loans/<int:loan_id>/mark-returned', LoanMarkReturnedView.as_view()),
 ]
+
+if settings.METRICS_ENABLED:
+    from apps.core.metrics import metrics_view
+
+    urlpatterns.append(path('api/metrics', metrics_view, name='metrics'))
+
+if settings.API_SCHEMA_ENABLED:
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    urlpatterns.append(path('api/docs', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'))
@@ -0,0 +1,16 @@
+from django.urls import path
+
+from apps.chat.async_views import message_list
+from apps.communities.async_views import community_list
+from apps.core.async_views import me
+from apps.requests.async_views import request_list
+from config.urls import urlpatterns as sync_urlpatterns
+
+# Bajo ASGI estas rutas se resuelven antes que las síncronas de config.urls; el resto se hereda tal cual.
+urlpatterns = [
+    path('api/me', me),
+    path('api/communities', community_list),
+    path('api/requests', request_list),
+    path('api/conversations/<int:conversation_id>/messages', message_list),
+    *sync_urlpatterns,
+]
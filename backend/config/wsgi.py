@@ -4,3 +4,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+if os.environ.get('DJANGO_WARMUP') == '1':
+    from apps.core.warmup import warm_up
+
+    warm_up()
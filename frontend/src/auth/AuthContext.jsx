@@ -34,8 +34,18 @@ export function AuthProvider({ children }) {
   const fetchMe = async () => {
     try {
       const res = await api.get('/me')
-      setUser(res.data)
-      const resolved = resolveCurrentCommunityId(res.data)
+      const userData = res.data
+      if (userData.all_communities) {
+        const communitiesRes = await api.get('/communities')
+        userData.communities = communitiesRes.data.map((community) => ({
+          community_id: community.id,
+          community_name: community.name,
+          status: 'approved',
+          role_in_community: 'superadmin',
+        }))
+      }
+      setUser(userData)
+      const resolved = resolveCurrentCommunityId(userData)
       setCurrentCommunityIdState(resolved)
       if (resolved) {
         localStorage.setItem(CURRENT_COMMUNITY_KEY, String(resolved))
@@ -1,6 +1,8 @@
-﻿import { Container, Form, Nav, Navbar } from 'react-bootstrap'
+﻿import { useEffect, useState } from 'react'
+import { Badge, Container, Form, Nav, Navbar } from 'react-bootstrap'
 import { Link, NavLink, useLocation, useNavigate } from 'react-router-dom'
 
+import api from '../api/http.js'
 import { useAuth } from '../auth/AuthContext.jsx'
 import { UI_ICONS } from '../data/icons.js'
 
@@ -14,6 +16,18 @@ export default function AppNavbar() {
   } = useAuth()
   const location = useLocation()
   const navigate = useNavigate()
+  const [unreadCount, setUnreadCount] = useState(0)
+
+  useEffect(() => {
+    if (!user) {
+      setUnreadCount(0)
+      return
+    }
+    api
+      .get('/conversations/unread')
+      .then((res) => setUnreadCount(res.data.unread_count || 0))
+      .catch(() => setUnreadCount(0))
+  }, [user, location.pathname])
 
   const handleLogout = () => {
     logout()
@@ -37,6 +51,7 @@ export default function AppNavbar() {
   const isMineSection = path.startsWith('/requests/mine')
   const isRequestsSection = path.startsWith('/requests') && !isMineSection
   const isLoansSection = path.startsWith('/loans')
+  const isChatsSection = path.startsWith('/conversations')
   const isCommunitySection = path.startsWith('/community')
   const isReportsSection = path.startsWith('/reports')
   const navTabClass = (isActive) => `nav-link-tab${isActive ? ' active' : ''}`
@@ -61,6 +76,14 @@ export default function AppNavbar() {
                 <Nav.Link as={NavLink} to="/requests/mine" className={navTabClass(isMineSection)}>
                   Mis peticiones
                 </Nav.Link>
+                <Nav.Link as={NavLink} to="/conversations" className={navTabClass(isChatsSection)}>
+                  Chats
+                  {unreadCount > 0 && (
+                    <Badge bg="danger" pill className="ms-1">
+                      {unreadCount}
+                    </Badge>
+                  )}
+                </Nav.Link>
                 {canManageCommunity && (
                   <Nav.Link as={NavLink} to="/community/members" className={navTabClass(isCommunitySection)}>
                     Mi comunidad
@@ -32,6 +32,10 @@ export default function ChatPage() {
         params: { page_size: 50 }
       })
       setMessages(res.data.results)
+      const newest = res.data.results[0]
+      if (newest && newest.id > (res.data.last_read_message_id || 0)) {
+        await api.post(`/conversations/${conversation}/read`, { message_id: newest.id })
+      }
     } catch {
       setError('No se pudieron cargar los mensajes.')
     }
@@ -0,0 +1,127 @@
+import { useEffect, useState } from 'react'
+import { Alert, Badge, Button, Card, Spinner } from 'react-bootstrap'
+import { useNavigate } from 'react-router-dom'
+
+import api from '../api/http.js'
+
+const requestStatusLabels = {
+  open: 'Abierta',
+  in_progress: 'En progreso',
+  resolved: 'Resuelta',
+  cancelled: 'Cancelada',
+}
+
+function formatDateTime(dateString) {
+  if (!dateString) return '-'
+  const date = new Date(dateString)
+  if (Number.isNaN(date.getTime())) return '-'
+  return date.toLocaleString('es-ES', {
+    day: '2-digit',
+    month: '2-digit',
+    hour: '2-digit',
+    minute: '2-digit',
+  })
+}
+
+export default function ConversationsPage() {
+  const navigate = useNavigate()
+  const [conversations, setConversations] = useState([])
+  const [count, setCount] = useState(0)
+  const [page, setPage] = useState(1)
+  const [loading, setLoading] = useState(false)
+  const [error, setError] = useState('')
+
+  const fetchConversations = async () => {
+    setLoading(true)
+    setError('')
+    try {
+      const res = await api.get('/conversations', { params: { page, page_size: 10 } })
+      setConversations(res.data.results || [])
+      setCount(res.data.count || 0)
+    } catch {
+      setError('No se pudieron cargar tus conversaciones.')
+      setConversations([])
+      setCount(0)
+    } finally {
+      setLoading(false)
+    }
+  }
+
+  useEffect(() => {
+    fetchConversations()
+  }, [page])
+
+  const totalPages = Math.ceil(count / 10) || 1
+
+  return (
+    <div>
+      <div className="page-header">
+        <div>
+          <h2 className="page-title">Mis chats</h2>
+          <div className="muted">Conversaciones de tus peticiones y ayudas aceptadas</div>
+        </div>
+      </div>
+
+      {error && <Alert variant="danger">{error}</Alert>}
+
+      {loading ? (
+        <div className="d-flex align-items-center gap-2 muted">
+          <Spinner size="sm" />
+          Cargando conversaciones...
+        </div>
+      ) : conversations.length === 0 ? (
+        <div className="muted">Todavía no tienes conversaciones.</div>
+      ) : (
+        conversations.map((conversation) => (
+          <Card
+            key={conversation.conversation_id}
+            className="card-shadow mb-3"
+            role="button"
+            onClick={() => navigate(`/requests/${conversation.request_id}/chat`)}
+          >
+            <Card.Body>
+              <div className="d-flex justify-content-between align-items-center flex-wrap gap-2">
+                <div className="fw-semibold">{conversation.request_title}</div>
+                <div className="d-flex align-items-center gap-2">
+                  <Badge bg="light" text="dark">
+                    {requestStatusLabels[conversation.request_status] || conversation.request_status}
+                  </Badge>
+                  {conversation.unread_count > 0 && (
+                    <Badge bg="danger" pill>
+                      {conversation.unread_count}
+                    </Badge>
+                  )}
+                </div>
+              </div>
+              <div className="d-flex justify-content-between gap-2 mt-2">
+                <div className="muted text-truncate">
+                  {conversation.last_message_preview || 'Sin mensajes todavía.'}
+                </div>
+                <small className="muted text-nowrap">{formatDateTime(conversation.last_message_at)}</small>
+              </div>
+            </Card.Body>
+          </Card>
+        ))
+      )}
+
+      {totalPages > 1 && (
+        <div className="d-flex justify-content-center align-items-center gap-3 mt-3">
+          <Button variant="outline-secondary" size="sm" disabled={page <= 1} onClick={() => setPage(page - 1)}>
+            Anterior
+          </Button>
+          <span className="muted">
+            Página {page} de {totalPages}
+          </span>
+          <Button
+            variant="outline-secondary"
+            size="sm"
+            disabled={page >= totalPages}
+            onClick={() => setPage(page + 1)}
+          >
+            Siguiente
+          </Button>
+        </div>
+      )}
+    </div>
+  )
+}
@@ -5,6 +5,7 @@ import RequestsListPage from '../pages/RequestsListPage.jsx'
 import RequestCreatePage from '../pages/RequestCreatePage.jsx'
 import RequestDetailPage from '../pages/RequestDetailPage.jsx'
 import ChatPage from '../pages/ChatPage.jsx'
+import ConversationsPage from '../pages/ConversationsPage.jsx'
 import ProfilePage from '../pages/ProfilePage.jsx'
 import HomePage from '../pages/HomePage.jsx'
 import CommunityMembersPage from '../pages/CommunityMembersPage.jsx'
@@ -90,6 +91,14 @@ export default function AppRouter() {
           </ProtectedRoute>
         }
       />
+      <Route
+        path="/conversations"
+        element={
+          <ProtectedRoute>
+            <ConversationsPage />
+          </ProtectedRoute>
+        }
+      />
       <Route
         path="/loans"
         element={